@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Бенчмарк мережевих фільтрів ABP: рушій з індексом за токенами URL проти перебору
+всіх правил - перевірок на секунду (і повний шлях SecurityManager.should_block_request, яким
+іде перехоплювач запитів), кандидатів на запит, збіг результатів з перебором
+та з adblockparser.AdblockRules, побудова з security.db
+"""
+
+import os
+import sys
+import time
+import random
+import shutil
+import tempfile
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from adblockparser import AdblockRule, AdblockRules
+from PyQt5.QtCore import QCoreApplication
+
+from browser.database import ConnectionPool
+from browser.adblock_engine import (
+    NetworkFilter, NetworkFilterEngine, URL_TOKEN_RE, url_host, host_suffixes, base_domain,
+)
+from bench_domain_matcher import random_domain
+
+
+SITES = ["news.example.com", "shop.example.org", "video.example.net", "forum.example.io",
+         "mail.example.co.uk", "docs.example.com.ua"]
+TYPES = ["script", "image", "stylesheet", "xmlhttprequest", "subdocument", "font", "media", "other"]
+AD_WORDS = ["ad", "ads", "adv", "banner", "promo", "sponsor", "popunder", "pagead", "adserver",
+            "adframe", "track", "pixel", "beacon", "analytics", "stats", "affiliate", "click"]
+WORDS = ["static", "assets", "img", "js", "css", "cdn", "media", "api", "v1", "v2", "player",
+         "thumbs", "fonts", "lib", "vendor", "app", "main", "common", "user", "content"]
+
+
+def word(rng: random.Random) -> str:
+    """Випадкове слово шляху"""
+    return ''.join(rng.choice("abcdefghijklmnopqrstuvwxyz") for _ in range(rng.randint(3, 9)))
+
+
+def synthetic_list(rng: random.Random, size: int) -> list:
+    """Список у форматі EasyList: хости, шляхи, опції, $domain=, винятки, regex, косметика"""
+    lines = ["[Adblock Plus 2.0]", "! Title: synthetic EasyList"]
+    while len(lines) < size:
+        kind = rng.random()
+        ad = rng.choice(AD_WORDS)
+        if kind < 0.40:
+            lines.append(f"||{random_domain(rng)}^" + rng.choice(["", "", "$third-party", "$script,third-party"]))
+        elif kind < 0.55:
+            lines.append(f"||{random_domain(rng)}/{ad}/{word(rng)}" + rng.choice(["^", "/", ".js", "*"]) +
+                         rng.choice(["", "$script", "$image,third-party", "$xmlhttprequest"]))
+        elif kind < 0.70:
+            lines.append(rng.choice([
+                f"/{ad}/{word(rng)}_", f"-{ad}-{rng.randint(100, 999)}x{rng.randint(50, 600)}.",
+                f"&{ad}_{word(rng)}=", f"/{word(rng)}/{ad}.", f"_{ad}{word(rng)}.", f"/{ad}_{word(rng)}/*",
+                f"?{ad}={word(rng)}&", f".{word(rng)}/{ad}/", f"{ad}{word(rng)}.", f"{word(rng)}_{ad}/",
+                f"{ad}-{word(rng)}*/{rng.choice(WORDS)}^",
+            ]) + rng.choice(["", "", "$third-party", "$~image", "$script,image"]))
+        elif kind < 0.78:
+            domains = '|'.join(rng.choice(SITES + [random_domain(rng)]) for _ in range(rng.randint(1, 3)))
+            lines.append(rng.choice([f"/{ad}/{word(rng)}.js", f"/{word(rng)}-{ad}.", f"||{random_domain(rng)}^"]) +
+                         f"$domain={domains}" + rng.choice(["", ",script", ",~third-party"]))
+        elif kind < 0.84:
+            lines.append("@@" + rng.choice([
+                f"||{random_domain(rng)}^$script", f"||{rng.choice(SITES)}/{ad}/{word(rng)}",
+                f"/{ad}/{word(rng)}_$image,domain={rng.choice(SITES)}", f"|https://{rng.choice(SITES)}/{ad}.",
+                f"||{SITES[-1]}^$document" if rng.random() < 0.001 else f"/{word(rng)}/{ad}.",
+            ]))
+        elif kind < 0.8405:
+            lines.append(f"/{ad}[0-9]{{3,}}\\.(gif|png)/" + rng.choice(["", "$image"]))
+        elif kind < 0.85:
+            lines.append(f"||{random_domain(rng)}^$important")
+        else:
+            lines.append(rng.choice([f"##.{ad}-{word(rng)}", f"{rng.choice(SITES)}###{ad}_{word(rng)}",
+                                     f"{rng.choice(SITES)}#@#.{ad}"]))
+    return lines
+
+
+def hit_url(rng: random.Random, line: str) -> str:
+    """URL, побудований зі шматка правила (імовірний збіг)"""
+    body = line.lstrip('@').split('$')[0]
+    if body.startswith('||'):
+        host, _, path = body[2:].partition('/')
+        host = host.rstrip('^')
+        return f"https://{rng.choice(['', 'cdn.', 'a1.'])}{host}/{path.rstrip('^*')}{word(rng)}.js"
+    if body.startswith('|'):
+        return body[1:] + f"{word(rng)}.js"
+    return f"https://{random_domain(rng)}/{rng.choice(WORDS)}{body.replace('*', word(rng)).rstrip('^')}" \
+           f"{word(rng)}.png?x={rng.randint(1, 999)}"
+
+
+def page_requests(rng: random.Random, lines: list, count: int) -> list:
+    """Підресурси сторінок (~40 на сторінку): (URL, URL сторінки, тип запиту)"""
+    network = [line for line in lines if not line.startswith(('!', '[')) and '#' not in line]
+    requests_list = []
+    while len(requests_list) < count:
+        site = rng.choice(SITES)
+        page = f"https://{site}/{word(rng)}/{rng.randint(1, 99999)}.html"
+        for _ in range(min(rng.randint(20, 60), count - len(requests_list))):
+            if rng.random() < 0.25:
+                url = hit_url(rng, rng.choice(network))
+            else:
+                host = site if rng.random() < 0.5 else random_domain(rng)
+                path = '/'.join(rng.choice(WORDS) for _ in range(rng.randint(1, 4)))
+                url = f"https://{host}/{path}/{word(rng)}." \
+                      f"{rng.choice(['js', 'css', 'png', 'jpg', 'woff2', 'json'])}" + \
+                      rng.choice(["", f"?v={rng.randint(1, 99999)}", f"?id={word(rng)}&lang=uk"])
+            requests_list.append((url, page, rng.choice(TYPES)))
+    return requests_list
+
+
+def reference_match(filters: list, url: str, first_party_url: str, resource_type: str) -> bool:
+    """Еталон: перебір усіх правил за регулярними виразами adblockparser (без індексу)"""
+    host = url_host(url)
+    first_party_host = url_host(first_party_url)
+    third_party = base_domain(host) != base_domain(first_party_host)
+    first_party_suffixes = host_suffixes(first_party_host)
+
+    def matches(network_filter, target, target_type, target_third_party):
+        if not network_filter.applies(target_type, target_third_party, first_party_suffixes):
+            return False
+        if network_filter.regex is None:
+            # ||домен^ рушій перевіряє за суфіксами хоста; тут - регулярним виразом adblockparser
+            network_filter.regex = AdblockRule.rule_to_regex(network_filter.pattern)
+        return network_filter.matches_url(target)
+
+    blocking = [f for f in filters if not f.exception and matches(f, url, resource_type, third_party)]
+    if not blocking:
+        return False
+    if any(f.important for f in blocking):
+        return True
+    if any(f.exception and matches(f, url, resource_type, third_party) for f in filters):
+        return False
+    if any(f.exception and f.types and 'document' in f.types and
+           matches(f, first_party_url, 'document', False) for f in filters):
+        return False
+    return True
+
+
+def measure(match, requests_list: list, repeat: int) -> float:
+    """Секунди на одну перевірку (найкращий з repeat проходів, як timeit)"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for url, first_party_url, resource_type in requests_list:
+            match(url, first_party_url, resource_type)
+        best = min(best, time.perf_counter() - start)
+    return best / len(requests_list)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк мережевих фільтрів ABP")
+    parser.add_argument("--list", help="Файл списку (easylist.txt); без нього - синтетичний список")
+    parser.add_argument("--rules", type=int, default=70000, help="Рядків у синтетичному списку")
+    parser.add_argument("--requests", type=int, default=20000, help="Запитів для перевірки")
+    parser.add_argument("--reference", type=int, default=300, help="Запитів для перевірки перебором")
+    args = parser.parse_args()
+
+    rng = random.Random(23)
+    if args.list:
+        with open(args.list, encoding='utf-8') as f:
+            lines = [line.strip() for line in f]
+        source = os.path.basename(args.list)
+    else:
+        lines = synthetic_list(rng, args.rules)
+        source = "синтетичний список"
+    requests_list = page_requests(rng, lines, args.requests)
+
+    data_dir = tempfile.mkdtemp(prefix="andetect_bench_")
+    try:
+        from browser.security_manager import SecurityDatabase, SecurityListUpdater
+
+        # Розбір списку та збереження, як SecurityListUpdater.update_ad_list
+        security_db = SecurityDatabase(data_dir)
+        start = time.perf_counter()
+        rules, domains = SecurityListUpdater.parse_filter_list(lines)
+        security_db.replace_filter_rules("easylist", rules)
+        store_ms = (time.perf_counter() - start) * 1000
+        start = time.perf_counter()
+        engine = security_db.reload_filter_engine()
+        build_ms = (time.perf_counter() - start) * 1000
+        stats = engine.stats()
+        print(f"{source}: {len(lines)} рядків, {len(rules)} мережевих правил ({len(domains)} доменів для "
+              f"таблиці), збереження {store_ms:.0f} мс, побудова рушія {build_ms:.0f} мс")
+        print(f"  Індекс: {stats}")
+
+        # Кандидати на запит (правила, для яких перевіряються опції або шаблон)
+        candidates = 0
+        for url, first_party_url, resource_type in requests_list[:2000]:
+            candidates += sum(1 for _ in engine.blocking.candidates(
+                url.lower(), host_suffixes(url_host(url)), URL_TOKEN_RE.findall(url.lower()),
+                host_suffixes(url_host(first_party_url))))
+        # Перший прохід компілює регулярні вирази правил-кандидатів
+        measure(engine.match, requests_list, 1)
+        engine_time = measure(engine.match, requests_list, 5)
+        blocked = sum(engine.should_block(*request) for request in requests_list)
+        print(f"  Рушій з індексом  {1 / engine_time:>10,.0f} перевірок/с  {engine_time * 1e6:>8.1f} мкс  "
+              f"(~{candidates / 2000:.1f} кандидатів на запит, заблоковано {blocked / len(requests_list):.0%})")
+
+        # Повний шлях перехоплювача: списки доменів, кеш доменів, фішинг, білий список сторінки, фільтри
+        app = QCoreApplication.instance() or QCoreApplication([])
+        from browser.security_manager import SecurityManager
+        manager = SecurityManager(data_dir)
+        manager.security_db.filter_engine = engine
+        measure(manager.should_block_request, requests_list, 1)
+        manager_time = measure(manager.should_block_request, requests_list, 5)
+        print(f"  SecurityManager   {1 / manager_time:>10,.0f} перевірок/с  {manager_time * 1e6:>8.1f} мкс  "
+              f"(should_block_request)")
+
+        # Перебір усіх правил з тими самими опціями
+        filters = [f for f in (NetworkFilter.parse(rule, "easylist") for rule in rules) if f is not None]
+        sample = requests_list[:args.reference]
+        start = time.perf_counter()
+        reference = [reference_match(filters, *request) for request in sample]
+        reference_time = (time.perf_counter() - start) / len(sample)
+        mismatches = sum(engine.should_block(*request) != expected for request, expected in zip(sample, reference))
+        print(f"  Перебір правил    {1 / reference_time:>10,.0f} перевірок/с  {reference_time * 1e6:>8.1f} мкс  "
+              f"(розбіжностей з рушієм: {mismatches} з {len(sample)})")
+        print(f"  Швидше в x{reference_time / engine_time:,.0f}")
+
+        # adblockparser.AdblockRules на частині списку (побудова для всього списку занадто довга)
+        subset = [rule for rule in rules[:3000] if NetworkFilter.parse(rule) is not None]
+        small = NetworkFilterEngine.from_rules(("easylist", rule) for rule in subset)
+        start = time.perf_counter()
+        adblock_rules = AdblockRules(subset, skip_unsupported_rules=True)
+        adblock_build_ms = (time.perf_counter() - start) * 1000
+        options = [{'domain': url_host(first_party_url), resource_type: True,
+                    'third-party': base_domain(url_host(url)) != base_domain(url_host(first_party_url))}
+                   for url, first_party_url, resource_type in sample]
+        start = time.perf_counter()
+        expected = [adblock_rules.should_block(url, option) for (url, _, _), option in zip(sample, options)]
+        adblock_time = (time.perf_counter() - start) / len(sample)
+        small_time = measure(small.match, sample, 20)
+        differences = sum(small.should_block(*request) != value for request, value in zip(sample, expected))
+        print(f"adblockparser.AdblockRules, {len(subset)} правил (побудова {adblock_build_ms:.0f} мс):")
+        print(f"  AdblockRules      {1 / adblock_time:>10,.0f} перевірок/с  {adblock_time * 1e6:>8.1f} мкс")
+        print(f"  Рушій з індексом  {1 / small_time:>10,.0f} перевірок/с  {small_time * 1e6:>8.1f} мкс  "
+              f"(відмінностей: {differences} з {len(sample)})")
+    finally:
+        ConnectionPool.close_all()
+        shutil.rmtree(data_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
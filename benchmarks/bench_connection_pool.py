@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Бенчмарк CRUD-операцій: з'єднання на кожен виклик (як раніше) проти пулу WAL-з'єднань
+"""
+
+import os
+import sys
+import time
+import shutil
+import sqlite3
+import tempfile
+import argparse
+from contextlib import contextmanager
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from browser.database import ConnectionPool
+from browser.profile_manager import ProfileManager
+from browser.security_manager import SecurityDatabase
+
+
+class ConnectPerCallPool(ConnectionPool):
+    """Старий підхід: нове з'єднання, журнал DELETE та коміт на кожен виклик"""
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, isolation_level=None)
+        conn.execute("PRAGMA journal_mode = DELETE")
+        return conn
+
+    def connection(self):
+        return self._connect()
+
+    @contextmanager
+    def transaction(self, immediate: bool = False):
+        conn = self._connect()
+        conn.execute("BEGIN")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        else:
+            conn.execute("COMMIT")
+        finally:
+            conn.close()
+
+
+def measure(name: str, operations: int, func) -> float:
+    """Вимірювання кількості операцій за секунду"""
+    start = time.perf_counter()
+    for i in range(operations):
+        func(i)
+    elapsed = time.perf_counter() - start
+    ops = operations / elapsed if elapsed else float('inf')
+    print(f"  {name:<28} {ops:>10.0f} оп/с")
+    return ops
+
+
+def run_suite(label: str, pool_factory, operations: int):
+    """Набір CRUD-операцій над profiles.db та security.db"""
+    data_dir = tempfile.mkdtemp(prefix="andetect_bench_")
+    try:
+        manager = ProfileManager(data_dir)
+        security_db = SecurityDatabase(data_dir)
+        ConnectionPool.close_all()
+        manager.pool = pool_factory(manager.db_path)
+        security_db.pool = pool_factory(security_db.db_path)
+
+        print(f"{label}:")
+        ids = []
+        results = {}
+        results['create_profile'] = measure(
+            "create_profile", operations,
+            lambda i: ids.append(manager.create_profile(f"Profile {i}").id))
+        results['get_profile_by_id'] = measure(
+            "get_profile_by_id", operations, lambda i: manager.get_profile_by_id(ids[i]))
+        results['update_profile'] = measure(
+            "update_profile", operations, lambda i: manager.update_profile(ids[i], {'notes': str(i)}))
+        # Перевірки доменів ідуть за знімком списків у пам'яті, а не SQLite (bench_domain_matcher.py)
+        results['add_ad_domain'] = measure(
+            "add_ad_domain", operations, lambda i: security_db.add_ad_domain(f"ads{i}.example.com"))
+        results['delete_profile'] = measure(
+            "delete_profile", operations, lambda i: manager.delete_profile(ids[i]))
+        return results
+    finally:
+        ConnectionPool.close_all()
+        shutil.rmtree(data_dir, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк пулу з'єднань SQLite")
+    parser.add_argument("--operations", type=int, default=500, help="Операцій на тест")
+    args = parser.parse_args()
+
+    before = run_suite("До (з'єднання на виклик)", ConnectPerCallPool, args.operations)
+    after = run_suite("Після (пул, WAL)", ConnectionPool, args.operations)
+
+    print("Прискорення:")
+    for name in before:
+        print(f"  {name:<28} x{after[name] / before[name]:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Бенчмарк відновлення cookies зі "старіючим" профілем: фільтр у Python проти expires_epoch у SQL
+та швидкість фонового видалення протермінованих cookies
+"""
+
+import os
+import sys
+import time
+import shutil
+import tempfile
+import argparse
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from browser.database import ConnectionPool
+from browser.profile_manager import ProfileManager
+from browser.session_manager import SessionManager
+
+
+def restore_python_filter(manager: SessionManager, profile_id: str) -> list:
+    """Старий спосіб: читання всіх рядків та розбір expires_at у Python"""
+    cookies = []
+    rows = manager.pool.execute("""
+        SELECT domain, name, value, path, expires_at, is_secure, is_http_only, same_site
+        FROM saved_cookies WHERE profile_id = ?
+    """, (profile_id,)).fetchall()
+    for row in rows:
+        if row[4] and datetime.fromisoformat(row[4]) < datetime.now():
+            continue
+        cookies.append(row)
+    return cookies
+
+
+def add_cookies(manager: SessionManager, profile_id: str, count: int, expired: bool, offset: int):
+    """Пакет cookies (протермінованих або дійсних)"""
+    delta = timedelta(days=-1 if expired else 30)
+    expires = (datetime.now() + delta).isoformat()
+    rows = dict(manager.state.cookie_row({
+        'domain': f"site{n % 300}.example.com",
+        'name': f"cookie_{offset + n}",
+        'value': 'x' * 64,
+        'expires': expires,
+    }) for n in range(count))
+    with manager.pool.transaction() as conn:
+        conn.executemany(
+            f"INSERT INTO saved_cookies (profile_id, domain, name, path, "
+            f"{', '.join(manager.state.COOKIE_VALUE_COLUMNS)}, created_at, updated_at) "
+            f"VALUES (?, ?, ?, ?, {', '.join('?' * len(manager.state.COOKIE_VALUE_COLUMNS))}, ?, ?)",
+            [(profile_id,) + key + values + (expires, expires) for key, values in rows.items()]
+        )
+
+
+def timed(func, repeat: int) -> float:
+    """Середній час виклику в мс"""
+    func()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк протермінування cookies")
+    parser.add_argument("--live", type=int, default=2000, help="Дійсних cookies у профілі")
+    parser.add_argument("--steps", type=int, default=5, help="Кроків старіння")
+    parser.add_argument("--expired-step", type=int, default=20000, help="Протермінованих cookies за крок")
+    parser.add_argument("--repeat", type=int, default=10, help="Повторів відновлення")
+    args = parser.parse_args()
+
+    data_dir = tempfile.mkdtemp(prefix="andetect_bench_")
+    try:
+        manager = SessionManager(ProfileManager(data_dir))
+        profile_id = "aging-profile"
+        add_cookies(manager, profile_id, args.live, expired=False, offset=0)
+
+        print(f"{args.live} дійсних cookies, +{args.expired_step} протермінованих на крок:")
+        print(f"  {'протерміновано':>14} {'Python-фільтр':>14} {'SQL-фільтр':>12}")
+        for step in range(args.steps + 1):
+            if step:
+                add_cookies(manager, profile_id, args.expired_step, expired=True,
+                            offset=args.live + step * args.expired_step)
+            python_ms = timed(lambda: restore_python_filter(manager, profile_id), args.repeat)
+            sql_ms = timed(lambda: manager.restore_cookies(profile_id), args.repeat)
+            print(f"  {step * args.expired_step:>14} {python_ms:>11.2f} мс {sql_ms:>9.2f} мс")
+
+        start = time.perf_counter()
+        batches = 0
+        total = 0
+        while True:
+            purged = manager.purge_expired_cookies(max_batches=1)
+            if not purged:
+                break
+            batches += 1
+            total += purged
+        elapsed = time.perf_counter() - start
+        print(f"Очищення: {total} cookies за {batches} пакетів, {elapsed:.2f} с "
+              f"({elapsed / max(batches, 1) * 1000:.1f} мс на пакет)")
+        print(f"  Відновлення після очищення: "
+              f"{timed(lambda: manager.restore_cookies(profile_id), args.repeat):.2f} мс")
+        manager.shutdown()
+    finally:
+        ConnectionPool.close_all()
+        shutil.rmtree(data_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Бенчмарк перевірки доменів: дерево міток у пам'яті (домен і батьківські домени)
+проти запитів до security.db - перевірок на секунду, нс на перевірку залежно від розміру
+списків і кількості міток, час побудови знімка та заміна під навантаженням
+"""
+
+import os
+import sys
+import time
+import random
+import shutil
+import tempfile
+import argparse
+import threading
+import tracemalloc
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from browser.database import ConnectionPool
+from browser.domain_matcher import DomainMatcher, DomainLists, ADS
+
+
+TABLES = {
+    'malware_domains': "INSERT OR IGNORE INTO malware_domains (domain, category, added_at, source) "
+                       "VALUES (?, 'malware', ?, 'bench')",
+    'ad_domains': "INSERT OR IGNORE INTO ad_domains (domain, category, added_at) VALUES (?, 'ads', ?)",
+    'tracking_domains': "INSERT OR IGNORE INTO tracking_domains (domain, company, added_at) VALUES (?, '', ?)",
+    'whitelist_domains': "INSERT OR IGNORE INTO whitelist_domains (domain, added_at) VALUES (?, ?)",
+}
+
+
+def random_domain(rng: random.Random) -> str:
+    """Випадковий домен на кшталт тих, що у списках фільтрів"""
+    labels = [''.join(rng.choice("abcdefghijklmnopqrstuvwxyz0123456789-") for _ in range(rng.randint(3, 12)))
+              for _ in range(rng.randint(1, 3))]
+    return '.'.join(labels) + rng.choice([".com", ".net", ".org", ".io", ".ru", ".xyz"])
+
+
+def fill(security_db, rng: random.Random, sizes: dict) -> dict:
+    """Заповнення таблиць security.db (повертає домени кожної таблиці)"""
+    now = datetime.now().isoformat()
+    domains = {}
+    with security_db.pool.transaction(immediate=True) as conn:
+        for table, size in sizes.items():
+            domains[table] = [random_domain(rng) for _ in range(size)]
+            conn.executemany(TABLES[table], [(domain, now) for domain in domains[table]])
+    return domains
+
+
+def subdomain(rng: random.Random, domain: str, depth: int) -> str:
+    """Піддомен заданої глибини"""
+    return '.'.join(random_domain(rng).split('.')[0] for _ in range(depth)) + '.' + domain
+
+
+def reference_classify(sets: dict, domain: str):
+    """Еталон: перебір батьківських доменів від найменш конкретного за множинами списків"""
+    labels = domain.split('.')
+    whitelisted, category, is_ad, is_tracking = False, None, False, False
+    for n in range(len(labels) - 1, -1, -1):
+        suffix = '.'.join(labels[n:])
+        if suffix in sets['whitelist_domains']:
+            whitelisted, category, is_ad, is_tracking = True, None, False, False
+            continue
+        hit = False
+        if suffix in sets['malware_domains']:
+            category, hit = 'malware', True
+        if suffix in sets['ad_domains']:
+            is_ad = hit = True
+        if suffix in sets['tracking_domains']:
+            is_tracking = hit = True
+        if hit:
+            whitelisted = False
+    if whitelisted:
+        return True, None, False, False
+    return False, category, is_ad, is_tracking
+
+
+def sqlite_classify(pool: ConnectionPool, domain: str):
+    """Точний збіг запитами до SQLite (як SecurityDatabase.is_* до знімка в пам'яті)"""
+    if pool.execute("SELECT 1 FROM whitelist_domains WHERE domain = ?", (domain,)).fetchone():
+        return True, None, False, False
+    row = pool.execute("SELECT category FROM malware_domains WHERE domain = ?", (domain,)).fetchone()
+    is_ad = pool.execute("SELECT 1 FROM ad_domains WHERE domain = ?", (domain,)).fetchone() is not None
+    is_tracking = pool.execute("SELECT 1 FROM tracking_domains WHERE domain = ?", (domain,)).fetchone() is not None
+    return False, row[0] if row else None, is_ad, is_tracking
+
+
+def measure(classify, queries: list, repeat: int) -> float:
+    """Секунди на одну перевірку"""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for domain in queries:
+            classify(domain)
+    return (time.perf_counter() - start) / (repeat * len(queries))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк перевірки доменів")
+    parser.add_argument("--domains", type=int, default=200000, help="Доменів у списках (реклама)")
+    parser.add_argument("--queries", type=int, default=20000, help="Різних доменів для перевірки")
+    parser.add_argument("--hit-ratio", type=float, default=0.3, help="Частка доменів зі списків")
+    args = parser.parse_args()
+
+    data_dir = tempfile.mkdtemp(prefix="andetect_bench_")
+    try:
+        # SecurityManager потребує Qt; сховище та знімок перевіряються напряму
+        from browser.security_manager import SecurityDatabase
+
+        rng = random.Random(20)
+        security_db = SecurityDatabase(data_dir)
+        sizes = {
+            'malware_domains': args.domains // 2,
+            'ad_domains': args.domains,
+            'tracking_domains': args.domains // 4,
+            'whitelist_domains': 200,
+        }
+        domains = fill(security_db, rng, sizes)
+        listed = [domain for values in domains.values() for domain in values]
+        # Частина запитів - піддомени доменів зі списків (збіг лише за батьківським доменом)
+        queries = [subdomain(rng, rng.choice(listed), rng.randint(0, 2)).lstrip('.')
+                   if rng.random() < args.hit_ratio else random_domain(rng)
+                   for _ in range(args.queries)]
+
+        start = time.perf_counter()
+        version = security_db.reload_lists()
+        build_ms = (time.perf_counter() - start) * 1000
+        matcher = security_db.matcher
+        tracemalloc.start()
+        lists = matcher.build(security_db.pool)
+        peak = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        del lists
+        print(f"Знімок v{version}: {matcher.lists.domains} доменів за {build_ms:.0f} мс, "
+              f"пам'ять ~{peak / 1024 / 1024:.0f} МБ")
+
+        # Кожна перевірка - 4 списки (білий, malware, реклама, трекери), як check_url_security
+        sqlite_time = measure(lambda domain: sqlite_classify(security_db.pool, domain),
+                              queries[:max(1, args.queries // 10)], 1)
+        memory_time = measure(matcher.classify, queries, 20)
+        # Сторінка: ~200 підресурсів із кількох десятків хостів (дерево в кеші процесора)
+        page = [rng.choice(queries[:60]) for _ in range(200)]
+        page_time = measure(matcher.classify, page, 500)
+        print(f"  SQLite, точний збіг (4 запити) {1 / sqlite_time:>12,.0f} перевірок/с  "
+              f"{sqlite_time * 1e9:>9,.0f} нс")
+        print(f"  Дерево міток з батьківськими  {1 / memory_time:>12,.0f} перевірок/с  "
+              f"{memory_time * 1e9:>9,.0f} нс")
+        print(f"  Те саме, хости сторінки       {1 / page_time:>12,.0f} перевірок/с  "
+              f"{page_time * 1e9:>9,.0f} нс")
+        print(f"  Швидше в x{sqlite_time / memory_time:,.0f} (випадкові хости), "
+              f"x{sqlite_time / page_time:,.0f} (хости сторінки)")
+
+        # Результати збігаються з перебором батьківських доменів
+        sets = {table: set(values) for table, values in domains.items()}
+        mismatches = sum(reference_classify(sets, domain) != matcher.classify(domain) for domain in queries)
+        exact_hits = sum(sqlite_classify(security_db.pool, domain) != (False, None, False, False)
+                         for domain in queries[:2000])
+        suffix_hits = sum(matcher.classify(domain) != (False, None, False, False) for domain in queries[:2000])
+        print(f"  Розбіжностей з еталоном: {mismatches} з {len(queries)}; "
+              f"збігів на 2000 запитів: точний {exact_hits}, з батьківськими {suffix_hits}")
+
+        # Вартість перевірки залежить від кількості міток, а не від розміру списків
+        print("Нс на перевірку (промах/збіг) за розміром списків:")
+        for size in (1000, 10000, 100000, len(listed)):
+            sample = listed[:size]
+            lists = DomainLists()
+            for domain in sample:
+                matcher._insert(lists, domain, ADS)
+            probe = DomainMatcher()
+            probe.swap(lists)
+            hits = [subdomain(rng, rng.choice(sample), 1) for _ in range(5000)]
+            misses = [random_domain(rng) for _ in range(5000)]
+            print(f"  {size:>7} доменів: {measure(probe.classify, misses, 20) * 1e9:>5.0f} / "
+                  f"{measure(probe.classify, hits, 20) * 1e9:>5.0f} нс")
+        print("Нс на перевірку за кількістю міток (піддомени доменів зі списків):")
+        for depth in (0, 1, 2, 4, 8):
+            hits = [subdomain(rng, rng.choice(listed), depth).lstrip('.') for _ in range(5000)]
+            labels = sum(domain.count('.') + 1 for domain in hits) / len(hits)
+            print(f"  ~{labels:>4.1f} міток: {measure(matcher.classify, hits, 20) * 1e9:>5.0f} нс")
+
+        # Заміна знімка під час перевірок з іншого потоку
+        stopping = threading.Event()
+        checked = [0]
+        latencies = []
+
+        def reader():
+            while not stopping.is_set():
+                start = time.perf_counter()
+                for domain in queries[:1000]:
+                    matcher.classify(domain)
+                latencies.append((time.perf_counter() - start) / 1000)
+                checked[0] += 1000
+
+        thread = threading.Thread(target=reader, daemon=True)
+        thread.start()
+        swaps = 5
+        start = time.perf_counter()
+        for _ in range(swaps):
+            security_db.reload_lists()
+        elapsed = time.perf_counter() - start
+        stopping.set()
+        thread.join()
+        latencies.sort()
+        print(f"{swaps} замін знімка за {elapsed * 1000:.0f} мс, паралельно {checked[0]:,} перевірок "
+              f"(p99 {latencies[int(len(latencies) * 0.99)] * 1e9:,.0f} нс, "
+              f"max {latencies[-1] * 1e9:,.0f} нс на перевірку в пачці з 1000)")
+    finally:
+        ConnectionPool.close_all()
+        shutil.rmtree(data_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
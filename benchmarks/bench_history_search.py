@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Бенчмарк пошуку в історії браузінгу: FTS5 (BM25, префікси) проти LIKE-сканування
+"""
+
+import os
+import sys
+import time
+import uuid
+import random
+import itertools
+import shutil
+import tempfile
+import argparse
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from browser.database import ConnectionPool
+from browser.profile_manager import ProfileManager
+from browser.session_manager import SessionManager
+
+
+POPULAR_SITES = ["google", "github", "amazon", "youtube", "facebook", "wikipedia", "reddit",
+                 "twitter", "linkedin", "ebay", "binance", "stackoverflow", "instagram", "olx"]
+POPULAR_WORDS = ["login", "search", "product", "account", "settings", "news", "video", "cart",
+                 "profile", "order", "wallet", "review", "help", "market", "price", "travel"]
+
+
+def random_token(rng: random.Random) -> str:
+    """Випадкове слово"""
+    return ''.join(rng.choice('abcdefghijklmnopqrstuvwxyz') for _ in range(rng.randint(4, 10)))
+
+
+def zipf_weights(count: int) -> list:
+    """Накопичені ваги Ципфа: кілька популярних значень та довгий хвіст"""
+    return list(itertools.accumulate(1.0 / (rank + 1) for rank in range(count)))
+
+
+def generate_history(manager: SessionManager, rows: int, profiles: int, batch: int = 50000):
+    """Генерація історії напряму в таблицю (тригери наповнюють FTS)"""
+    rng = random.Random(42)
+    profile_ids = [str(uuid.UUID(int=rng.getrandbits(128), version=4)) for _ in range(profiles)]
+    base_time = datetime(2024, 1, 1)
+    sites = POPULAR_SITES + [random_token(rng) for _ in range(20000)]
+    words = POPULAR_WORDS + [random_token(rng) for _ in range(50000)]
+    site_weights = zipf_weights(len(sites))
+    word_weights = zipf_weights(len(words))
+
+    for start in range(0, rows, batch):
+        chunk = []
+        for n in range(start, min(start + batch, rows)):
+            site = rng.choices(sites, cum_weights=site_weights)[0]
+            path, first, second = rng.choices(words, cum_weights=word_weights, k=3)
+            chunk.append((
+                profile_ids[n % profiles],
+                f"https://{site}.com/{path}/{n}",
+                f"{site.title()} {first} {second} {rng.randint(1, 99999)}",
+                (base_time + timedelta(seconds=n)).isoformat(),
+                rng.randint(1, 20),
+            ))
+        with manager.pool.transaction() as conn:
+            conn.executemany(
+                "INSERT INTO browsing_history (profile_id, url, title, visit_time, visit_count) "
+                "VALUES (?, ?, ?, ?, ?)", chunk
+            )
+        print(f"\r  {min(start + batch, rows)} / {rows}", end="", flush=True)
+    print()
+    return profile_ids
+
+
+def timed(label: str, repeat: int, func):
+    """Середній час запиту"""
+    func()  # прогрів
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = func()
+    elapsed = (time.perf_counter() - start) / repeat
+    print(f"  {label:<44} {elapsed * 1000:>9.2f} мс  ({len(result)} рез.)")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк пошуку в історії")
+    parser.add_argument("--rows", type=int, default=5000000, help="Рядків історії")
+    parser.add_argument("--profiles", type=int, default=500, help="Кількість профілів")
+    parser.add_argument("--repeat", type=int, default=20, help="Повторів на запит FTS")
+    args = parser.parse_args()
+
+    data_dir = tempfile.mkdtemp(prefix="andetect_bench_")
+    try:
+        manager = SessionManager(ProfileManager(data_dir))
+        print(f"Генерація {args.rows} рядків історії для {args.profiles} профілів...")
+        start = time.perf_counter()
+        profile_ids = generate_history(manager, args.rows, args.profiles)
+        print(f"  {time.perf_counter() - start:.1f} с, база "
+              f"{os.path.getsize(manager.db_path) / 1024 / 1024:.0f} МБ")
+
+        profile_id = profile_ids[len(profile_ids) // 2]
+        queries = [
+            ("'binance' (усі профілі)", "binance", None),
+            ("'stackov' префікс (усі профілі)", "stackov", None),
+            ("'github wallet' (усі профілі)", "github wallet", None),
+            ("'amazon cart' (один профіль)", "amazon cart", profile_id),
+        ]
+
+        print("FTS5 + BM25:")
+        fts_times = [
+            timed(label, args.repeat, lambda q=query, p=pid: manager.search_history(q, p, limit=50))
+            for label, query, pid in queries
+        ]
+        timed("'github' сторінка 10 (offset 450)", args.repeat,
+              lambda: manager.search_history("github", limit=50, offset=450))
+
+        print("LIKE-сканування (без FTS):")
+        manager.state.history_fts_enabled = False
+        like_times = [
+            timed(label, 1, lambda q=query, p=pid: manager.search_history(q, p, limit=50))
+            for label, query, pid in queries
+        ]
+        manager.state.history_fts_enabled = True
+
+        speedups = ', '.join(f"x{like / fts:.0f}" for fts, like in zip(fts_times, like_times))
+        print(f"Прискорення: {speedups}")
+        manager.shutdown()
+    finally:
+        ConnectionPool.close_all()
+        shutil.rmtree(data_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
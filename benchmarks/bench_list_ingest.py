@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Бенчмарк оновлення списків безпеки з локального HTTP-сервера: запис по домену
+(add_*_domain, транзакція на рядок) проти потокового розбору з пакетним завантаженням
+у проміжну таблицю та атомарною заміною - записів/с і очікування паралельного запису
+"""
+
+import os
+import sys
+import time
+import random
+import shutil
+import tempfile
+import argparse
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from browser.database import ConnectionPool
+from bench_domain_matcher import random_domain
+from bench_adblock_engine import synthetic_list
+
+
+class ListHandler(BaseHTTPRequestHandler):
+    """Віддача списків-фікстур блоками, як віддалений сервер"""
+
+    lists = {}
+
+    def do_GET(self):
+        body = self.lists.get(self.path)
+        if body is None:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        for offset in range(0, len(body), 16 * 1024):
+            self.wfile.write(body[offset:offset + 16 * 1024])
+
+    def log_message(self, *args):
+        pass
+
+
+class WriterProbe:
+    """Паралельний запис (додавання в білий список) під час оновлення: найдовше очікування"""
+
+    def __init__(self, security_db, rng: random.Random):
+        self.security_db = security_db
+        self.domains = [random_domain(rng) for _ in range(100000)]
+        self.stopping = threading.Event()
+        self.waits = []
+        self.thread = threading.Thread(target=self.run, daemon=True)
+
+    def run(self):
+        while not self.stopping.is_set():
+            start = time.perf_counter()
+            self.security_db.add_to_whitelist(self.domains[len(self.waits) % len(self.domains)])
+            self.waits.append(time.perf_counter() - start)
+            time.sleep(0.005)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *args):
+        self.stopping.set()
+        self.thread.join()
+
+
+def per_line_update(security_db, url: str) -> int:
+    """Попередній шлях оновлення: весь текст у пам'яті та add_malware_domain на кожен рядок"""
+    response = requests.get(url, timeout=30)
+    count = 0
+    for line in response.text.split('\n'):
+        line = line.strip()
+        if line and not line.startswith('#') and not line.startswith('!'):
+            domain = line.replace('0.0.0.0 ', '').replace('127.0.0.1 ', '')
+            if domain and '.' in domain:
+                security_db.add_malware_domain(domain, "malware", "malware-filter", live=False)
+                count += 1
+    return count
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк оновлення списків безпеки")
+    parser.add_argument("--domains", type=int, default=100000, help="Доменів у списку шкідливих сайтів")
+    parser.add_argument("--rules", type=int, default=70000, help="Рядків у списку EasyList")
+    parser.add_argument("--baseline", type=int, default=10000, help="Доменів для запису по рядку")
+    args = parser.parse_args()
+
+    rng = random.Random(24)
+    malware = [random_domain(rng) for _ in range(args.domains)]
+    ListHandler.lists = {
+        "/malware.txt": ("# malware-filter\n" + "".join(f"0.0.0.0 {domain}\n" for domain in malware)).encode(),
+        "/baseline.txt": "".join(f"0.0.0.0 {domain}\n" for domain in malware[:args.baseline]).encode(),
+        "/easylist.txt": "\n".join(synthetic_list(rng, args.rules)).encode(),
+        "/easyprivacy.txt": "\n".join(synthetic_list(rng, args.rules // 4)).encode(),
+    }
+    server = ThreadingHTTPServer(("127.0.0.1", 0), ListHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    data_dir = tempfile.mkdtemp(prefix="andetect_bench_")
+    try:
+        from browser.security_manager import SecurityDatabase, SecurityListUpdater
+
+        # Попередній шлях: транзакція та фіксація на кожен домен
+        baseline_dir = os.path.join(data_dir, "baseline")
+        os.makedirs(baseline_dir)
+        security_db = SecurityDatabase(baseline_dir)
+        with WriterProbe(security_db, rng) as probe:
+            start = time.perf_counter()
+            count = per_line_update(security_db, base_url + "/baseline.txt")
+            elapsed = time.perf_counter() - start
+        print(f"Запис по домену:          {count:>7} доменів за {elapsed:>6.2f} с  "
+              f"{count / elapsed:>9,.0f} записів/с  (паралельний запис: max {max(probe.waits) * 1000:.0f} мс)")
+
+        # Потоковий розбір, пакетне завантаження та заміна таблиці
+        security_db = SecurityDatabase(data_dir)
+        security_db.add_malware_domain("manual.example", "phishing")
+        updater = SecurityListUpdater(security_db)
+        updater.MALWARE_LIST_URL = base_url + "/malware.txt"
+        updater.AD_LIST_URL = base_url + "/easylist.txt"
+        updater.TRACKING_LIST_URL = base_url + "/easyprivacy.txt"
+        reports = []
+        updater.update_completed.connect(lambda *report: reports.append(report))
+        updater.update_failed.connect(lambda list_type, error: print(f"  Помилка {list_type}: {error}"))
+
+        for name, update in (("malware", updater.update_malware_list), ("ads", updater.update_ad_list),
+                             ("tracking", updater.update_tracking_list)):
+            with WriterProbe(security_db, rng) as probe:
+                start = time.perf_counter()
+                update()
+                elapsed = time.perf_counter() - start
+            list_type, count, rate = reports[-1]
+            print(f"Проміжна таблиця ({name:<8}) {count:>7} записів за {elapsed:>6.2f} с  "
+                  f"{rate:>9,.0f} записів/с  (паралельний запис: max {max(probe.waits) * 1000:.0f} мс)")
+
+        start = time.perf_counter()
+        security_db.reload_lists(write_snapshot=True)
+        probe = rng.choice(malware)
+        print(f"Новий знімок за {(time.perf_counter() - start) * 1000:.0f} мс: "
+              f"{probe} -> {security_db.is_malware_domain(probe)}, "
+              f"manual.example -> {security_db.is_malware_domain('manual.example')}")
+
+        # Оновлення, що змінює половину списку, замінює рядки (а не додає їх) і видаляє застарілий знімок
+        changed = malware[::2] + [random_domain(rng) for _ in malware[1::2]]
+        ListHandler.lists["/malware.txt"] = "".join(f"0.0.0.0 {domain}\n" for domain in changed).encode()
+        updater.update_malware_list()
+        rows = security_db.pool.execute("SELECT COUNT(*) FROM malware_domains").fetchone()[0]
+        manual = security_db.pool.execute(
+            "SELECT category FROM malware_domains WHERE domain = 'manual.example'").fetchone()
+        print(f"Після повторного оновлення: {rows} рядків malware_domains ({reports[-1][1]} зі списку), "
+              f"ручний запис {'збережено' if manual else 'втрачено'}, "
+              f"знімок {'є' if os.path.exists(security_db.snapshot_path) else 'видалено'}")
+    finally:
+        server.shutdown()
+        ConnectionPool.close_all()
+        shutil.rmtree(data_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
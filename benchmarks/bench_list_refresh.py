@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Бенчмарк оновлення списків безпеки з локального HTTP-сервера з ETag/Last-Modified:
+повне послідовне перезавантаження проти умовних запитів (304), пропуску того самого
+вмісту за хешем і запису лише доданих та видалених доменів при зміні списку
+"""
+
+import os
+import sys
+import time
+import random
+import shutil
+import hashlib
+import tempfile
+import argparse
+import threading
+from email.utils import formatdate
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+import requests
+from PyQt5.QtCore import QCoreApplication
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from browser.database import ConnectionPool
+from bench_domain_matcher import random_domain
+from bench_adblock_engine import synthetic_list
+from bench_list_ingest import WriterProbe
+
+
+class ListHandler(BaseHTTPRequestHandler):
+    """Списки-фікстури з ETag і Last-Modified; conditional=False - сервер без умовних запитів"""
+
+    lists = {}
+    conditional = True
+    latency = 0.0
+    served = []
+
+    def do_GET(self):
+        time.sleep(self.latency)
+        entry = self.lists.get(self.path)
+        if entry is None:
+            self.send_error(404)
+            return
+        body, etag, last_modified = entry
+        if self.conditional and self.headers.get('If-None-Match') == etag:
+            self.served.append((self.path, 304))
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+        self.served.append((self.path, 200))
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain")
+        self.send_header("Content-Length", str(len(body)))
+        if self.conditional:
+            self.send_header("ETag", etag)
+            self.send_header("Last-Modified", last_modified)
+        self.end_headers()
+        for offset in range(0, len(body), 16 * 1024):
+            self.wfile.write(body[offset:offset + 16 * 1024])
+
+    def log_message(self, *args):
+        pass
+
+    @classmethod
+    def publish(cls, path: str, lines: list):
+        """Нова версія списку на сервері"""
+        body = "\n".join(lines).encode()
+        cls.lists[path] = (body, f'"{hashlib.sha1(body).hexdigest()}"', formatdate(time.time(), usegmt=True))
+
+
+def mutate(rng: random.Random, lines: list, fresh: list, share: float) -> list:
+    """Список із частиною рядків, заміненою новими (заголовок з новою версією)"""
+    body = [line for line in lines[2:] if rng.random() >= share]
+    body += fresh[:len(lines) - 2 - len(body)]
+    return [lines[0], f"! Version: {rng.randint(10 ** 8, 10 ** 9)}"] + body
+
+
+def timed(name: str, action, security_db, rng: random.Random, events: list):
+    """Оновлення з паралельним записом: час, запити до сервера, події оновлювача"""
+    ListHandler.served.clear()
+    events.clear()
+    with WriterProbe(security_db, rng) as probe:
+        start = time.perf_counter()
+        action()
+        elapsed = time.perf_counter() - start
+    # Сигнали з потоків пулу доставляються через цикл подій
+    QCoreApplication.processEvents()
+    statuses = ', '.join(f"{path.strip('/')}={status}" for path, status in sorted(ListHandler.served))
+    print(f"  {name:<40} {elapsed:>6.2f} с  (паралельний запис: max {max(probe.waits) * 1000:>4.0f} мс)  "
+          f"{statuses}")
+    for event in events:
+        print(f"      {event}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк умовного оновлення списків безпеки")
+    parser.add_argument("--domains", type=int, default=100000, help="Доменів у списку шкідливих сайтів")
+    parser.add_argument("--rules", type=int, default=70000, help="Рядків у списку EasyList")
+    parser.add_argument("--change", type=float, default=0.01, help="Частка рядків, що змінюється")
+    parser.add_argument("--latency", type=float, default=0.2, help="Затримка відповіді сервера, с")
+    args = parser.parse_args()
+
+    rng = random.Random(25)
+    malware = ["# malware-filter"] + [f"0.0.0.0 {random_domain(rng)}" for _ in range(args.domains)]
+    # Домен, доданий вручну, є і в списку: рядок лишається за ручним джерелом
+    malware.insert(2, "0.0.0.0 manual.example")
+    easylist = synthetic_list(rng, args.rules)
+    easyprivacy = synthetic_list(rng, args.rules // 4)
+    ListHandler.latency = args.latency
+    ListHandler.publish("/malware.txt", malware)
+    ListHandler.publish("/easylist.txt", easylist)
+    ListHandler.publish("/easyprivacy.txt", easyprivacy)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), ListHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    app = QCoreApplication.instance() or QCoreApplication([])
+    data_dir = tempfile.mkdtemp(prefix="andetect_bench_")
+    try:
+        from browser.security_manager import SecurityDatabase, SecurityListUpdater
+
+        security_db = SecurityDatabase(data_dir)
+        security_db.add_malware_domain("manual.example", "phishing")
+        events = []
+
+        def updater() -> SecurityListUpdater:
+            list_updater = SecurityListUpdater(security_db)
+            list_updater.MALWARE_LIST_URL = base_url + "/malware.txt"
+            list_updater.AD_LIST_URL = base_url + "/easylist.txt"
+            list_updater.TRACKING_LIST_URL = base_url + "/easyprivacy.txt"
+            list_updater.update_completed.connect(
+                lambda list_type, count, rate: events.append(f"{list_type}: {count} записів, {rate:,.0f} записів/с"))
+            list_updater.update_failed.connect(lambda list_type, error: events.append(f"помилка {list_type}: {error}"))
+            list_updater.list_unchanged.connect(lambda list_type: events.append(f"{list_type}: без змін"))
+            list_updater.lists_swapped.connect(lambda version: events.append(f"новий знімок, версія {version}"))
+            return list_updater
+
+        def full_reload():
+            """Попередній шлях: кожен список повністю і послідовно, заміна таблиць, перебудова всього"""
+            for path, table, source, category in (
+                    ("/malware.txt", 'malware_domains', "malware-filter", "malware"),
+                    ("/easylist.txt", 'ad_domains', "easylist", "ads"),
+                    ("/easyprivacy.txt", 'tracking_domains', "easyprivacy", "tracker")):
+                with requests.get(base_url + path, timeout=30, stream=True) as response:
+                    response.encoding = 'utf-8'
+                    lines = response.iter_lines(chunk_size=SecurityListUpdater.STREAM_CHUNK_SIZE,
+                                                decode_unicode=True)
+                    if table == 'malware_domains':
+                        domains = list(SecurityListUpdater.parse_host_list(lines))
+                    else:
+                        rules, domains = SecurityListUpdater.parse_filter_list(lines)
+                        security_db.replace_filter_rules(source, rules)
+                    security_db.replace_list(table, source, ((domain, category) for domain in domains))
+            security_db.reload_filter_engine()
+            security_db.reload_lists(write_snapshot=True)
+
+        print(f"Списки: {args.domains} доменів, {args.rules} + {args.rules // 4} правил; "
+              f"затримка сервера {args.latency * 1000:.0f} мс, змінюється {args.change:.0%} рядків")
+        timed("перше завантаження (паралельно)", lambda: updater().run(), security_db, rng, events)
+        timed("повне перезавантаження (як раніше)", full_reload, security_db, rng, events)
+        timed("без змін: 304", lambda: updater().run(), security_db, rng, events)
+
+        ListHandler.conditional = False
+        timed("без змін: сервер без ETag (хеш)", lambda: updater().run(), security_db, rng, events)
+        ListHandler.conditional = True
+
+        # Зміна частини рядків кожного списку
+        fresh_domains = [f"0.0.0.0 {random_domain(rng)}" for _ in range(int(args.domains * args.change * 2) + 10)]
+        new_malware = mutate(rng, malware, fresh_domains, args.change)
+        new_easylist = mutate(rng, easylist, synthetic_list(rng, int(args.rules * args.change * 2) + 10)[2:],
+                              args.change)
+        ListHandler.publish("/malware.txt", new_malware)
+        ListHandler.publish("/easylist.txt", new_easylist)
+        timed(f"змінено {args.change:.0%} (різниця)", lambda: updater().run(), security_db, rng, events)
+
+        # Сховище відповідає новим спискам, ручний запис збережено, перевірки - за новими списками
+        expected = set(SecurityListUpdater.parse_host_list(new_malware)) - {"manual.example"}
+        stored = {domain for (domain,) in security_db.pool.execute(
+            "SELECT domain FROM malware_domains WHERE source = 'malware-filter'")}
+        expected_rules = set(SecurityListUpdater.parse_filter_list(new_easylist)[0])
+        stored_rules = {rule for (rule,) in security_db.pool.execute(
+            "SELECT rule FROM filter_rules WHERE list_name = 'easylist'")}
+        removed = next(iter(set(SecurityListUpdater.parse_host_list(malware)) - expected - {"manual.example"}))
+        added = next(iter(expected - set(SecurityListUpdater.parse_host_list(malware))))
+        (manual_source,) = security_db.pool.execute(
+            "SELECT source FROM malware_domains WHERE domain = 'manual.example'").fetchone()
+        print(f"Перевірка: домени {'збігаються' if stored == expected else 'НЕ збігаються'} зі списком, "
+              f"правила {'збігаються' if stored_rules == expected_rules else 'НЕ збігаються'}, "
+              f"ручний запис {security_db.is_malware_domain('manual.example')} (джерело {manual_source}), "
+              f"видалений {removed} -> {security_db.is_malware_domain(removed)[0]}, "
+              f"доданий {added} -> {security_db.is_malware_domain(added)[0]}")
+        for row in security_db.pool.execute(
+                "SELECT name, entry_count, added, removed, etag IS NOT NULL FROM filter_lists ORDER BY name"):
+            print(f"  {row[0]:<16} {row[1]:>7} записів, +{row[2]} / -{row[3]}, ETag: {'так' if row[4] else 'ні'}")
+    finally:
+        server.shutdown()
+        ConnectionPool.close_all()
+        shutil.rmtree(data_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
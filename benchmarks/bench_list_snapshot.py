@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Бенчмарк скомпільованого знімка списків безпеки: запуск (відкриття security.db
+в окремому процесі) зі знімком через mmap проти побудови списків із SQLite,
+пам'ять процесу, швидкість перевірок і відкат на SQLite при пошкодженому знімку
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import tempfile
+import argparse
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from browser.database import ConnectionPool
+from browser.domain_matcher import ListSnapshot
+from bench_domain_matcher import fill, random_domain, subdomain, measure
+
+
+# Запуск у новому процесі: час відкриття бази безпеки та пам'ять процесу
+STARTUP_SCRIPT = """
+import sys, time, json
+sys.path.insert(0, sys.argv[1])
+from browser.security_manager import SecurityDatabase
+
+def memory():
+    status = dict(line.split(':', 1) for line in open('/proc/self/status'))
+    return {key: int(status[key].split()[0]) for key in ('VmRSS', 'RssAnon', 'RssFile')}
+
+before = memory()
+start = time.perf_counter()
+security_db = SecurityDatabase(sys.argv[2])
+elapsed = time.perf_counter() - start
+verdict = security_db.matcher.classify(sys.argv[3])
+after = memory()
+print(json.dumps({
+    'ms': elapsed * 1000,
+    'snapshot': security_db.matcher.lists.snapshot is not None,
+    'anon_kb': after['RssAnon'] - before['RssAnon'],
+    'file_kb': after['RssFile'] - before['RssFile'],
+    'verdict': list(verdict),
+}))
+"""
+
+
+def startup(data_dir: str, probe: str) -> dict:
+    """Відкриття бази безпеки в окремому процесі"""
+    output = subprocess.run(
+        [sys.executable, "-c", STARTUP_SCRIPT, ROOT, data_dir, probe],
+        capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def report(name: str, result: dict):
+    """Рядок результату запуску"""
+    print(f"  {name:<34} {result['ms']:>8.0f} мс  +{result['anon_kb'] / 1024:>5.0f} МБ власної пам'яті, "
+          f"+{result['file_kb'] / 1024:>4.0f} МБ спільних сторінок файлів "
+          f"({'знімок' if result['snapshot'] else 'SQLite'})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк скомпільованого знімка списків")
+    parser.add_argument("--domains", type=int, default=200000, help="Доменів у списках (реклама)")
+    parser.add_argument("--queries", type=int, default=20000, help="Різних доменів для перевірки")
+    parser.add_argument("--runs", type=int, default=3, help="Запусків процесу на варіант")
+    args = parser.parse_args()
+
+    data_dir = tempfile.mkdtemp(prefix="andetect_bench_")
+    try:
+        from browser.security_manager import SecurityDatabase
+
+        rng = random.Random(22)
+        security_db = SecurityDatabase(data_dir)
+        domains = fill(security_db, rng, {
+            'malware_domains': args.domains // 2,
+            'ad_domains': args.domains,
+            'tracking_domains': args.domains // 4,
+            'whitelist_domains': 200,
+        })
+        listed = [domain for values in domains.values() for domain in values]
+        probe = subdomain(rng, rng.choice(domains['ad_domains']), 1)
+
+        start = time.perf_counter()
+        security_db.reload_lists()
+        build_ms = (time.perf_counter() - start) * 1000
+        start = time.perf_counter()
+        size = ListSnapshot.write(security_db.snapshot_path, security_db.matcher.lists)
+        write_ms = (time.perf_counter() - start) * 1000
+        trie = security_db.matcher
+        ConnectionPool.close_all()
+        print(f"{trie.lists.domains} доменів: дерево з SQLite {build_ms:.0f} мс, "
+              f"компіляція знімка {write_ms:.0f} мс, файл {size / 1024 / 1024:.1f} МБ")
+
+        print(f"Запуск (найкращий з {args.runs}, окремий процес):")
+        with_snapshot = min((startup(data_dir, probe) for _ in range(args.runs)), key=lambda r: r['ms'])
+        report("зі знімком (mmap)", with_snapshot)
+
+        results = []
+        for _ in range(args.runs):
+            os.remove(security_db.snapshot_path)
+            results.append(startup(data_dir, probe))
+        report("без знімка (SQLite + компіляція)", min(results, key=lambda r: r['ms']))
+
+        with open(security_db.snapshot_path, 'r+b') as f:
+            f.seek(size // 2)
+            byte = f.read(1)
+            f.seek(size // 2)
+            f.write(bytes([byte[0] ^ 0xFF]))
+        corrupted = startup(data_dir, probe)
+        report("пошкоджений знімок", corrupted)
+        print(f"  Результат перевірки {probe}: {with_snapshot['verdict']} / {corrupted['verdict']}")
+
+        # Перевірки за знімком проти дерева в пам'яті
+        snapshot_db = SecurityDatabase(data_dir)
+        matcher = snapshot_db.matcher
+        queries = [subdomain(rng, rng.choice(listed), rng.randint(0, 2)).lstrip('.')
+                   if rng.random() < 0.3 else random_domain(rng) for _ in range(args.queries)]
+        mismatches = sum(matcher.classify(domain) != trie.classify(domain) for domain in queries)
+        page = [rng.choice(queries[:60]) for _ in range(200)]
+        print(f"Перевірка домену (розбіжностей знімка з деревом: {mismatches} з {len(queries)}):")
+        for name, classify in (("дерево в пам'яті", trie.classify), ("знімок mmap", matcher.classify)):
+            print(f"  {name:<18} {measure(classify, queries, 5) * 1e9:>6,.0f} нс (випадкові хости), "
+                  f"{measure(classify, page, 200) * 1e9:>6,.0f} нс (хости сторінки)")
+        # Відображення файлу закривається до видалення каталогу (на Windows інакше не видалити)
+        matcher.lists.snapshot.close()
+    finally:
+        ConnectionPool.close_all()
+        shutil.rmtree(data_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
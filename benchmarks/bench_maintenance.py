@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Бенчмарк обслуговування бази після масового видалення історії:
+інкрементальне звільнення сторінок порціями проти повного VACUUM
+(повернене місце, час та затримки паралельного запису)
+"""
+
+import os
+import sys
+import time
+import shutil
+import tempfile
+import argparse
+import threading
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from browser import database
+from browser.database import ConnectionPool
+from browser.maintenance import DatabaseMaintenance
+from browser.profile_state import ProfileStateStore
+
+
+def fill_history(store: ProfileStateStore, rows: int, profiles: int, batch: int = 20000):
+    """Рік історії кількох профілів напряму в таблицю"""
+    step = 365 * 86400 / rows
+    base_time = datetime.now() - timedelta(days=365)
+    for start in range(0, rows, batch):
+        with store.pool.transaction() as conn:
+            conn.executemany(
+                "INSERT INTO browsing_history (profile_id, url, title, visit_time, visit_count) "
+                "VALUES (?, ?, ?, ?, 1)",
+                [
+                    (f"profile-{n % profiles}", f"https://site{n % 5000}.example.com/page/{n}",
+                     f"Сторінка {n} сайту {n % 5000}", (base_time + timedelta(seconds=n * step)).isoformat())
+                    for n in range(start, min(start + batch, rows))
+                ]
+            )
+    DatabaseMaintenance("sessions.db", store.pool).checkpoint()
+
+
+def prepare(path: str, rows: int, profiles: int) -> ProfileStateStore:
+    """База, з якої видалено історію старшу за пів року (clear_history для кожного профілю)"""
+    store = ProfileStateStore(ConnectionPool(path))
+    fill_history(store, rows, profiles)
+    for profile in range(profiles):
+        store.clear_history(f"profile-{profile}", older_than_days=182)
+    DatabaseMaintenance("sessions.db", store.pool).checkpoint()
+    return store
+
+
+class Writer(threading.Thread):
+    """Паралельний запис відвідувань (як HistoryWriter) із затримками кожного коміту"""
+
+    def __init__(self, pool: ConnectionPool):
+        super().__init__(daemon=True)
+        self.pool = pool
+        self.latencies = []
+        self.stopping = threading.Event()
+
+    def run(self):
+        n = 0
+        while not self.stopping.is_set():
+            start = time.perf_counter()
+            with self.pool.transaction(immediate=True) as conn:
+                conn.execute(
+                    "INSERT INTO browsing_history (profile_id, url, title, visit_time) VALUES (?, ?, ?, ?)",
+                    ("profile-1", f"https://writer.example.com/{n}", "Запис", datetime.now().isoformat())
+                )
+            self.latencies.append(time.perf_counter() - start)
+            n += 1
+            time.sleep(0.002)
+
+    def stop(self) -> list:
+        self.stopping.set()
+        self.join()
+        return sorted(self.latencies)
+
+
+def mb(size: int) -> str:
+    """Розмір у МБ"""
+    return f"{size / 1024 / 1024:.1f} МБ"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк обслуговування баз")
+    parser.add_argument("--rows", type=int, default=400000, help="Рядків історії")
+    parser.add_argument("--profiles", type=int, default=40, help="Кількість профілів")
+    parser.add_argument("--budget", type=float, default=DatabaseMaintenance.VACUUM_TIME_BUDGET,
+                        help="Бюджет часу звільнення сторінок на прохід (с)")
+    args = parser.parse_args()
+
+    data_dir = tempfile.mkdtemp(prefix="andetect_bench_")
+    try:
+        print(f"{args.rows} рядків історії за рік, {args.profiles} профілів, видалено історію старшу за пів року")
+
+        # Інкрементальний режим (нові бази створюються з auto_vacuum=INCREMENTAL)
+        store = prepare(os.path.join(data_dir, "incremental.db"), args.rows, args.profiles)
+        maintenance = DatabaseMaintenance("incremental.db", store.pool)
+        size_before = maintenance.disk_size()
+        print(f"  Розмір {mb(size_before)}, вільних сторінок {maintenance.pragma('freelist_count')}")
+
+        writer = Writer(store.pool)
+        writer.start()
+        passes = []
+        while maintenance.pragma("freelist_count"):
+            passes.append(maintenance.run(['vacuum', 'checkpoint'], args.budget))
+            time.sleep(0.05)  # між проходами база вільна для інших записів
+        latencies = writer.stop()
+        total_ms = sum(report.elapsed_ms for report in passes)
+        print(f"Інкрементально ({args.budget * 1000:.0f} мс на прохід): {len(passes)} проходів, "
+              f"{total_ms:.0f} мс, звільнено {mb(size_before - maintenance.disk_size())}")
+        print(f"  Запис під час обслуговування: p99 {latencies[int(len(latencies) * 0.99)] * 1000:.1f} мс, "
+              f"max {latencies[-1] * 1000:.1f} мс ({len(latencies)} комітів)")
+
+        start = time.perf_counter()
+        report = maintenance.run(['analyze', 'integrity'])
+        print(f"  ANALYZE + quick_check: {report.task_ms} ({report.integrity}), "
+              f"{(time.perf_counter() - start) * 1000:.0f} мс")
+        store.close()
+
+        # Стара база без auto_vacuum: повний VACUUM за один раз
+        database.DEFAULT_AUTO_VACUUM = "NONE"
+        store = prepare(os.path.join(data_dir, "full.db"), args.rows, args.profiles)
+        maintenance = DatabaseMaintenance("full.db", store.pool)
+        size_before = maintenance.disk_size()
+
+        writer = Writer(store.pool)
+        writer.start()
+        time.sleep(0.05)
+        start = time.perf_counter()
+        store.pool.execute("VACUUM")
+        elapsed = (time.perf_counter() - start) * 1000
+        latencies = writer.stop()
+        maintenance.checkpoint()
+        print(f"Повний VACUUM: {elapsed:.0f} мс одним блокуванням, "
+              f"звільнено {mb(size_before - maintenance.disk_size())}")
+        print(f"  Запис під час обслуговування: p99 {latencies[int(len(latencies) * 0.99)] * 1000:.1f} мс, "
+              f"max {latencies[-1] * 1000:.1f} мс ({len(latencies)} комітів)")
+        store.close()
+    finally:
+        ConnectionPool.close_all()
+        shutil.rmtree(data_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Бенчмарк кешу профілів: холодне та гаряче оновлення списку
+"""
+
+import os
+import sys
+import time
+import shutil
+import tempfile
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from browser.profile_manager import ProfileManager
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк кешу профілів")
+    parser.add_argument("--profiles", type=int, default=10000, help="Кількість профілів")
+    args = parser.parse_args()
+
+    data_dir = tempfile.mkdtemp(prefix="andetect_bench_")
+    try:
+        manager = ProfileManager(data_dir)
+        print(f"Створення {args.profiles} профілів...")
+        for i in range(args.profiles):
+            manager.create_profile(f"Profile {i}")
+
+        # Холодний старт: кеш порожній
+        manager.cache.clear()
+        manager.cache.reset_stats()
+        start = time.perf_counter()
+        manager.get_all_profiles()
+        cold = time.perf_counter() - start
+        print(f"Холодне оновлення: {cold * 1000:.1f} мс, {manager.get_cache_stats()}")
+
+        # Гаряче оновлення: все з кешу, без розшифрування
+        manager.cache.reset_stats()
+        start = time.perf_counter()
+        manager.get_all_profiles()
+        warm = time.perf_counter() - start
+        stats = manager.get_cache_stats()
+        print(f"Гаряче оновлення: {warm * 1000:.1f} мс, {stats}")
+        print(f"Розшифровано при гарячому оновленні: {stats['misses']}")
+    finally:
+        shutil.rmtree(data_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Бенчмарк шифрування профілів: Fernet (TEXT) проти конверта v1 AES-GCM (BLOB)
+Швидкість розшифрування та розмір бази до і після фонової міграції
+"""
+
+import os
+import sys
+import time
+import shutil
+import tempfile
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from browser.database import ConnectionPool
+from browser.profile_manager import ProfileManager
+
+
+def database_size(manager: ProfileManager) -> int:
+    """Розмір profiles.db після VACUUM та контрольної точки WAL"""
+    manager.pool.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    manager.pool.execute("VACUUM")
+    manager.pool.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    return os.path.getsize(manager.db_path)
+
+
+def payload_size(manager: ProfileManager) -> int:
+    """Сумарний розмір зашифрованих даних профілів"""
+    return manager.pool.execute("SELECT SUM(length(CAST(data AS BLOB))) FROM profiles").fetchone()[0]
+
+
+def decrypt_rate(manager: ProfileManager) -> float:
+    """Розшифрування всіх профілів (профілів/с)"""
+    rows = manager.pool.execute("SELECT data FROM profiles").fetchall()
+    start = time.perf_counter()
+    for (data,) in rows:
+        manager.decrypt_profile(data)
+    return len(rows) / (time.perf_counter() - start)
+
+
+def report(label: str, manager: ProfileManager):
+    """Вивід метрик для поточного формату"""
+    rate = decrypt_rate(manager)
+    size = database_size(manager)
+    payload = payload_size(manager)
+    print(f"  {label:<22} {rate:>10.0f} проф/с  база {size / 1024 / 1024:>6.2f} МБ  "
+          f"дані {payload / 1024 / 1024:>6.2f} МБ")
+    return rate, size
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк шифрування профілів")
+    parser.add_argument("--profiles", type=int, default=10000, help="Кількість профілів")
+    args = parser.parse_args()
+
+    data_dir = tempfile.mkdtemp(prefix="andetect_bench_")
+    try:
+        manager = ProfileManager(data_dir)
+        print(f"Створення {args.profiles} профілів...")
+        manager.create_profiles_bulk(args.profiles, name_pattern="Profile {n}")
+
+        # Переводимо всі рядки у старий формат Fernet (як у існуючих базах)
+        rows = manager.pool.execute("SELECT id, data FROM profiles").fetchall()
+        with manager.pool.transaction() as conn:
+            conn.executemany(
+                "UPDATE profiles SET data = ? WHERE id = ?",
+                ((manager.cipher.fernet.encrypt(manager.cipher.decrypt(data)).decode(), profile_id)
+                 for profile_id, data in rows)
+            )
+
+        print("Результати:")
+        before_rate, before_size = report("Fernet (TEXT)", manager)
+
+        start = time.perf_counter()
+        migrators = manager.start_reencryption(batch_size=500, pause=0)
+        for migrator in migrators:
+            migrator.join()
+        elapsed = time.perf_counter() - start
+        print(f"  Міграція: {migrators[0].stats()} за {elapsed:.2f} с")
+
+        after_rate, after_size = report("AES-GCM v1 (BLOB)", manager)
+        print(f"Розшифрування x{after_rate / before_rate:.1f}, "
+              f"розмір бази -{(1 - after_size / before_size) * 100:.0f}%")
+    finally:
+        ConnectionPool.close_all()
+        shutil.rmtree(data_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Бенчмарк пам'яті профілів: звичайний dataclass проти __slots__ з інтернуванням рядків
+"""
+
+import os
+import sys
+import json
+import shutil
+import tempfile
+import argparse
+import tracemalloc
+from dataclasses import MISSING, make_dataclass, field, fields
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from browser.profile_manager import ProfileManager, BrowserProfile, ProfileSummary
+
+
+def plain_copy(cls):
+    """Звичайний dataclass з тими ж полями (як було до __slots__)"""
+    return make_dataclass(
+        f"Plain{cls.__name__}",
+        [(f.name, f.type) if f.default is MISSING else (f.name, f.type, field(default=f.default))
+         for f in fields(cls)]
+    )
+
+
+def measure(label: str, build) -> int:
+    """Пам'ять, яку утримує список об'єктів"""
+    tracemalloc.start()
+    objects = build()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"  {label:<36} {current / 1024 / 1024:>7.1f} МБ  ({current / len(objects):.0f} Б/профіль)")
+    del objects
+    return current
+
+
+def run(manager: ProfileManager, count: int):
+    """Порівняння пам'яті повних профілів та коротких записів"""
+    payloads = []
+    summary_rows = []
+    for i, profile_data in enumerate(manager.generate_random_profiles_data(count)):
+        profile = manager.build_profile(f"Profile {i}", profile_data, now="2024-01-01T00:00:00")
+        # JSON як після розшифрування: кожен рядок - окремий об'єкт
+        payloads.append(json.dumps(profile.to_dict()))
+        summary_rows.append(json.dumps(
+            [profile.id, profile.name, profile.last_used] + list(manager.plain_values(profile))
+        ))
+
+    PlainProfile = plain_copy(BrowserProfile)
+    PlainSummary = plain_copy(ProfileSummary)
+
+    print(f"Повні профілі ({count}):")
+    before = measure("dataclass з __dict__", lambda: [PlainProfile(**json.loads(p)) for p in payloads])
+    after = measure("__slots__ + інтернування", lambda: [BrowserProfile.from_dict(json.loads(p)) for p in payloads])
+    print(f"  економія: {(1 - after / before) * 100:.0f}%")
+
+    print(f"Короткі записи для списків ({count}):")
+    before = measure("dataclass з __dict__", lambda: [PlainSummary(*json.loads(r)) for r in summary_rows])
+    after = measure("__slots__ + інтернування", lambda: [ProfileSummary.from_row(json.loads(r)) for r in summary_rows])
+    print(f"  економія: {(1 - after / before) * 100:.0f}%")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк пам'яті профілів")
+    parser.add_argument("--profiles", type=int, default=50000, help="Кількість профілів")
+    args = parser.parse_args()
+
+    data_dir = tempfile.mkdtemp(prefix="andetect_bench_")
+    try:
+        run(ProfileManager(data_dir), args.profiles)
+    finally:
+        shutil.rmtree(data_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Бенчмарк SQL-фільтрації профілів (FTS5 + індексовані колонки)
+"""
+
+import os
+import sys
+import time
+import random
+import shutil
+import tempfile
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from browser.profile_manager import ProfileManager
+
+
+WORDS = ["amazon", "ebay", "facebook", "google", "shop", "farm", "crypto", "travel",
+         "social", "ads", "market", "bank", "test", "main", "backup", "mobile"]
+
+
+def random_word(rng: random.Random) -> str:
+    """Слово зі словника або випадковий токен (реалістична селективність)"""
+    if rng.random() < 0.05:
+        return rng.choice(WORDS)
+    return ''.join(rng.choice('abcdefghijklmnopqrstuvwxyz') for _ in range(rng.randint(4, 9)))
+
+
+def timed(label: str, repeat: int, func):
+    """Середній час виконання запиту"""
+    func()  # прогрів
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = func()
+    elapsed = (time.perf_counter() - start) / repeat
+    print(f"  {label:<40} {elapsed * 1000:>8.2f} мс  ({len(result) if isinstance(result, list) else result} рез.)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк пошуку профілів")
+    parser.add_argument("--profiles", type=int, default=50000, help="Кількість профілів")
+    parser.add_argument("--repeat", type=int, default=20, help="Повторів на запит")
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    data_dir = tempfile.mkdtemp(prefix="andetect_bench_")
+    try:
+        manager = ProfileManager(data_dir)
+        print(f"Створення {args.profiles} профілів...")
+        for i in range(args.profiles):
+            manager.create_profile(f"{random_word(rng)} {i}", {
+                'description': ' '.join(random_word(rng) for _ in range(3)),
+                'tags': ','.join(random_word(rng) for _ in range(2)),
+                'status': rng.choice(['active', 'inactive', 'blocked']),
+                'icon_type': rng.choice(['default', 'work', 'shopping', 'social']),
+                'country_code': rng.choice(['UA', 'US', 'DE', 'GB', 'PL']),
+            })
+
+        print(f"FTS5: {'так' if manager.fts_enabled else 'ні'}")
+        timed("пошук 'amaz'", args.repeat,
+              lambda: manager.search_profile_ids("amaz"))
+        timed("пошук 'shop farm' + статус", args.repeat,
+              lambda: manager.search_profile_ids("shop farm", statuses=['active']))
+        timed("країна + тип, сортування за назвою", args.repeat,
+              lambda: manager.search_profile_ids(country_codes=['US'], icon_types=['work'],
+                                                 order_by='name'))
+        timed("пошук 'crypto', перші 100", args.repeat,
+              lambda: manager.search_profile_ids("crypto", limit=100))
+        timed("кількість 'bank'", args.repeat,
+              lambda: manager.count_profiles("bank"))
+    finally:
+        shutil.rmtree(data_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Бенчмарк збереження стану профілю: подвійний запис (profiles.db + sessions.db)
+проти єдиного ProfileStateStore - коміти, байти WAL та час на збереження
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import tempfile
+import argparse
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from browser.cookie_sync import ensure_cookie_key, sync_cookies
+from browser.crypto import ProfileCipher
+from browser.database import ConnectionPool
+from browser.profile_state import ProfileStateStore
+from cryptography.fernet import Fernet
+
+
+class WriteCounter:
+    """Кількість комітів та приріст WAL для набору баз"""
+
+    def __init__(self, pools):
+        self.pools = pools
+        self.commits = 0
+        for pool in pools:
+            pool.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            # Без автоматичних контрольних точок приріст WAL = записані сторінки
+            pool.execute("PRAGMA wal_autocheckpoint = 0")
+
+    def wal_bytes(self) -> int:
+        """Сумарний розмір WAL-файлів"""
+        return sum(
+            os.path.getsize(pool.db_path + "-wal") if os.path.exists(pool.db_path + "-wal") else 0
+            for pool in self.pools
+        )
+
+
+def make_state(profile: int, step: int):
+    """Cookies (кожне збереження змінює кілька значень) та вкладки профілю"""
+    cookies = [
+        {
+            'domain': f"site{n % 12}.example.com",
+            'name': f"cookie_{n}",
+            'value': f"{profile}-{n}-{step if n < 5 else 0}",
+            'expires': int(time.time()) + 86400 * 30,
+            'secure': n % 2 == 0,
+            'httpOnly': n % 3 == 0,
+        }
+        for n in range(50)
+    ]
+    tabs = [
+        {'url': f"https://site{(n + step // 5) % 40}.example.com/page/{n}", 'title': f"Вкладка {n}"}
+        for n in range(20)
+    ]
+    return cookies, tabs
+
+
+def legacy_save(profiles_pool, sessions_store, cipher, profile_id, cookies, tabs) -> int:
+    """Старий шлях: ProfileManager і SessionManager пишуть кожен у свою базу (коміти)"""
+    now = datetime.now().isoformat()
+    rows = {
+        (c['domain'], c['name'], '/'): (c['value'], c['expires'], int(c['secure']), int(c['httpOnly']))
+        for c in cookies
+    }
+    with profiles_pool.transaction(immediate=True) as conn:
+        sync_cookies(conn, 'cookies', profile_id, rows, ('value', 'expires', 'secure', 'http_only'), now)
+    with profiles_pool.transaction() as conn:
+        conn.execute("DELETE FROM sessions WHERE profile_id = ?", (profile_id,))
+        conn.execute(
+            "INSERT INTO sessions (profile_id, tab_data, created_at) VALUES (?, ?, ?)",
+            (profile_id, cipher.encrypt(json.dumps(tabs).encode()), now)
+        )
+    sessions_store.sync_cookies(profile_id, cookies)
+    sessions_store.save_session(profile_id, tabs)
+    return 4
+
+
+def unified_save(store, profile_id, cookies, tabs) -> int:
+    """Новий шлях: cookies та сесія однією транзакцією в sessions.db"""
+    store.save_profile_state(profile_id, cookies, tabs)
+    return 1
+
+
+def run(label: str, pools, save, profiles: int, saves: int):
+    """Серія збережень стану для всіх профілів"""
+    counter = WriteCounter(pools)
+    start = time.perf_counter()
+    for step in range(saves):
+        for profile in range(profiles):
+            cookies, tabs = make_state(profile, step)
+            counter.commits += save(f"profile-{profile}", cookies, tabs)
+    elapsed = time.perf_counter() - start
+    total = profiles * saves
+    print(f"  {label:<28} комітів/збер. {counter.commits / total:>4.1f}  "
+          f"WAL {counter.wal_bytes() / total / 1024:>7.1f} КБ/збер.  "
+          f"{elapsed / total * 1000:>7.2f} мс/збер.")
+    return counter.wal_bytes(), elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк єдиного сховища стану профілів")
+    parser.add_argument("--profiles", type=int, default=50, help="Кількість профілів")
+    parser.add_argument("--saves", type=int, default=20, help="Збережень на профіль")
+    parser.add_argument("--synchronous", default="FULL", help="PRAGMA synchronous (fsync на коміт)")
+    args = parser.parse_args()
+
+    cipher = ProfileCipher(Fernet.generate_key())
+    data_dir = tempfile.mkdtemp(prefix="andetect_bench_")
+    try:
+        legacy_dir = os.path.join(data_dir, "legacy")
+        os.makedirs(legacy_dir)
+        legacy_pool = ConnectionPool.for_database(
+            os.path.join(legacy_dir, "profiles.db"), synchronous=args.synchronous
+        )
+        with legacy_pool.transaction() as conn:
+            conn.execute("""
+                CREATE TABLE cookies (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT, profile_id TEXT NOT NULL,
+                    domain TEXT NOT NULL, name TEXT NOT NULL, value TEXT NOT NULL,
+                    path TEXT DEFAULT '/', expires INTEGER, secure BOOLEAN DEFAULT 0,
+                    http_only BOOLEAN DEFAULT 0, created_at TEXT NOT NULL
+                )
+            """)
+            ensure_cookie_key(conn.cursor(), 'cookies')
+            conn.execute("""
+                CREATE TABLE sessions (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT, profile_id TEXT NOT NULL,
+                    tab_data BLOB NOT NULL, created_at TEXT NOT NULL
+                )
+            """)
+        legacy_store = ProfileStateStore(ConnectionPool.for_database(
+            os.path.join(legacy_dir, "sessions.db"), synchronous=args.synchronous
+        ))
+        store = ProfileStateStore(ConnectionPool.for_database(
+            os.path.join(data_dir, "sessions.db"), synchronous=args.synchronous
+        ), cipher)
+
+        print(f"{args.profiles} профілів x {args.saves} збережень (50 cookies, 20 вкладок), "
+              f"synchronous={args.synchronous}:")
+        legacy_wal, legacy_time = run(
+            "profiles.db + sessions.db", [legacy_pool, legacy_store.pool],
+            lambda p, c, t: legacy_save(legacy_pool, legacy_store, cipher, p, c, t),
+            args.profiles, args.saves
+        )
+        unified_wal, unified_time = run(
+            "ProfileStateStore", [store.pool],
+            lambda p, c, t: unified_save(store, p, c, t),
+            args.profiles, args.saves
+        )
+        print(f"WAL -{(1 - unified_wal / legacy_wal) * 100:.0f}%, час x{legacy_time / unified_time:.1f}")
+    finally:
+        ConnectionPool.close_all()
+        shutil.rmtree(data_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Бенчмарк списку профілів: повні BrowserProfile проти коротких ProfileSummary
+"""
+
+import os
+import sys
+import time
+import shutil
+import tempfile
+import argparse
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from browser.profile_manager import ProfileManager
+
+
+def measure(label: str, func, reset=None):
+    """Час (без tracemalloc) та пам'ять побудови списку"""
+    if reset:
+        reset()
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+
+    if reset:
+        reset()
+    tracemalloc.start()
+    result = func()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"  {label:<36} {elapsed * 1000:>9.1f} мс  "
+          f"утримується {current / 1024 / 1024:>6.1f} МБ  пік {peak / 1024 / 1024:>6.1f} МБ")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк коротких записів профілів")
+    parser.add_argument("--profiles", type=int, default=20000, help="Кількість профілів")
+    args = parser.parse_args()
+
+    data_dir = tempfile.mkdtemp(prefix="andetect_bench_")
+    try:
+        manager = ProfileManager(data_dir)
+        print(f"Створення {args.profiles} профілів...")
+        manager.create_profiles_bulk(args.profiles, name_pattern="Profile {n}")
+
+        print(f"Список з {args.profiles} профілів:")
+        measure("get_all_profiles (холодний кеш)", manager.get_all_profiles, manager.cache.clear)
+        measure("get_all_profiles (гарячий кеш)", manager.get_all_profiles)
+        measure("get_profile_summaries", manager.get_profile_summaries, manager.cache.clear)
+    finally:
+        shutil.rmtree(data_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
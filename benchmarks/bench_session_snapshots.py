@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Бенчмарк знімків сесій: повний JSON у кожному рядку проти стиснених знімків за хешем
+Розмір sessions.db та швидкість відновлення при частому автозбереженні
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import tempfile
+import argparse
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from browser.database import ConnectionPool
+from browser.profile_manager import ProfileManager
+from browser.session_manager import SessionManager
+
+
+def make_tabs(count: int, seed: int) -> list:
+    """Набір вкладок з типовими URL та заголовками"""
+    rng = random.Random(seed)
+    return [
+        {
+            'url': f"https://site{rng.randint(1, 500)}.example.com/path/{rng.randint(1, 10 ** 6)}?q={i}",
+            'title': f"Сторінка {i} - результати пошуку {rng.randint(1, 1000)}",
+            'scroll': rng.randint(0, 5000),
+            'pinned': i < 2,
+        }
+        for i in range(count)
+    ]
+
+
+def database_size(manager: SessionManager) -> int:
+    """Розмір sessions.db після VACUUM"""
+    manager.pool.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    manager.pool.execute("VACUUM")
+    manager.pool.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    return os.path.getsize(manager.db_path)
+
+
+def save_legacy(manager: SessionManager, profile_id: str, tabs: list):
+    """Старий формат: повний JSON у кожному рядку browser_sessions"""
+    now = datetime.now().isoformat()
+    with manager.pool.transaction() as conn:
+        conn.execute("UPDATE browser_sessions SET is_active = 0 WHERE profile_id = ?", (profile_id,))
+        conn.execute("""
+            INSERT INTO browser_sessions
+            (profile_id, session_name, tabs_data, created_at, last_accessed, is_active)
+            VALUES (?, 'legacy', ?, ?, ?, 1)
+        """, (profile_id, json.dumps(tabs, ensure_ascii=False), now, now))
+
+
+def run(label: str, save, manager: SessionManager, profiles: int, saves: int, tabs: int):
+    """Серія автозбережень (кожне п'яте змінює вкладки) та відновлення"""
+    sessions = {f"profile-{p}": make_tabs(tabs, p) for p in range(profiles)}
+    start = time.perf_counter()
+    for n in range(saves):
+        for p, (profile_id, current) in enumerate(sessions.items()):
+            if n % 5 == 0:
+                current = sessions[profile_id] = make_tabs(tabs, p * 100000 + n)
+            save(manager, profile_id, current)
+    save_elapsed = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for profile_id in sessions:
+        manager.restore_session(profile_id)
+    restore_elapsed = time.perf_counter() - start
+
+    rows = manager.pool.execute("SELECT COUNT(*) FROM browser_sessions").fetchone()[0]
+    size = database_size(manager)
+    print(f"  {label:<26} рядків {rows:>6}  база {size / 1024 / 1024:>7.2f} МБ  "
+          f"збереження {save_elapsed / (saves * profiles) * 1000:>6.3f} мс  "
+          f"відновлення {restore_elapsed / profiles * 1000:>6.3f} мс")
+    return size
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк знімків сесій")
+    parser.add_argument("--profiles", type=int, default=50, help="Кількість профілів")
+    parser.add_argument("--saves", type=int, default=100, help="Автозбережень на профіль")
+    parser.add_argument("--tabs", type=int, default=40, help="Вкладок у сесії")
+    args = parser.parse_args()
+
+    print(f"{args.profiles} профілів x {args.saves} збережень x {args.tabs} вкладок:")
+    sizes = []
+    for label, save in (
+        ("JSON у кожному рядку", save_legacy),
+        ("zlib + HMAC + ретенція", lambda m, p, t: m.save_session(p, t)),
+    ):
+        data_dir = tempfile.mkdtemp(prefix="andetect_bench_")
+        try:
+            manager = SessionManager(ProfileManager(data_dir))
+            sizes.append(run(label, save, manager, args.profiles, args.saves, args.tabs))
+            manager.shutdown()
+        finally:
+            ConnectionPool.close_all()
+            shutil.rmtree(data_dir, ignore_errors=True)
+
+    print(f"Розмір бази -{(1 - sizes[1] / sizes[0]) * 100:.0f}%")
+
+
+if __name__ == "__main__":
+    main()
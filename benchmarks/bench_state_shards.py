@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Бенчмарк паралельного запису стану профілів: єдина sessions.db проти баз profiles/<id>/state.db
+(пропускна здатність, затримки збереження, міжшардові запити та LRU-кеш шардів)
+"""
+
+import os
+import sys
+import time
+import shutil
+import tempfile
+import argparse
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from browser import database
+from browser.crypto import ProfileCipher
+from browser.database import ConnectionPool
+from browser.profile_state import ProfileStateStore
+from browser.state_shards import ShardedStateStore
+from cryptography.fernet import Fernet
+
+
+def make_state(profile: int, step: int):
+    """Cookies (кілька змінюються на кожному кроці) та вкладки профілю"""
+    cookies = [
+        {
+            'domain': f"site{n % 12}.example.com",
+            'name': f"cookie_{n}",
+            'value': f"{profile}-{n}-{step if n < 5 else 0}",
+            'expires': int(time.time()) + 86400 * 30,
+        }
+        for n in range(50)
+    ]
+    tabs = [
+        {'url': f"https://site{(n + step) % 40}.example.com/page/{n}", 'title': f"Вкладка {n}"}
+        for n in range(10)
+    ]
+    return cookies, tabs
+
+
+def percentile(values: list, fraction: float) -> float:
+    """Перцентиль відсортованого списку"""
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def run_writers(store, profiles: int, saves: int, visits: int):
+    """Паралельні профілі: кожен у своєму потоці зберігає стан та пише історію"""
+    latencies = []
+    lock = threading.Lock()
+    barrier = threading.Barrier(profiles + 1)
+
+    def writer(profile: int):
+        profile_id = f"profile-{profile:03d}"
+        local = []
+        barrier.wait()
+        for step in range(saves):
+            cookies, tabs = make_state(profile, step)
+            start = time.perf_counter()
+            store.save_profile_state(profile_id, cookies, tabs)
+            local.append(time.perf_counter() - start)
+            for n in range(visits):
+                store.add_visit(profile_id, f"https://site{n}.example.com/{step}", f"Сторінка {n}")
+        with lock:
+            latencies.extend(local)
+
+    threads = [threading.Thread(target=writer, args=(profile,)) for profile in range(profiles)]
+    for thread in threads:
+        thread.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return elapsed, latencies
+
+
+def report(label: str, elapsed: float, latencies: list):
+    """Рядок результатів"""
+    print(f"  {label:<26} {len(latencies) / elapsed:>8.0f} збер./с  "
+          f"p50 {percentile(latencies, 0.5) * 1000:>7.2f} мс  "
+          f"p95 {percentile(latencies, 0.95) * 1000:>7.2f} мс  "
+          f"max {latencies[-1] * 1000:>7.1f} мс")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк розподіленого сховища стану профілів")
+    parser.add_argument("--profiles", type=int, default=32, help="Паралельних профілів (потоків)")
+    parser.add_argument("--saves", type=int, default=40, help="Збережень стану на профіль")
+    parser.add_argument("--visits", type=int, default=5, help="Відвідувань між збереженнями")
+    parser.add_argument("--synchronous", default="NORMAL", help="PRAGMA synchronous")
+    parser.add_argument("--max-open", type=int, default=16, help="Ліміт відкритих шардів для LRU-прогону")
+    args = parser.parse_args()
+
+    # Пули шардів створюються з налаштуваннями за замовчуванням
+    database.DEFAULT_SYNCHRONOUS = args.synchronous
+
+    cipher = ProfileCipher(Fernet.generate_key())
+    data_dir = tempfile.mkdtemp(prefix="andetect_bench_")
+    try:
+        single = ProfileStateStore(ConnectionPool.for_database(os.path.join(data_dir, "sessions.db")), cipher)
+        sharded = ShardedStateStore(os.path.join(data_dir, "profiles"), cipher)
+        lru = ShardedStateStore(os.path.join(data_dir, "profiles_lru"), cipher, max_open=args.max_open)
+
+        print(f"{args.profiles} профілів паралельно x {args.saves} збережень "
+              f"(50 cookies, 10 вкладок, {args.visits} відвідувань), synchronous={args.synchronous}:")
+        single_time, single_latencies = run_writers(single, args.profiles, args.saves, args.visits)
+        single.shutdown()
+        report("sessions.db", single_time, single_latencies)
+
+        sharded_time, sharded_latencies = run_writers(sharded, args.profiles, args.saves, args.visits)
+        report("profiles/<id>/state.db", sharded_time, sharded_latencies)
+
+        lru_time, lru_latencies = run_writers(lru, args.profiles, args.saves, args.visits)
+        report(f"шарди, max_open={args.max_open}", lru_time, lru_latencies)
+        print(f"  Кеш LRU: {lru.cache_stats()}")
+        print(f"Пропускна здатність x{single_time / sharded_time:.1f}, "
+              f"p95 x{percentile(single_latencies, 0.95) / percentile(sharded_latencies, 0.95):.1f}")
+
+        print("Міжшардові запити:")
+        for label, func in (
+            ("stats()", lambda store: store.stats()),
+            ("recent_history(100)", lambda store: store.recent_history(100)),
+            ("search_history('site1')", lambda store: store.search_history("site1", limit=50)),
+        ):
+            start = time.perf_counter()
+            func(single)
+            single_ms = (time.perf_counter() - start) * 1000
+            start = time.perf_counter()
+            func(sharded)
+            sharded_ms = (time.perf_counter() - start) * 1000
+            print(f"  {label:<26} sessions.db {single_ms:>7.2f} мс   шарди {sharded_ms:>7.2f} мс")
+
+        sharded.shutdown()
+        lru.shutdown()
+    finally:
+        ConnectionPool.close_all()
+        shutil.rmtree(data_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Бенчмарк автозбереження вкладок: журнал дельт (зі стисненням у знімок сесії)
+проти запису повної сесії на кожну навігацію - байти на навігацію, час та відновлення після збою
+"""
+
+import os
+import sys
+import time
+import random
+import shutil
+import tempfile
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from browser.database import ConnectionPool
+from browser.profile_state import ProfileStateStore
+from browser.tab_autosave import TabAutosave, TabJournal
+
+
+SITES = ["github.com", "google.com", "stackoverflow.com", "youtube.com", "wikipedia.org",
+         "amazon.com", "reddit.com", "news.ycombinator.com", "docs.python.org", "binance.com"]
+
+
+class WalMeter:
+    """Приріст WAL-файлу бази (автоматичні контрольні точки вимкнено)"""
+
+    def __init__(self, pool: ConnectionPool):
+        self.pool = pool
+        pool.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        pool.execute("PRAGMA wal_autocheckpoint = 0")
+
+    def size(self) -> int:
+        path = self.pool.db_path + "-wal"
+        return os.path.getsize(path) if os.path.exists(path) else 0
+
+
+def navigations(rng: random.Random, tabs: int, count: int):
+    """Послідовність навігацій: (вкладка, URL, заголовок)"""
+    for n in range(count):
+        site = rng.choice(SITES)
+        path = '/'.join(rng.choice(["questions", "watch", "wiki", "dp", "r", "library", "item"])
+                        for _ in range(rng.randint(1, 3)))
+        url = f"https://{site}/{path}/{rng.randint(1000, 99999999)}?ref=nav_{n % 7}"
+        title = f"{site.split('.')[0].title()} - сторінка {rng.randint(1, 5000)} ({path.replace('/', ' ')})"
+        yield rng.randrange(tabs), url, title
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк автозбереження вкладок")
+    parser.add_argument("--tabs", type=int, default=20, help="Відкритих вкладок")
+    parser.add_argument("--navigations", type=int, default=5000, help="Кількість навігацій")
+    parser.add_argument("--fsync", action="store_true", help="fsync журналу на кожен запис")
+    args = parser.parse_args()
+
+    data_dir = tempfile.mkdtemp(prefix="andetect_bench_")
+    try:
+        rng = random.Random(7)
+        plan = list(navigations(rng, args.tabs, args.navigations))
+        initial = [(n + 1, f"https://{SITES[n % len(SITES)]}/", "Нова вкладка") for n in range(args.tabs)]
+
+        # Повна сесія на кожну навігацію
+        store = ProfileStateStore(ConnectionPool(os.path.join(data_dir, "full.db")))
+        meter = WalMeter(store.pool)
+        tabs = {tab_id: [url, title] for tab_id, url, title in initial}
+        start = time.perf_counter()
+        for tab_index, url, title in plan:
+            tabs[tab_index + 1] = [url, title]
+            store.save_session("profile", [{'url': u, 'title': t} for u, t in tabs.values()],
+                               TabAutosave.AUTOSAVE_SESSION_NAME, replace=True)
+        full_time = time.perf_counter() - start
+        full_bytes = meter.size()
+        store.close()
+
+        # Журнал дельт + періодичне стиснення у знімок сесії
+        store = ProfileStateStore(ConnectionPool(os.path.join(data_dir, "journal.db")))
+        meter = WalMeter(store.pool)
+        journal = TabJournal(os.path.join(data_dir, "profile", TabAutosave.JOURNAL_FILE), args.fsync)
+        journal.compact(initial, 1)
+        tabs = {tab_id: [url, title] for tab_id, url, title in initial}
+        delta_bytes = 0
+        compactions = 0
+        start = time.perf_counter()
+        for tab_index, url, title in plan:
+            tabs[tab_index + 1] = [url, title]
+            delta_bytes += journal.record([(tab_id, u, t) for tab_id, (u, t) in tabs.items()], 1)
+            if journal.needs_compaction():
+                journal.compact()
+                store.save_session("profile", journal.snapshot(), TabAutosave.AUTOSAVE_SESSION_NAME, replace=True)
+                compactions += 1
+        journal_time = time.perf_counter() - start
+        journal.close()
+        journal_bytes = journal.bytes_written + meter.size()
+        store.close()
+
+        print(f"{args.tabs} вкладок, {args.navigations} навігацій (fsync={'так' if args.fsync else 'ні'}):")
+        print(f"  Повна сесія на навігацію  {full_bytes / args.navigations:>9.0f} Б/навіг.  "
+              f"{full_time / args.navigations * 1000:>6.3f} мс/навіг.")
+        print(f"  Журнал дельт              {delta_bytes / args.navigations:>9.0f} Б/навіг. (лише дельти)")
+        print(f"  Журнал + {compactions} стиснень у знімок {journal_bytes / args.navigations:>5.0f} Б/навіг.  "
+              f"{journal_time / args.navigations * 1000:>6.3f} мс/навіг.")
+        print(f"  Запис менше в x{full_bytes / journal_bytes:.0f}")
+
+        # Відновлення після збою: журнал обривається в довільному місці
+        path = os.path.join(data_dir, "crash", TabAutosave.JOURNAL_FILE)
+        journal = TabJournal(path)
+        journal.compact(initial, 1)
+        states = [journal.snapshot()]
+        for tab_index, url, title in plan[:TabJournal.COMPACT_RECORDS - 1]:
+            tabs = dict(journal.tabs)
+            tabs[tab_index + 1] = [url, title]
+            journal.record([(tab_id, u, t) for tab_id, (u, t) in tabs.items()], 1)
+            states.append(journal.snapshot())
+        journal.close()
+        with open(path, 'rb') as f:
+            data = f.read()
+
+        recovered = 0
+        start = time.perf_counter()
+        for _ in range(200):
+            cut = rng.randrange(len(data))
+            with open(path, 'wb') as f:
+                f.write(data[:cut])
+            restored = TabJournal(path)
+            records = restored.load()
+            # Відновлюється рівно останній повністю записаний стан
+            if records and restored.snapshot() == states[records - 1]:
+                recovered += 1
+            elif not records and cut < data.index(b"\n") + 1:
+                recovered += 1
+        elapsed = (time.perf_counter() - start) / 200 * 1000
+        print(f"Обрив журналу ({len(data)} Б, {len(states)} записів) у 200 випадкових місцях: "
+              f"відновлено {recovered}/200, {elapsed:.2f} мс на відновлення")
+    finally:
+        ConnectionPool.close_all()
+        shutil.rmtree(data_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
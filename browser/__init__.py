@@ -1,3 +1,3 @@
 # Браузерний модуль AnDetect
 
-__all__ = ['ProfileManager', 'BrowserProfile']
\ No newline at end of file
+__all__ = ['ProfileManager', 'BrowserProfile', 'ProfileSummary', 'ProfileStateStore', 'ShardedStateStore']
\ No newline at end of file
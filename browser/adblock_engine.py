@@ -0,0 +1,493 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Мережеві фільтри Adblock Plus для AnDetect Browser
+Повні списки (EasyList, EasyPrivacy): правила шляхів, винятки @@, опції типу запиту,
+$third-party та $domain=. Правила індексуються за токенами URL, тому кожен запит
+перевіряє лише кілька кандидатів
+"""
+
+import re
+import time
+from collections import Counter
+from operator import itemgetter
+from typing import Dict, List, Optional, Iterable, Tuple
+
+from adblockparser import AdblockRule
+
+
+# Типи запитів ABP та їх синоніми в опціях правил
+RESOURCE_TYPES = {
+    'script', 'image', 'stylesheet', 'object', 'xmlhttprequest', 'subdocument', 'document',
+    'media', 'font', 'ping', 'websocket', 'other',
+}
+TYPE_ALIASES = {
+    'xhr': 'xmlhttprequest', 'css': 'stylesheet', 'frame': 'subdocument', 'doc': 'document',
+    'object-subrequest': 'object',
+}
+
+# Опції, що не впливають на блокування мережевих запитів
+IGNORED_OPTIONS = {'collapse', 'donottrack'}
+
+# Типи QWebEngineUrlRequestInfo.ResourceType -> тип ABP
+QT_RESOURCE_TYPES = {
+    'ResourceTypeMainFrame': 'document',
+    'ResourceTypeNavigationPreloadMainFrame': 'document',
+    'ResourceTypeSubFrame': 'subdocument',
+    'ResourceTypeNavigationPreloadSubFrame': 'subdocument',
+    'ResourceTypeStylesheet': 'stylesheet',
+    'ResourceTypeScript': 'script',
+    'ResourceTypeImage': 'image',
+    'ResourceTypeFavicon': 'image',
+    'ResourceTypeFontResource': 'font',
+    'ResourceTypeObject': 'object',
+    'ResourceTypePluginResource': 'object',
+    'ResourceTypeMedia': 'media',
+    'ResourceTypeXhr': 'xmlhttprequest',
+    'ResourceTypePing': 'ping',
+    'ResourceTypeWebSocket': 'websocket',
+}
+
+TOKEN_RE = re.compile(r'[a-z0-9%]{2,}')
+EDGE_KEY_LENGTH = 3
+TOKEN_PREFIX = itemgetter(slice(None, EDGE_KEY_LENGTH))
+TOKEN_SUFFIX = itemgetter(slice(-EDGE_KEY_LENGTH, None))
+
+HOST_CACHE_SIZE = 4096
+TOKEN_CACHE_SIZE = 65536
+
+# Токени, що є майже в кожному URL: правило індексується за ними лише за відсутності інших
+COMMON_URL_TOKENS = {'http', 'https', 'www', 'com', 'net', 'org', 'js', 'css', 'html', 'php', 'png', 'jpg',
+                     'gif', 'static', 'cdn', 'img', 'images', 'assets', 'api', 'v1', 'v2'}
+PATTERN_SEPARATORS_RE = re.compile(r'[*^|]+')
+URL_TOKEN_RE = re.compile(r'[a-z0-9%]+')
+HOST_RULE_RE = re.compile(r'^\|\|([a-z0-9][a-z0-9.\-_]*)\^$')
+HOST_RE = re.compile(r'(?:[^:/?#]*://)?(?:[^/?#@]*@)?(\[[^\]/?#]*\]|[^/?#:]*)')
+OPTIONS_RE = re.compile(r'^[~\w\-,=.|*]+$')
+
+# Домени другого рівня, під якими реєструють сайти (co.uk, com.ua)
+SECOND_LEVEL_LABELS = {'co', 'com', 'net', 'org', 'gov', 'edu', 'ac', 'in', 'kiev', 'or', 'ne'}
+
+
+def url_host(url: str) -> str:
+    """Хост URL без порту та облікових даних (у нижньому регістрі)"""
+    return HOST_RE.match(url).group(1).lower().strip('.')
+
+
+def host_suffixes(host: str) -> List[str]:
+    """Хост і всі батьківські домени від найконкретнішого"""
+    suffixes = [host]
+    position = host.find('.')
+    while position != -1:
+        suffixes.append(host[position + 1:])
+        position = host.find('.', position + 1)
+    return suffixes
+
+
+def base_domain(host: str) -> str:
+    """Зареєстрований домен хоста (наближено, без списку публічних суфіксів)"""
+    labels = host.split('.')
+    if len(labels) > 2 and len(labels[-1]) == 2 and labels[-2] in SECOND_LEVEL_LABELS:
+        return '.'.join(labels[-3:])
+    return '.'.join(labels[-2:])
+
+
+def regex_literal(regex: str) -> str:
+    """Найдовший підрядок, без якого регулярний вираз не збігається ('' - якщо не визначено)"""
+    best, run, depth, i = '', '', 0, 0
+    while i < len(regex):
+        char = regex[i]
+        if char == '\\':
+            escaped = regex[i + 1:i + 2]
+            i += 2
+            if depth == 0 and escaped and not escaped.isalnum() and regex[i:i + 1] not in ('?', '*', '{'):
+                run += escaped
+                continue
+        elif char == '[':
+            # Клас символів пропускається разом із можливим ] на початку
+            i += 2 if regex[i + 1:i + 2] == ']' else 1
+            while i < len(regex) and regex[i] != ']':
+                i += 2 if regex[i] == '\\' else 1
+            i += 1
+        elif char == '{':
+            i = regex.find('}', i) + 1 or len(regex)
+        elif char == '|' and depth == 0:
+            return ''
+        elif char in '()':
+            depth += 1 if char == '(' else -1
+            i += 1
+        elif depth == 0 and char not in '^$.+?*{' and regex[i + 1:i + 2] not in ('?', '*', '{'):
+            run += char.lower()
+            i += 1
+            continue
+        else:
+            i += 1
+        best, run = max(best, run, key=len), ''
+    return max(best, run, key=len)
+
+
+class NetworkFilter:
+    """Мережеве правило ABP з розібраними опціями"""
+
+    __slots__ = ('text', 'list_name', 'pattern', 'exception', 'host', 'regex', 'flags',
+                 'types', 'excluded_types', 'third_party', 'domains', 'include_domains',
+                 'important', '_compiled')
+
+    def __init__(self, text: str, list_name: str = ""):
+        self.text = text
+        self.list_name = list_name
+        self.exception = False
+        self.host = None
+        self.types = None
+        self.excluded_types = None
+        self.third_party = None
+        self.domains = None
+        self.include_domains = False
+        self.important = False
+        self.flags = re.IGNORECASE
+        self._compiled = None
+
+    @classmethod
+    def parse(cls, line: str, list_name: str = "") -> Optional['NetworkFilter']:
+        """Розбір рядка списку (None для коментарів, косметичних і непідтримуваних правил)"""
+        line = line.strip()
+        if not line or line.startswith(('!', '[')) or '##' in line or '#@#' in line or '#?#' in line \
+                or '#$#' in line:
+            return None
+
+        network_filter = cls(line, list_name)
+        if line.startswith('@@'):
+            network_filter.exception = True
+            line = line[2:]
+
+        # Опції після останнього $ (у регулярному виразі /.../ без опцій $ - частина шаблону)
+        pattern, options = line, None
+        if '$' in line and not (len(line) > 1 and line.startswith('/') and line.endswith('/')):
+            head, tail = line.rsplit('$', 1)
+            if OPTIONS_RE.match(tail):
+                pattern, options = head, tail
+        if options is not None and not network_filter._parse_options(options):
+            return None
+
+        if pattern in ('', '*') and not network_filter.domains:
+            return None
+        network_filter.pattern = pattern
+        if network_filter.flags and not network_filter.is_regex():
+            network_filter.pattern = pattern = pattern.lower()
+
+        host_rule = HOST_RULE_RE.match(pattern)
+        if host_rule:
+            network_filter.host = host_rule.group(1)
+            network_filter.regex = None
+        else:
+            try:
+                network_filter.regex = AdblockRule.rule_to_regex(pattern) if pattern else ''
+            except Exception:
+                return None
+        return network_filter
+
+    def _parse_options(self, text: str) -> bool:
+        """Розбір опцій правила (False, якщо є непідтримувані)"""
+        types, excluded = set(), set()
+        for option in text.split(','):
+            option = option.strip()
+            negated = option.startswith('~')
+            name = option.lstrip('~').lower()
+            if name.startswith('domain='):
+                self.domains = {}
+                for domain in option[len('domain='):].split('|'):
+                    excluded_domain = domain.startswith('~')
+                    domain = domain.lstrip('~').lower()
+                    if domain:
+                        self.domains[domain] = not excluded_domain
+                        self.include_domains |= not excluded_domain
+                continue
+            name = TYPE_ALIASES.get(name, name)
+            if name in RESOURCE_TYPES:
+                (excluded if negated else types).add(name)
+            elif name in ('third-party', '3p'):
+                self.third_party = not negated
+            elif name in ('first-party', '1p'):
+                self.third_party = negated
+            elif name == 'match-case':
+                self.flags = 0
+            elif name == 'important':
+                self.important = True
+            elif name not in IGNORED_OPTIONS:
+                return False
+        self.types = frozenset(types) or None
+        self.excluded_types = frozenset(excluded) or None
+        return True
+
+    def keys(self) -> List[str]:
+        """Ключі індексу - частини токенів URL, які обов'язково є в URL при збігу правила
+
+        'abc' - токен URL, '<abc' - токен, що починається з abc, 'abc>' - токен, що закінчується на abc
+        """
+        if self.regex is None or not self.pattern:
+            return []
+        text = self.literal() if self.is_regex() else self.pattern.lower()
+        keys = []
+        for match in TOKEN_RE.finditer(text):
+            start, end = match.span()
+            # Межа шаблону без якоря або * поруч: токен URL може бути довшим за цей фрагмент
+            left_open = start == 0 or text[start - 1] == '*'
+            right_open = end == len(text) or text[end] == '*'
+            token = match.group()
+            if not left_open and not right_open:
+                keys.append(token)
+            elif left_open != right_open and len(token) >= EDGE_KEY_LENGTH:
+                keys.append(token[-EDGE_KEY_LENGTH:] + '>' if left_open else '<' + token[:EDGE_KEY_LENGTH])
+        return keys
+
+    def literal(self) -> str:
+        """Підрядок URL (у нижньому регістрі), без якого правило не збігається"""
+        if self.is_regex():
+            return regex_literal(self.pattern[1:-1])
+        return max(PATTERN_SEPARATORS_RE.split(self.pattern.lower()), key=len)
+
+    def is_regex(self) -> bool:
+        """Шаблон - регулярний вираз /.../"""
+        return len(self.pattern) > 1 and self.pattern.startswith('/') and self.pattern.endswith('/')
+
+    def applies(self, resource_type: str, third_party: bool, first_party_suffixes: List[str]) -> bool:
+        """Чи підходять тип запиту та контекст сторінки під опції правила"""
+        if self.types is not None:
+            if resource_type not in self.types:
+                return False
+        elif resource_type == 'document' and not self.exception:
+            # Блокувальні правила без явного $document не діють на саму сторінку
+            return False
+        if self.excluded_types is not None and resource_type in self.excluded_types:
+            return False
+        if self.third_party is not None and self.third_party != third_party:
+            return False
+        if self.domains is not None:
+            for domain in first_party_suffixes:
+                included = self.domains.get(domain)
+                if included is not None:
+                    return included
+            return not self.include_domains
+        return True
+
+    def matches_url(self, url: str) -> bool:
+        """Збіг шаблону з URL (регулярний вираз компілюється при першій перевірці)"""
+        if self._compiled is None:
+            self._compiled = re.compile(self.regex, self.flags)
+        return self._compiled.search(url) is not None
+
+    def __repr__(self):
+        return f"NetworkFilter({self.text!r})"
+
+
+class FilterIndex:
+    """Правила одного виду (блокування або винятки), проіндексовані для швидкого пошуку"""
+
+    def __init__(self):
+        self.hosts = {}  # домен -> правила ||домен^
+        self.tokens = {}  # токен URL -> правила
+        self.prefixes = {}  # початок токена URL -> правила
+        self.suffixes = {}  # закінчення токена URL -> правила
+        self.domains = {}  # домен сторінки -> правила без токенів, обмежені $domain=
+        self.literals = {}  # обов'язковий підрядок URL -> решта правил без токенів
+        self.generic = []  # правила без токенів і підрядків, які перевіряються для кожного запиту
+        self.size = 0
+        # Токени URL повторюються між запитами: правила всіх трьох словників за токеном кешуються,
+        # а підрядки перевіряються одним регулярним виразом (окремо - лише якщо він знайшов збіг)
+        self._token_cache = {}
+        self._literals_re = None
+
+    def add(self, network_filter: NetworkFilter, key: Optional[str]):
+        """Додавання правила в індекс"""
+        self.size += 1
+        self._token_cache.clear()
+        self._literals_re = None
+        if network_filter.host is not None:
+            self.hosts.setdefault(network_filter.host, []).append(network_filter)
+        elif key is not None:
+            if key[0] == '<':
+                self.prefixes.setdefault(key[1:], []).append(network_filter)
+            elif key[-1] == '>':
+                self.suffixes.setdefault(key[:-1], []).append(network_filter)
+            else:
+                self.tokens.setdefault(key, []).append(network_filter)
+        elif network_filter.include_domains:
+            for domain, included in network_filter.domains.items():
+                if included:
+                    self.domains.setdefault(domain, []).append(network_filter)
+        else:
+            literal = network_filter.literal()
+            if literal:
+                self.literals.setdefault(literal, []).append(network_filter)
+            else:
+                self.generic.append(network_filter)
+
+    def candidates(self, lowered_url: str, host_suffixes: List[str], tokens: List[str],
+                   first_party_suffixes: List[str]) -> List[NetworkFilter]:
+        """Правила-кандидати для URL (правила ||домен^ уже збіглися за хостом)"""
+        found = []
+        for rules in filter(None, map(self.hosts.get, host_suffixes)):
+            found += rules
+        token_cache = self._token_cache
+        for token in tokens:
+            rules = token_cache.get(token)
+            if rules is None:
+                rules = self._token_rules(token)
+            if rules:
+                found += rules
+        if self.domains:
+            for rules in filter(None, map(self.domains.get, first_party_suffixes)):
+                found += rules
+        if self.literals:
+            if self._literals_re is None:
+                self._literals_re = re.compile('|'.join(map(re.escape, self.literals)))
+            if self._literals_re.search(lowered_url) is not None:
+                for literal, rules in self.literals.items():
+                    if literal in lowered_url:
+                        found += rules
+        return found + self.generic if self.generic else found
+
+    def _token_rules(self, token: str) -> tuple:
+        """Правила за токеном URL: точний збіг, початок і закінчення токена (з обмеженим кешем)"""
+        rules = (tuple(self.tokens.get(token, ())) + tuple(self.prefixes.get(TOKEN_PREFIX(token), ())) +
+                 tuple(self.suffixes.get(TOKEN_SUFFIX(token), ())))
+        if len(self._token_cache) >= TOKEN_CACHE_SIZE:
+            self._token_cache.clear()
+        self._token_cache[token] = rules
+        return rules
+
+    def match(self, url: str, lowered_url: str, resource_type: str, third_party: bool, host_suffixes: List[str],
+              tokens: List[str], first_party_suffixes: List[str],
+              important_only: bool = False) -> Optional[NetworkFilter]:
+        """Перше правило, що збігається із запитом"""
+        for network_filter in self.candidates(lowered_url, host_suffixes, tokens, first_party_suffixes):
+            if important_only and not network_filter.important:
+                continue
+            if network_filter.applies(resource_type, third_party, first_party_suffixes) and \
+                    (network_filter.host is not None or network_filter.matches_url(url)):
+                return network_filter
+        return None
+
+
+class NetworkFilterEngine:
+    """Рушій мережевих фільтрів ABP з індексом правил за токенами URL"""
+
+    def __init__(self):
+        self.blocking = FilterIndex()
+        self.exceptions = FilterIndex()
+        self.documents = FilterIndex()  # винятки $document для всієї сторінки
+        self.skipped = 0
+        self.built_at = time.time()
+        # Підресурси сторінки мають той самий first-party URL і кілька хостів: їх розбір кешується
+        self._first_party = ("", [], "", "")
+        self._hosts = {}
+
+    @classmethod
+    def from_rules(cls, rules: Iterable[Tuple[str, str]]) -> 'NetworkFilterEngine':
+        """Побудова з рядків списків: (назва списку, правило)"""
+        engine = cls()
+        filters = []
+        for list_name, line in rules:
+            network_filter = NetworkFilter.parse(line, list_name)
+            if network_filter is None:
+                if line.strip() and not line.startswith(('!', '[')) and '#' not in line:
+                    engine.skipped += 1
+                continue
+            filters.append((network_filter, network_filter.keys()))
+
+        # Для кожного правила обирається найрідший серед усіх правил ключ (загальні токени - в останню чергу)
+        frequency = Counter(key for _, keys in filters for key in set(keys))
+
+        def cost(key: str) -> tuple:
+            return key in COMMON_URL_TOKENS, frequency[key]
+
+        for network_filter, keys in filters:
+            key = min(keys, key=cost) if keys else None
+            index = engine.exceptions if network_filter.exception else engine.blocking
+            index.add(network_filter, key)
+            if network_filter.exception and network_filter.types and 'document' in network_filter.types:
+                engine.documents.add(network_filter, key)
+        return engine
+
+    @property
+    def size(self) -> int:
+        """Кількість правил у рушії"""
+        return self.blocking.size + self.exceptions.size
+
+    def match(self, url: str, first_party_url: str = "", resource_type: str = "other") -> Optional[NetworkFilter]:
+        """Блокувальне правило для запиту (None, якщо запит дозволено)"""
+        host = url_host(url)
+        suffixes = self._hosts.get(host) or self._parse_host(host)
+        if first_party_url:
+            first_party = self._first_party
+            if first_party[0] != first_party_url:
+                first_party_suffixes = host_suffixes(url_host(first_party_url))
+                domain = base_domain(first_party_suffixes[0])
+                first_party = self._first_party = (first_party_url, first_party_suffixes, domain, '.' + domain)
+            first_party_suffixes = first_party[1]
+            # Сторонній запит - хост поза зареєстрованим доменом сторінки (без розбору домену запиту)
+            third_party = host != first_party[2] and not host.endswith(first_party[3])
+        else:
+            third_party = False
+            first_party_suffixes = suffixes
+        lowered_url = url.lower()
+        tokens = URL_TOKEN_RE.findall(lowered_url)
+
+        blocked = self.blocking.match(url, lowered_url, resource_type, third_party, suffixes, tokens,
+                                      first_party_suffixes)
+        if blocked is None or blocked.important:
+            return blocked
+
+        # Виняток @@ (або $document для всієї сторінки) скасовує блокування, крім правил $important
+        if self.exceptions.match(url, lowered_url, resource_type, third_party, suffixes, tokens,
+                                 first_party_suffixes) is not None or self.page_excepted(first_party_url,
+                                                                                         first_party_suffixes):
+            return self.blocking.match(url, lowered_url, resource_type, third_party, suffixes, tokens,
+                                       first_party_suffixes, important_only=True)
+        return blocked
+
+    def _parse_host(self, host: str) -> List[str]:
+        """Суфікси хоста (з обмеженим кешем)"""
+        if len(self._hosts) >= HOST_CACHE_SIZE:
+            self._hosts.clear()
+        suffixes = self._hosts[host] = host_suffixes(host)
+        return suffixes
+
+    def page_excepted(self, first_party_url: str, first_party_suffixes: List[str]) -> bool:
+        """Чи вимкнені фільтри для сторінки винятком $document"""
+        if not first_party_url or not self.documents.size:
+            return False
+        lowered_url = first_party_url.lower()
+        return self.documents.match(first_party_url, lowered_url, 'document', False, first_party_suffixes,
+                                    URL_TOKEN_RE.findall(lowered_url), first_party_suffixes) is not None
+
+    def should_block(self, url: str, first_party_url: str = "", resource_type: str = "other") -> bool:
+        """Чи потрібно блокувати запит"""
+        return self.match(url, first_party_url, resource_type) is not None
+
+    def stats(self) -> Dict[str, int]:
+        """Розмір індексу"""
+        return {
+            'rules': self.size,
+            'skipped': self.skipped,
+            'host_rules': sum(map(len, self.blocking.hosts.values())) + sum(map(len, self.exceptions.hosts.values())),
+            'token_rules': sum(len(rules) for index in (self.blocking, self.exceptions)
+                               for keys in (index.tokens, index.prefixes, index.suffixes) for rules in keys.values()),
+            'literal_rules': sum(len(rules) for index in (self.blocking, self.exceptions)
+                                 for rules in index.literals.values()),
+            'generic_rules': len(self.blocking.generic) + len(self.exceptions.generic),
+        }
+
+
+_qt_request_types = {}
+
+
+def request_type(info) -> str:
+    """Тип ABP для QWebEngineUrlRequestInfo"""
+    if not _qt_request_types:
+        from PyQt5.QtWebEngineCore import QWebEngineUrlRequestInfo
+
+        for name, abp_type in QT_RESOURCE_TYPES.items():
+            if hasattr(QWebEngineUrlRequestInfo, name):
+                _qt_request_types[int(getattr(QWebEngineUrlRequestInfo, name))] = abp_type
+    return _qt_request_types.get(int(info.resourceType()), 'other')
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Живий кеш cookies профілю для AnDetect Browser
+Отримує зміни з QWebEngineCookieStore та зберігає змінені cookies пакетами
+"""
+
+from typing import Dict, List, Tuple
+
+from PyQt5.QtCore import QObject, QTimer, QDateTime, QUrl, QByteArray, Qt
+from PyQt5.QtNetwork import QNetworkCookie
+
+
+def cookie_to_dict(cookie: QNetworkCookie) -> Dict:
+    """Конвертація QNetworkCookie у словник формату SessionManager"""
+    expires = None
+    if not cookie.isSessionCookie():
+        expires = cookie.expirationDate().toLocalTime().toString(Qt.ISODate)
+    return {
+        'domain': cookie.domain(),
+        'name': bytes(cookie.name()).decode('utf-8', 'replace'),
+        'value': bytes(cookie.value()).decode('utf-8', 'replace'),
+        'path': cookie.path() or '/',
+        'expires': expires,
+        'secure': cookie.isSecure(),
+        'httpOnly': cookie.isHttpOnly(),
+        'sameSite': 'Lax',  # QNetworkCookie у Qt5 не надає SameSite
+    }
+
+
+def dict_to_cookie(data: Dict) -> QNetworkCookie:
+    """Створення QNetworkCookie зі словника"""
+    cookie = QNetworkCookie(
+        QByteArray(data.get('name', '').encode()),
+        QByteArray(data.get('value', '').encode())
+    )
+    cookie.setDomain(data.get('domain', ''))
+    cookie.setPath(data.get('path') or '/')
+    cookie.setSecure(bool(data.get('secure')))
+    cookie.setHttpOnly(bool(data.get('httpOnly')))
+    if data.get('expires'):
+        cookie.setExpirationDate(QDateTime.fromString(data['expires'], Qt.ISODate))
+    return cookie
+
+
+def cookie_key(data: Dict) -> Tuple[str, str, str]:
+    """Природний ключ cookie (domain, name, path)"""
+    return data.get('domain', ''), data.get('name', ''), data.get('path') or '/'
+
+
+class ProfileCookieJar(QObject):
+    """Кеш cookies профілю: сигнали cookie store -> пам'ять -> пакетне збереження"""
+
+    def __init__(self, session_manager, profile_id: str, cookie_store,
+                 flush_interval: int = 5000):
+        super().__init__()
+        self.session_manager = session_manager
+        self.profile_id = profile_id
+        self.cookie_store = cookie_store
+
+        self._cookies = {}    # (domain, name, path) -> словник cookie
+        self._by_domain = {}  # domain -> множина ключів
+        self._dirty = set()
+        self._removed = set()
+        self.flushes = 0
+
+        cookie_store.cookieAdded.connect(self.on_cookie_added)
+        cookie_store.cookieRemoved.connect(self.on_cookie_removed)
+
+        # Змінені cookies зберігаються періодично, а не на кожен сигнал
+        self.flush_timer = QTimer(self)
+        self.flush_timer.timeout.connect(self.flush)
+        self.flush_timer.start(flush_interval)
+
+    def _put(self, key: Tuple[str, str, str], data: Dict):
+        """Додавання cookie в індекси"""
+        self._cookies[key] = data
+        self._by_domain.setdefault(key[0], set()).add(key)
+
+    def _drop(self, key: Tuple[str, str, str]) -> bool:
+        """Видалення cookie з індексів"""
+        if self._cookies.pop(key, None) is None:
+            return False
+        keys = self._by_domain.get(key[0])
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._by_domain[key[0]]
+        return True
+
+    def restore(self) -> int:
+        """Відновлення збережених cookies у cookie store профілю"""
+        # Нормалізуємо через QNetworkCookie, щоб луна cookieAdded збігалася з кешем
+        cookies = [
+            cookie_to_dict(dict_to_cookie(data))
+            for data in self.session_manager.restore_cookies(self.profile_id)
+        ]
+        for data in cookies:
+            self._put(cookie_key(data), data)
+
+        for data in cookies:
+            host = data.get('domain', '').lstrip('.')
+            scheme = 'https' if data.get('secure') else 'http'
+            self.cookie_store.setCookie(dict_to_cookie(data), QUrl(f"{scheme}://{host}/"))
+        return len(cookies)
+
+    def on_cookie_added(self, cookie: QNetworkCookie):
+        """Новий або змінений cookie з браузера"""
+        data = cookie_to_dict(cookie)
+        key = cookie_key(data)
+        self._removed.discard(key)
+        # Відновлені cookies повертаються тим самим сигналом - не позначаємо їх зміненими
+        if self._cookies.get(key) == data:
+            return
+        self._put(key, data)
+        self._dirty.add(key)
+
+    def on_cookie_removed(self, cookie: QNetworkCookie):
+        """Видалений cookie з браузера"""
+        key = cookie_key(cookie_to_dict(cookie))
+        if self._drop(key):
+            self._dirty.discard(key)
+            self._removed.add(key)
+
+    def flush(self):
+        """Збереження змінених та видалених cookies однією транзакцією"""
+        if not self._dirty and not self._removed:
+            return None
+
+        dirty, removed = self._dirty, self._removed
+        self._dirty, self._removed = set(), set()
+        counts = self.session_manager.apply_cookie_changes(
+            self.profile_id,
+            [self._cookies[key] for key in dirty if key in self._cookies],
+            list(removed)
+        )
+        if counts is None:
+            # Не вдалося зберегти - спробуємо при наступному таймері
+            self._dirty |= dirty
+            self._removed |= removed - set(self._cookies)
+        else:
+            self.flushes += 1
+        return counts
+
+    def close(self):
+        """Зупинка захоплення та збереження залишку змін"""
+        self.flush_timer.stop()
+        try:
+            self.cookie_store.cookieAdded.disconnect(self.on_cookie_added)
+            self.cookie_store.cookieRemoved.disconnect(self.on_cookie_removed)
+        except (TypeError, RuntimeError):
+            pass
+        self.flush()
+
+    def cookies(self) -> List[Dict]:
+        """Усі cookies профілю"""
+        return list(self._cookies.values())
+
+    def cookies_for_domain(self, domain: str) -> List[Dict]:
+        """Cookies домену (з урахуванням варіанту з крапкою)"""
+        keys = self._by_domain.get(domain, set()) | self._by_domain.get(f".{domain.lstrip('.')}", set())
+        return [self._cookies[key] for key in keys]
+
+    def stats(self) -> Dict[str, int]:
+        """Розмір кешу та кількість незбережених змін"""
+        return {
+            'cookies': len(self._cookies),
+            'dirty': len(self._dirty),
+            'removed': len(self._removed),
+            'flushes': self.flushes,
+        }
+
+    def __len__(self):
+        return len(self._cookies)
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Диференційне збереження cookies для AnDetect Browser
+Спільна логіка для таблиць cookies (profiles.db) та saved_cookies (sessions.db)
+"""
+
+from typing import Dict, Iterable, Tuple
+
+
+# Природний ключ cookie в межах профілю
+COOKIE_KEY_COLUMNS = ('domain', 'name', 'path')
+
+
+def ensure_cookie_key(cursor, table: str):
+    """Унікальний індекс (profile_id, domain, name, path) з одноразовою дедуплікацією"""
+    index_name = f"idx_{table}_natural_key"
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = ?", (index_name,))
+    if cursor.fetchone():
+        return
+
+    # Старі бази могли містити дублікати - залишаємо найновіший запис
+    cursor.execute(f"UPDATE {table} SET path = '/' WHERE path IS NULL")
+    cursor.execute(f"""
+        DELETE FROM {table} WHERE id NOT IN (
+            SELECT MAX(id) FROM {table} GROUP BY profile_id, domain, name, path
+        )
+    """)
+    cursor.execute(f"CREATE UNIQUE INDEX {index_name} ON {table}(profile_id, domain, name, path)")
+
+
+def sync_cookies(conn, table: str, profile_id: str, cookies: Dict[Tuple, Tuple],
+                 value_columns: Tuple[str, ...], now: str,
+                 updated_column: str = None) -> Dict[str, int]:
+    """Збереження тільки змінених cookies профілю
+
+    cookies - словник {(domain, name, path): значення value_columns}.
+    Значення мають бути в тому ж вигляді, що й у базі (bool як 0/1), інакше
+    незмінені cookies будуть вважатися зміненими.
+    """
+    columns = ', '.join(value_columns)
+    cursor = conn.execute(
+        f"SELECT domain, name, path, {columns} FROM {table} WHERE profile_id = ?",
+        (profile_id,)
+    )
+    stored = {tuple(row[:3]): tuple(row[3:]) for row in cursor.fetchall()}
+
+    changed = {}
+    inserted = updated = 0
+    for key, values in cookies.items():
+        current = stored.get(key)
+        if current == values:
+            continue
+        if current is None:
+            inserted += 1
+        else:
+            updated += 1
+        changed[key] = values
+
+    removed = [key for key in stored if key not in cookies]
+    delete_cookies(conn, table, profile_id, removed)
+    upsert_cookies(conn, table, profile_id, changed, value_columns, now, updated_column)
+
+    return {
+        'inserted': inserted,
+        'updated': updated,
+        'removed': len(removed),
+        'unchanged': len(cookies) - inserted - updated,
+    }
+
+
+def upsert_cookies(conn, table: str, profile_id: str, cookies: Dict[Tuple, Tuple],
+                   value_columns: Tuple[str, ...], now: str, updated_column: str = None):
+    """Пакетний upsert cookies за природним ключем"""
+    if not cookies:
+        return
+
+    insert_columns = ('profile_id',) + COOKIE_KEY_COLUMNS + tuple(value_columns) + ('created_at',)
+    assignments = [f"{column} = excluded.{column}" for column in value_columns]
+    timestamps = (now,)
+    if updated_column:
+        insert_columns += (updated_column,)
+        assignments.append(f"{updated_column} = excluded.{updated_column}")
+        timestamps = (now, now)
+
+    conn.executemany(
+        f"INSERT INTO {table} ({', '.join(insert_columns)}) "
+        f"VALUES ({', '.join('?' * len(insert_columns))}) "
+        f"ON CONFLICT(profile_id, domain, name, path) DO UPDATE SET {', '.join(assignments)}",
+        [(profile_id,) + key + values + timestamps for key, values in cookies.items()]
+    )
+
+
+def delete_cookies(conn, table: str, profile_id: str, keys: Iterable[Tuple]):
+    """Пакетне видалення cookies за природним ключем"""
+    conn.executemany(
+        f"DELETE FROM {table} WHERE profile_id = ? AND domain = ? AND name = ? AND path = ?",
+        [(profile_id,) + tuple(key) for key in keys]
+    )
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Шифрування даних профілів для AnDetect Browser
+Версіонований бінарний конверт (AES-GCM) з підтримкою старих рядків Fernet
+"""
+
+import os
+import hmac
+import base64
+import threading
+from typing import Callable, Dict, Union
+
+from cryptography.fernet import Fernet
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+from cryptography.hazmat.primitives.kdf.hkdf import HKDF
+
+
+# Формат конверта v1: 1 байт версії + 12 байт nonce + шифротекст AES-GCM з тегом
+ENVELOPE_V1 = b"\x01"
+NONCE_SIZE = 12
+
+
+class ProfileCipher:
+    """Шифрування у конверт v1, розшифрування v1 та старих токенів Fernet"""
+
+    def __init__(self, key: bytes):
+        self.fernet = Fernet(key)
+        # Окремий ключ AES-GCM виводимо з ключа Fernet, щоб не змінювати encryption.key
+        master_key = base64.urlsafe_b64decode(key)
+        aead_key = HKDF(
+            algorithm=hashes.SHA256(),
+            length=32,
+            salt=None,
+            info=b"andetect-profile-envelope-v1",
+        ).derive(master_key)
+        self.aead = AESGCM(aead_key)
+        # Ключ HMAC для адрес даних за вмістом (без нього адреса - хеш відкритого тексту)
+        self.digest_key = HKDF(
+            algorithm=hashes.SHA256(),
+            length=32,
+            salt=None,
+            info=b"andetect-content-digest-v1",
+        ).derive(master_key)
+
+    def encrypt(self, data: bytes) -> bytes:
+        """Шифрування в бінарний конверт v1"""
+        nonce = os.urandom(NONCE_SIZE)
+        return ENVELOPE_V1 + nonce + self.aead.encrypt(nonce, data, ENVELOPE_V1)
+
+    def decrypt(self, token: Union[bytes, str]) -> bytes:
+        """Розшифрування конверта v1 або старого токена Fernet"""
+        if isinstance(token, str):
+            return self.fernet.decrypt(token.encode())
+
+        token = bytes(token)
+        if token[:1] == ENVELOPE_V1:
+            nonce = token[1:1 + NONCE_SIZE]
+            return self.aead.decrypt(nonce, token[1 + NONCE_SIZE:], ENVELOPE_V1)
+
+        return self.fernet.decrypt(token)
+
+    def digest(self, data: bytes) -> str:
+        """HMAC-SHA256 даних з ключем профілів (hex)"""
+        return hmac.new(self.digest_key, data, 'sha256').hexdigest()
+
+    @staticmethod
+    def is_current(token: Union[bytes, str]) -> bool:
+        """Чи збережено значення в актуальному форматі"""
+        return isinstance(token, bytes) and token[:1] == ENVELOPE_V1
+
+
+class EnvelopeMigrator(threading.Thread):
+    """Фонове перешифрування старих рядків Fernet у конверт v1 невеликими пакетами"""
+
+    def __init__(self, pool, cipher: ProfileCipher, table: str, column: str,
+                 batch_size: int = 200, pause: float = 0.05,
+                 progress_callback: Callable[[Dict[str, int]], None] = None):
+        super().__init__(name=f"EnvelopeMigrator-{table}", daemon=True)
+        self.pool = pool
+        self.cipher = cipher
+        self.table = table
+        self.column = column
+        self.batch_size = batch_size
+        self.pause = pause
+        self.progress_callback = progress_callback
+
+        self.migrated = 0
+        self.skipped = 0
+        self.failed = 0
+        self.last_rowid = 0
+        self._stop_event = threading.Event()
+
+    def migrate_batch(self) -> int:
+        """Перешифрування одного пакета (кількість прочитаних рядків)"""
+        # Старі токени Fernet зберігались як TEXT, конверт v1 - як BLOB
+        cursor = self.pool.execute(
+            f"SELECT rowid, {self.column} FROM {self.table} "
+            f"WHERE rowid > ? AND typeof({self.column}) = 'text' ORDER BY rowid LIMIT ?",
+            (self.last_rowid, self.batch_size)
+        )
+        rows = cursor.fetchall()
+        if not rows:
+            return 0
+
+        updates = []
+        for rowid, token in rows:
+            try:
+                updates.append((self.cipher.encrypt(self.cipher.decrypt(token)), rowid, token))
+            except Exception as e:
+                print(f"Помилка перешифрування {self.table}#{rowid}: {e}")
+                self.failed += 1
+        self.last_rowid = rows[-1][0]
+
+        # Рядок, змінений після читання, не чіпаємо (порівняння зі старим значенням)
+        with self.pool.transaction(immediate=True) as conn:
+            changes_before = conn.total_changes
+            conn.executemany(
+                f"UPDATE {self.table} SET {self.column} = ? WHERE rowid = ? AND {self.column} = ?",
+                updates
+            )
+            changed = conn.total_changes - changes_before
+
+        self.migrated += changed
+        self.skipped += len(updates) - changed
+        if self.progress_callback:
+            self.progress_callback(self.stats())
+        return len(rows)
+
+    def run(self):
+        """Обробка пакетів до завершення або зупинки"""
+        while not self._stop_event.is_set():
+            try:
+                if not self.migrate_batch():
+                    break
+            except Exception as e:
+                print(f"Помилка міграції {self.table}: {e}")
+                break
+            # Пауза між пакетами, щоб не тримати блокування запису
+            self._stop_event.wait(self.pause)
+
+    def stop(self):
+        """Зупинка після поточного пакета"""
+        self._stop_event.set()
+
+    def stats(self) -> Dict[str, int]:
+        """Статистика міграції"""
+        return {
+            'migrated': self.migrated,
+            'skipped': self.skipped,
+            'failed': self.failed,
+        }
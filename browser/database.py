@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Спільний шар з'єднань SQLite для AnDetect Browser
+Довгоживучі з'єднання (одне на потік) у режимі WAL для profiles.db, sessions.db та security.db
+"""
+
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Dict
+
+
+# Налаштування за замовчуванням (можна змінити до створення пулів)
+DEFAULT_SYNCHRONOUS = "NORMAL"   # OFF, NORMAL, FULL
+DEFAULT_CACHE_SIZE = -8000       # від'ємне значення - розмір у KiB
+DEFAULT_BUSY_TIMEOUT = 30.0      # секунди очікування блокування
+DEFAULT_CACHED_STATEMENTS = 256  # кеш підготовлених запитів на з'єднання
+DEFAULT_AUTO_VACUUM = "INCREMENTAL"  # для нових баз; наявні переводить обслуговування (maintenance)
+
+
+class ConnectionPool:
+    """Пул з'єднань SQLite: одне довгоживуче з'єднання на потік"""
+
+    _pools = {}
+    _pools_lock = threading.Lock()
+
+    @classmethod
+    def for_database(cls, db_path: str, **options) -> 'ConnectionPool':
+        """Спільний пул для файлу бази даних (один на процес)"""
+        key = os.path.abspath(db_path)
+        with cls._pools_lock:
+            pool = cls._pools.get(key)
+            if pool is None or pool.closed:
+                pool = cls(key, **options)
+                cls._pools[key] = pool
+            return pool
+
+    @classmethod
+    def close_all(cls):
+        """Закриття всіх пулів процесу"""
+        with cls._pools_lock:
+            pools = list(cls._pools.values())
+            cls._pools.clear()
+        for pool in pools:
+            pool.close()
+
+    def __init__(self, db_path: str, synchronous: str = None, cache_size: int = None,
+                 busy_timeout: float = None, cached_statements: int = None):
+        self.db_path = db_path
+        self.synchronous = synchronous or DEFAULT_SYNCHRONOUS
+        self.cache_size = DEFAULT_CACHE_SIZE if cache_size is None else cache_size
+        self.busy_timeout = DEFAULT_BUSY_TIMEOUT if busy_timeout is None else busy_timeout
+        self.cached_statements = cached_statements or DEFAULT_CACHED_STATEMENTS
+        self.closed = False
+
+        self._local = threading.local()
+        self._connections = {}  # thread ident -> connection
+        self._lock = threading.Lock()
+        self._generation = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        """Створення нового з'єднання з потрібними PRAGMA"""
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=self.busy_timeout,
+            isolation_level=None,  # транзакціями керуємо явно
+            check_same_thread=False,
+            cached_statements=self.cached_statements
+        )
+        # auto_vacuum діє лише на базу без таблиць, тому ставиться до першого запису
+        conn.execute(f"PRAGMA auto_vacuum = {DEFAULT_AUTO_VACUUM}")
+        conn.execute("PRAGMA journal_mode = WAL")
+        self._apply_pragmas(conn)
+        return conn
+
+    def _apply_pragmas(self, conn: sqlite3.Connection):
+        """Застосування налаштовуваних PRAGMA"""
+        conn.execute(f"PRAGMA synchronous = {self.synchronous}")
+        conn.execute(f"PRAGMA cache_size = {int(self.cache_size)}")
+        conn.execute("PRAGMA temp_store = MEMORY")
+
+    def connection(self) -> sqlite3.Connection:
+        """З'єднання поточного потоку"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            if self._local.generation != self._generation and self._local.depth == 0:
+                self._apply_pragmas(conn)
+                self._local.generation = self._generation
+            return conn
+
+        if self.closed:
+            raise sqlite3.ProgrammingError(f"Пул {self.db_path} закрито")
+
+        conn = self._connect()
+        self._local.conn = conn
+        self._local.depth = 0
+        self._local.immediate = False
+        self._local.generation = self._generation
+        with self._lock:
+            self._prune_dead_threads()
+            self._connections[threading.get_ident()] = conn
+        return conn
+
+    def _prune_dead_threads(self):
+        """Закриття з'єднань потоків, які вже завершились"""
+        alive = {thread.ident for thread in threading.enumerate()}
+        for ident in list(self._connections):
+            if ident not in alive:
+                try:
+                    self._connections.pop(ident).close()
+                except sqlite3.Error:
+                    pass
+
+    @contextmanager
+    def transaction(self, immediate: bool = False):
+        """Транзакція на з'єднанні поточного потоку (підтримує вкладеність)
+
+        Вкладена транзакція лише приєднується до зовнішньої, тому immediate=True
+        всередині відкладеної зовнішньої транзакції є помилкою: блокування запису
+        вже не буде взято до першого запису.
+        """
+        conn = self.connection()
+        depth = self._local.depth
+        if depth == 0:
+            conn.execute("BEGIN IMMEDIATE" if immediate else "BEGIN")
+            self._local.immediate = immediate
+        elif immediate and not self._local.immediate:
+            raise sqlite3.ProgrammingError(
+                "Транзакцію immediate=True вкладено у відкладену (BEGIN) транзакцію"
+            )
+        self._local.depth = depth + 1
+        try:
+            yield conn
+        except BaseException:
+            self._local.depth = depth
+            if depth == 0:
+                conn.execute("ROLLBACK")
+            raise
+        else:
+            self._local.depth = depth
+            if depth == 0:
+                conn.execute("COMMIT")
+
+    def execute(self, sql: str, parameters=()) -> sqlite3.Cursor:
+        """Виконання запиту в режимі автокоміту"""
+        return self.connection().execute(sql, parameters)
+
+    def configure(self, synchronous: str = None, cache_size: int = None) -> 'ConnectionPool':
+        """Зміна PRAGMA synchronous/cache_size для всіх з'єднань пулу"""
+        if synchronous is not None:
+            self.synchronous = synchronous
+        if cache_size is not None:
+            self.cache_size = cache_size
+        # Кожен потік застосує нові значення при наступному зверненні до з'єднання
+        self._generation += 1
+        return self
+
+    def close(self):
+        """Закриття всіх з'єднань пулу"""
+        self.closed = True
+        with self._lock:
+            connections = list(self._connections.values())
+            self._connections.clear()
+        for conn in connections:
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
+        self._local = threading.local()
+
+    def stats(self) -> Dict[str, int]:
+        """Кількість відкритих з'єднань"""
+        with self._lock:
+            return {'connections': len(self._connections)}
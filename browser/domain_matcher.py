@@ -0,0 +1,479 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Списки доменів безпеки в пам'яті для AnDetect Browser
+Перевірка домену без звернення до SQLite; security.db лишається лише сховищем,
+з якого знімок списків будується при старті та після оновлення списків.
+Скомпільований бінарний знімок (mmap) дозволяє не перебудовувати списки при кожному запуску
+"""
+
+import os
+import json
+import mmap
+import zlib
+import time
+import struct
+import threading
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Iterator, Tuple
+
+
+# Прапорці списків у записі домену
+WHITELIST = 1
+MALWARE = 2
+ADS = 4
+TRACKING = 8
+
+# Ключ запису самого домену у вузлі, що має піддомени (порожня мітка в домені неможлива)
+TERMINAL = ""
+
+
+class Verdict(tuple):
+    """Результат перевірки (білий список, категорія malware, реклама, трекер)
+
+    Запис домену в дереві вже враховує батьківські домени, тому перевірці достатньо
+    знайти найглибший запис; flags і category - власні прапорці запису
+    """
+
+    def __new__(cls, result: tuple, flags: int = 0, category: Optional[str] = None):
+        verdict = super().__new__(cls, result)
+        verdict.flags = flags
+        verdict.category = category
+        return verdict
+
+
+NOT_LISTED = Verdict((False, None, False, False))
+
+
+class ListSnapshot:
+    """Скомпільований знімок списків у файлі, що читається через mmap без десеріалізації
+
+    Формат: заголовок, індекс кошиків (u32 на кошик), записи, впорядковані за кошиком
+    (crc32 домену u32, зміщення u32, довжина u16, номер результату u16), таблиця
+    результатів (JSON) та рядки доменів. Контрольна сума crc32 охоплює все після заголовка.
+    Маска кількостей міток у заголовку дозволяє не шукати рівні, яких у списках немає;
+    покоління таблиць у заголовку має збігатися з поколінням у сховищі
+    """
+
+    MAGIC = b"ADSL"
+    FORMAT_VERSION = 2
+    HEADER = struct.Struct("<4sHHQQIIII4qI")
+    ENTRY = struct.Struct("<IIHH")  # 12 байт
+    BUCKET = struct.Struct("<II")
+
+    # Порядок максимальних id таблиць у заголовку
+    FLAG_ORDER = (MALWARE, ADS, TRACKING, WHITELIST)
+
+    # Біт n-1 маски - у списках є домени з n мітками (останній біт - 16 і більше)
+    MAX_LABEL_BIT = 15
+
+    def __init__(self, path: str, data: mmap.mmap, header: tuple, verdicts: List[Verdict]):
+        self.path = path
+        self.data = data
+        (_, _, self.label_mask, self.version, self.generation, self.domains,
+         buckets, verdicts_size, _, *max_ids, _) = header
+        self.max_ids = dict(zip(self.FLAG_ORDER, max_ids))
+        self.verdicts = verdicts
+        self.mask = buckets - 1
+        self.buckets_offset = self.HEADER.size
+        self.entries_offset = self.buckets_offset + (buckets + 1) * 4
+        self.strings_offset = self.entries_offset + self.domains * self.ENTRY.size + verdicts_size
+        self.size = len(data)
+        self._unpack_bucket = self.BUCKET.unpack_from
+        self._unpack_entry = self.ENTRY.unpack_from
+
+    @classmethod
+    def open(cls, path: str) -> Optional['ListSnapshot']:
+        """Відкриття знімка (None, якщо файлу немає, він іншого формату або пошкоджений)"""
+        if not os.path.exists(path):
+            return None
+        data = None
+        try:
+            with open(path, 'rb') as f:
+                data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            header = cls.HEADER.unpack_from(data)
+            magic, format_version, _, _, _, domains, buckets, verdicts_size, strings_size, *_, checksum = header
+            body_size = (buckets + 1) * 4 + domains * cls.ENTRY.size + verdicts_size + strings_size
+            if magic != cls.MAGIC or format_version != cls.FORMAT_VERSION:
+                raise ValueError("невідомий формат")
+            if len(data) != cls.HEADER.size + body_size:
+                raise ValueError("розмір файлу не збігається із заголовком")
+            with memoryview(data) as view:
+                with view[cls.HEADER.size:] as body:
+                    if zlib.crc32(body) != checksum:
+                        raise ValueError("контрольна сума не збігається")
+
+            verdicts_offset = cls.HEADER.size + (buckets + 1) * 4 + domains * cls.ENTRY.size
+            verdicts = [
+                Verdict(tuple(result), flags, category)
+                for flags, category, result in json.loads(data[verdicts_offset:verdicts_offset + verdicts_size])
+            ]
+            return cls(path, data, header, verdicts)
+        except Exception as e:
+            print(f"Помилка відкриття знімка списків {path}: {e}")
+            if data is not None:
+                data.close()
+            return None
+
+    @classmethod
+    def write(cls, path: str, lists: 'DomainLists') -> int:
+        """Компіляція знімка з дерева списків (атомарна заміна файлу, повертає розмір)"""
+        verdict_index = {}
+        entries = []
+        strings = bytearray()
+        label_mask = 0
+        for domain, verdict in iter_domains(lists.root):
+            data = domain.encode('utf-8', 'replace')
+            if len(data) > 0xFFFF:
+                continue
+            label_mask |= 1 << min(data.count(b'.'), cls.MAX_LABEL_BIT)
+            key = (verdict.flags, verdict.category, tuple(verdict))
+            index = verdict_index.setdefault(key, len(verdict_index))
+            entries.append((zlib.crc32(data), len(strings), len(data), index))
+            strings += data
+
+        buckets = 1
+        while buckets < len(entries):
+            buckets <<= 1
+        mask = buckets - 1
+        entries.sort(key=lambda entry: (entry[0] & mask, entry[0]))
+
+        # Індекс кошиків: початок діапазону записів кожного кошика
+        bucket_starts = [0] * (buckets + 1)
+        for entry in entries:
+            bucket_starts[(entry[0] & mask) + 1] += 1
+        for n in range(buckets):
+            bucket_starts[n + 1] += bucket_starts[n]
+
+        verdicts = json.dumps(
+            [[flags, category, list(result)] for flags, category, result in verdict_index],
+            ensure_ascii=False
+        ).encode('utf-8')
+        body = b"".join((
+            struct.pack(f"<{buckets + 1}I", *bucket_starts),
+            b"".join(cls.ENTRY.pack(*entry) for entry in entries),
+            verdicts,
+            bytes(strings),
+        ))
+        header = cls.HEADER.pack(
+            cls.MAGIC, cls.FORMAT_VERSION, label_mask, lists.version, lists.generation, len(entries), buckets,
+            len(verdicts), len(strings),
+            *(lists.max_ids.get(flag, 0) for flag in cls.FLAG_ORDER), zlib.crc32(body)
+        )
+
+        temp_path = path + ".tmp"
+        with open(temp_path, 'wb') as f:
+            f.write(header)
+            f.write(body)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+        return len(header) + len(body)
+
+    def close(self):
+        """Закриття відображення (поки файл відображено, на Windows його не видалити й не замінити)"""
+        if not self.data.closed:
+            self.data.close()
+
+    def lookup(self, data: bytes) -> Optional[Verdict]:
+        """Запис домену (закодованого в UTF-8) або None"""
+        checksum = zlib.crc32(data)
+        start, end = self._unpack_bucket(self.data, self.buckets_offset + (checksum & self.mask) * 4)
+        while start < end:
+            entry_checksum, position, length, index = self._unpack_entry(
+                self.data, self.entries_offset + start * 12
+            )
+            if entry_checksum == checksum and length == len(data):
+                position += self.strings_offset
+                if self.data[position:position + length] == data:
+                    return self.verdicts[index]
+            start += 1
+        return None
+
+    def levels(self, domain: str) -> Iterator[Tuple[int, Optional[Verdict]]]:
+        """Записи домену та батьківських доменів від найконкретнішого: (позиція, запис)"""
+        data = domain.encode('utf-8', 'replace')
+        dots = data.count(b'.')
+        position = 0
+        while True:
+            if self.label_mask >> min(dots, self.MAX_LABEL_BIT) & 1:
+                yield position, self.lookup(data[position:])
+            else:
+                yield position, None
+            position = data.find(b'.', position) + 1
+            if not position:
+                return
+            dots -= 1
+
+    def classify(self, domain: str) -> Verdict:
+        """Перевірка лише за знімком (найглибший запис уже враховує батьківські домени)"""
+        data = domain.encode('utf-8', 'replace')
+        label_mask = self.label_mask
+        dots = data.count(b'.')
+        position = 0
+        while True:
+            if label_mask >> min(dots, self.MAX_LABEL_BIT) & 1:
+                verdict = self.lookup(data[position:] if position else data)
+                if verdict is not None:
+                    return verdict
+            position = data.find(b'.', position) + 1
+            if not position:
+                return NOT_LISTED
+            dots -= 1
+
+
+@dataclass
+class DomainLists:
+    """Знімок списків: дерево міток домену у зворотному порядку (com -> example -> ads)
+
+    Вузол - dict {мітка: дочірній вузол}; запис домену (Verdict) лежить замість вузла,
+    якщо піддоменів немає, або під ключем TERMINAL. Якщо є скомпільований знімок,
+    дерево містить лише рядки, додані до сховища після його компіляції
+    """
+    root: Dict[str, object] = field(default_factory=dict)
+    domains: int = 0
+    version: int = 0
+    loaded_at: float = field(default_factory=time.time)
+    max_ids: Dict[int, int] = field(default_factory=dict)  # прапорець списку -> останній id у таблиці
+    generation: int = 0  # покоління таблиць сховища (змінюється, коли id рядків перестають бути чинними)
+    snapshot: Optional[ListSnapshot] = None
+    cache: Dict[str, Verdict] = field(default_factory=dict)  # результати перевірок за знімком
+
+
+def iter_domains(node: dict, suffix: Tuple[str, ...] = ()) -> Iterator[Tuple[str, Verdict]]:
+    """Усі домени дерева з їх записами"""
+    for label, child in node.items():
+        if label == TERMINAL:
+            yield '.'.join(reversed(suffix)), child
+        elif child.__class__ is dict:
+            yield from iter_domains(child, suffix + (label,))
+        else:
+            yield '.'.join(reversed(suffix + (label,))), child
+
+
+class DomainMatcher:
+    """Перевірка домену та всіх батьківських доменів за знімком списків з атомарною заміною"""
+
+    # Таблиці security.db, з яких будується знімок
+    LIST_TABLES = {
+        MALWARE: ("malware_domains", "category"),
+        ADS: ("ad_domains", "NULL"),
+        TRACKING: ("tracking_domains", "NULL"),
+        WHITELIST: ("whitelist_domains", "NULL"),
+    }
+
+    LIST_FLAGS = {'malware': MALWARE, 'ads': ADS, 'tracking': TRACKING, 'whitelist': WHITELIST}
+
+    # Кеш результатів перевірок за скомпільованим знімком (хости сторінки повторюються)
+    SNAPSHOT_CACHE_SIZE = 4096
+
+    def __init__(self):
+        self.lists = DomainLists()
+        self._swap_lock = threading.Lock()
+        self._verdicts = {}  # спільні записи (у знімку лише кілька десятків різних)
+
+    def _verdict(self, flags: int, category: Optional[str], parent: Verdict) -> Verdict:
+        """Запис домену з урахуванням найближчого батьківського запису
+
+        Білий список перемагає на своєму рівні та скасовує блокування менш конкретних
+        рівнів; блокування глибшого рівня знову діє
+        """
+        if flags & WHITELIST:
+            result = (True, None, False, False)
+        else:
+            result = (False, category if flags & MALWARE else parent[1],
+                      bool(flags & ADS) or parent[2], bool(flags & TRACKING) or parent[3])
+        key = (flags, category, result)
+        verdict = self._verdicts.get(key)
+        if verdict is None:
+            verdict = self._verdicts[key] = Verdict(result, flags, category)
+        return verdict
+
+    def _resolve_subtree(self, node: dict, parent: Verdict):
+        """Перерахунок записів піддоменів після зміни батьківського запису"""
+        for label, child in node.items():
+            if label == TERMINAL:
+                continue
+            if child.__class__ is dict:
+                entry = child.get(TERMINAL)
+                if entry is not None:
+                    entry = child[TERMINAL] = self._verdict(entry.flags, entry.category, parent)
+                self._resolve_subtree(child, entry if entry is not None else parent)
+            else:
+                node[label] = self._verdict(child.flags, child.category, parent)
+
+    def _insert(self, lists: DomainLists, domain: str, flag: int, category: Optional[str] = None):
+        """Додавання домену в дерево знімка"""
+        labels = domain.strip('.').split('.')
+        if not labels[0]:
+            return
+        node = lists.root
+        parent = NOT_LISTED
+        for label in reversed(labels[1:]):
+            child = node.get(label)
+            if child is None:
+                child = node[label] = {}
+            elif child.__class__ is not dict:
+                # Запис без піддоменів стає вузлом (одна заміна посилання для читачів)
+                child = node[label] = {TERMINAL: child}
+            parent = child.get(TERMINAL, parent)
+            node = child
+
+        label = labels[0]
+        child = node.get(label)
+        if child.__class__ is dict:
+            holder, key, entry = child, TERMINAL, child.get(TERMINAL)
+        else:
+            holder, key, entry = node, label, child
+        if entry is None:
+            lists.domains += 1
+            flags, own_category = flag, None
+        else:
+            flags, own_category = entry.flags | flag, entry.category
+        if flag == MALWARE:
+            own_category = category or ""
+        entry = holder[key] = self._verdict(flags, own_category, parent)
+        if holder is not node:
+            self._resolve_subtree(holder, entry)
+
+    def build(self, pool, snapshot: Optional[ListSnapshot] = None, generation: int = 0) -> DomainLists:
+        """Новий знімок зі сховища (поточний знімок продовжує обслуговувати перевірки)
+
+        Зі скомпільованим знімком у дерево читаються лише рядки, додані після компіляції;
+        покоління таблиць читається до рядків, тож знімок ніколи не новіший за нього
+        """
+        lists = DomainLists(version=self.lists.version + 1, snapshot=snapshot, generation=generation)
+        if snapshot is not None:
+            lists.version = max(lists.version, snapshot.version)
+        for flag, (table, category_column) in self.LIST_TABLES.items():
+            last_id = snapshot.max_ids.get(flag, 0) if snapshot is not None else 0
+            lists.max_ids[flag] = last_id
+            cursor = pool.execute(
+                f"SELECT id, domain, {category_column} FROM {table} WHERE id > ? ORDER BY id", (last_id,)
+            )
+            for row_id, domain, category in cursor:
+                self._insert(lists, domain, flag, category)
+                lists.max_ids[flag] = row_id
+        return lists
+
+    def swap(self, lists: DomainLists) -> DomainLists:
+        """Атомарна заміна знімка (повертає попередній; його файл знімка закривається)"""
+        with self._swap_lock:
+            previous, self.lists = self.lists, lists
+        if previous.snapshot is not None and previous.snapshot is not lists.snapshot:
+            previous.snapshot.close()
+        return previous
+
+    def reload(self, pool, before_swap=None, generation: int = 0) -> DomainLists:
+        """Побудова знімка зі сховища та заміна поточного
+
+        before_swap отримує новий знімок, поки його ще не змінюють додавання з інших потоків;
+        рядки, збережені під час побудови, дочитуються вже після заміни
+        """
+        lists = self.build(pool, generation=generation)
+        if before_swap is not None:
+            before_swap(lists)
+        self.swap(lists)
+        self.catch_up(pool)
+        return lists
+
+    def catch_up(self, pool):
+        """Дочитування в поточний знімок рядків, новіших за його останні id"""
+        lists = self.lists
+        for flag, (table, category_column) in self.LIST_TABLES.items():
+            cursor = pool.execute(
+                f"SELECT id, domain, {category_column} FROM {table} WHERE id > ? ORDER BY id",
+                (lists.max_ids.get(flag, 0),)
+            )
+            for row_id, domain, category in cursor:
+                self._insert(lists, domain, flag, category)
+                lists.max_ids[flag] = row_id
+        lists.cache.clear()
+
+    def add(self, list_name: str, domain: str, value: str = ""):
+        """Додавання одного домену в поточний знімок (ручне додавання, базові списки)"""
+        self._insert(self.lists, domain, self.LIST_FLAGS[list_name], value)
+        self.lists.cache.clear()
+
+    def classify(self, domain: str) -> Verdict:
+        """Усі перевірки за одним знімком: (білий список, категорія malware, реклама, трекер)
+
+        Вартість пропорційна кількості міток домену, а не розміру списків
+        """
+        lists = self.lists
+        if lists.snapshot is not None:
+            verdict = lists.cache.get(domain)
+            if verdict is None:
+                try:
+                    verdict = self._classify_with_snapshot(lists, domain)
+                except ValueError:
+                    # Файл знімка закрили після заміни, поки тривала перевірка - повтор за новими списками
+                    if self.lists is lists:
+                        raise
+                    return self.classify(domain)
+                if len(lists.cache) >= self.SNAPSHOT_CACHE_SIZE:
+                    lists.cache.clear()
+                lists.cache[domain] = verdict
+            return verdict
+        node = lists.root
+        verdict = NOT_LISTED
+        for label in reversed(domain.strip('.').split('.')):
+            node = node.get(label)
+            if node is None:
+                break
+            if node.__class__ is not dict:
+                return node
+            verdict = node.get(TERMINAL, verdict)
+        return verdict
+
+    def _classify_with_snapshot(self, lists: DomainLists, domain: str) -> Verdict:
+        """Перевірка за скомпільованим знімком і деревом доданих після нього доменів"""
+        domain = domain.strip('.')
+        labels = domain.split('.')
+
+        # Власні записи дерева за глибиною (від домену верхнього рівня)
+        overlay = {}
+        node = lists.root
+        for depth, label in enumerate(reversed(labels)):
+            node = node.get(label)
+            if node is None:
+                break
+            entry = node if node.__class__ is not dict else node.get(TERMINAL)
+            if entry is not None:
+                overlay[depth] = entry
+            if node.__class__ is not dict:
+                break
+        if not overlay:
+            return lists.snapshot.classify(domain)
+
+        # Об'єднання власних прапорців обох джерел рівень за рівнем
+        levels = list(lists.snapshot.levels(domain))
+        verdict = NOT_LISTED
+        for depth, (_, snapshot_entry) in enumerate(reversed(levels)):
+            entry = overlay.get(depth)
+            if entry is None and snapshot_entry is None:
+                continue
+            flags = (entry.flags if entry is not None else 0) | \
+                (snapshot_entry.flags if snapshot_entry is not None else 0)
+            if entry is not None and entry.flags & MALWARE:
+                category = entry.category
+            else:
+                category = snapshot_entry.category if snapshot_entry is not None else None
+            verdict = self._verdict(flags, category, verdict)
+        return verdict
+
+    def is_whitelisted(self, domain: str) -> bool:
+        """Чи домен (або батьківський домен) у білому списку"""
+        return self.classify(domain)[0]
+
+    def malware_category(self, domain: str) -> Optional[str]:
+        """Категорія шкідливого домену (None, якщо ні домен, ні батьківські домени не в списку)"""
+        return self.classify(domain)[1]
+
+    def is_ad_domain(self, domain: str) -> bool:
+        """Чи домен рекламний"""
+        return self.classify(domain)[2]
+
+    def is_tracking_domain(self, domain: str) -> bool:
+        """Чи домен трекінговий"""
+        return self.classify(domain)[3]
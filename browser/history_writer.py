@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Фоновий запис історії браузінгу для AnDetect Browser
+Відвідування накопичуються в пам'яті, об'єднуються по (profile_id, url)
+та записуються пакетами у фоновому потоці
+"""
+
+import time
+import threading
+from datetime import datetime
+from typing import Dict
+
+
+class HistoryWriter(threading.Thread):
+    """Черга відкладеного запису історії з пакетним upsert"""
+
+    UPSERT_SQL = """
+        INSERT INTO browsing_history (profile_id, url, title, visit_time, visit_count)
+        VALUES (?, ?, ?, ?, ?)
+        ON CONFLICT(profile_id, url) DO UPDATE SET
+            visit_count = visit_count + excluded.visit_count,
+            visit_time = excluded.visit_time,
+            title = COALESCE(NULLIF(excluded.title, ''), title)
+    """
+
+    def __init__(self, pool, flush_interval: float = 0.3, max_pending: int = 500):
+        super().__init__(name="HistoryWriter", daemon=True)
+        self.pool = pool
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+
+        self._pending = {}  # (profile_id, url) -> [title, visit_time, visits]
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+
+        # Метрики
+        self.queued_visits = 0
+        self.flushed_rows = 0
+        self.flushes = 0
+        self.failed_flushes = 0
+        self.last_flush_ms = 0.0
+        self.max_flush_ms = 0.0
+        self.total_flush_ms = 0.0
+
+    def add_visit(self, profile_id: str, url: str, title: str = "", visit_time: str = None,
+                  visits: int = 1):
+        """Додавання відвідування в чергу (visits=0 - лише оновлення заголовка)"""
+        visit_time = visit_time or datetime.now().isoformat()
+        with self._lock:
+            entry = self._pending.get((profile_id, url))
+            if entry is None:
+                self._pending[(profile_id, url)] = [title, visit_time, visits]
+            else:
+                # Порожній заголовок (сторінка ще вантажиться) не затирає відомий
+                if title:
+                    entry[0] = title
+                entry[1] = visit_time
+                entry[2] += visits
+            self.queued_visits += visits
+            pending = len(self._pending)
+
+        if pending >= self.max_pending:
+            self._wake.set()
+
+    def flush(self) -> int:
+        """Запис накопичених відвідувань однією транзакцією (кількість рядків)"""
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, {}
+            if not pending:
+                return 0
+
+            start = time.perf_counter()
+            try:
+                with self.pool.transaction(immediate=True) as conn:
+                    conn.executemany(self.UPSERT_SQL, [
+                        (profile_id, url, title, visit_time, visits)
+                        for (profile_id, url), (title, visit_time, visits) in pending.items()
+                    ])
+            except Exception as e:
+                print(f"Помилка запису історії: {e}")
+                self.failed_flushes += 1
+                self._requeue(pending)
+                return 0
+
+            elapsed = (time.perf_counter() - start) * 1000
+            self.flushes += 1
+            self.flushed_rows += len(pending)
+            self.last_flush_ms = elapsed
+            self.max_flush_ms = max(self.max_flush_ms, elapsed)
+            self.total_flush_ms += elapsed
+            return len(pending)
+
+    def _requeue(self, pending: Dict):
+        """Повернення невдалого пакета в чергу (новіші відвідування мають пріоритет)"""
+        with self._lock:
+            for key, (title, visit_time, visits) in pending.items():
+                entry = self._pending.get(key)
+                if entry is None:
+                    self._pending[key] = [title, visit_time, visits]
+                else:
+                    entry[2] += visits
+
+    def run(self):
+        """Періодичний запис черги до зупинки"""
+        while not self._stopping.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.flush()
+        self.flush()
+
+    @property
+    def stopped(self) -> bool:
+        """Чи викликано stop() (зупинений потік не перезапускається)"""
+        return self._stopping.is_set()
+
+    def stop(self, timeout: float = 5.0):
+        """Зупинка потоку із записом залишку черги"""
+        self._stopping.set()
+        self._wake.set()
+        if self.is_alive():
+            self.join(timeout)
+        # Якщо потік не запускався або не встиг - записуємо в поточному потоці
+        self.flush()
+
+    def metrics(self) -> Dict[str, float]:
+        """Глибина черги та затримки запису"""
+        with self._lock:
+            queue_depth = len(self._pending)
+        return {
+            'queue_depth': queue_depth,
+            'queued_visits': self.queued_visits,
+            'flushed_rows': self.flushed_rows,
+            'flushes': self.flushes,
+            'failed_flushes': self.failed_flushes,
+            'last_flush_ms': round(self.last_flush_ms, 3),
+            'max_flush_ms': round(self.max_flush_ms, 3),
+            'avg_flush_ms': round(self.total_flush_ms / self.flushes, 3) if self.flushes else 0.0,
+        }
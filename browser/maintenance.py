@@ -0,0 +1,324 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Обслуговування баз SQLite для AnDetect Browser
+Контрольні точки WAL, інкрементальне звільнення сторінок, оновлення статистики планувальника
+та перевірка цілісності profiles.db, sessions.db (або шардів профілів) і security.db у простої
+"""
+
+import os
+import time
+import threading
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Callable, List, Dict, Optional, Tuple, Union
+
+from PyQt5.QtCore import QObject, QEvent, QTimer, pyqtSignal
+from PyQt5.QtWidgets import QApplication
+
+from .database import ConnectionPool
+
+
+@dataclass
+class MaintenanceReport:
+    """Результат обслуговування однієї бази"""
+    database: str
+    tasks: List[str]
+    started_at: str = field(default_factory=lambda: datetime.now().isoformat())
+    size_before: int = 0
+    size_after: int = 0
+    freed_pages: int = 0
+    free_pages_left: int = 0
+    integrity: str = ""
+    task_ms: Dict[str, float] = field(default_factory=dict)
+    error: str = ""
+
+    @property
+    def reclaimed_bytes(self) -> int:
+        """Звільнене місце на диску (база + WAL)"""
+        return self.size_before - self.size_after
+
+    @property
+    def elapsed_ms(self) -> float:
+        """Загальний час обслуговування бази"""
+        return sum(self.task_ms.values())
+
+
+class DatabaseMaintenance:
+    """Операції обслуговування над пулом з'єднань однієї бази"""
+
+    # Звільнення сторінок порціями (кожна - окрема коротка транзакція) в межах бюджету часу
+    VACUUM_SLICE_PAGES = 256
+    VACUUM_TIME_BUDGET = 0.25  # секунди на базу за один прохід
+
+    # Бази без auto_vacuum=INCREMENTAL переводяться повним VACUUM,
+    # якщо вільних сторінок набралось хоча б стільки
+    CONVERT_MIN_FREE_BYTES = 1024 * 1024
+
+    # Максимум рядків на індекс для ANALYZE
+    ANALYSIS_LIMIT = 1000
+
+    def __init__(self, name: str, pool: ConnectionPool):
+        self.name = name
+        self.pool = pool
+
+    def pragma(self, name: str) -> int:
+        """Значення цілочисельного PRAGMA"""
+        return self.pool.execute(f"PRAGMA {name}").fetchone()[0]
+
+    def disk_size(self) -> int:
+        """Розмір файлу бази та WAL"""
+        return sum(
+            os.path.getsize(self.pool.db_path + suffix)
+            for suffix in ("", "-wal") if os.path.exists(self.pool.db_path + suffix)
+        )
+
+    def integrity_check(self) -> str:
+        """PRAGMA quick_check ('ok' або перша знайдена проблема)"""
+        return self.pool.execute("PRAGMA quick_check(1)").fetchone()[0]
+
+    def analyze(self):
+        """Оновлення статистики планувальника (обмежений ANALYZE та PRAGMA optimize)"""
+        self.pool.execute(f"PRAGMA analysis_limit = {self.ANALYSIS_LIMIT}")
+        self.pool.execute("ANALYZE")
+        self.pool.execute("PRAGMA optimize")
+
+    def incremental_vacuum(self, time_budget: float = None) -> Tuple[int, int]:
+        """Звільнення вільних сторінок порціями (звільнено, залишилось)"""
+        time_budget = self.VACUUM_TIME_BUDGET if time_budget is None else time_budget
+        free_pages = self.pragma("freelist_count")
+        if not free_pages:
+            return 0, 0
+
+        # Перший перехід на інкрементальний режим можливий лише через повний VACUUM
+        if self.pragma("auto_vacuum") != 2:
+            if free_pages * self.pragma("page_size") < self.CONVERT_MIN_FREE_BYTES:
+                return 0, free_pages
+            self.pool.execute("PRAGMA auto_vacuum = INCREMENTAL")
+            self.pool.execute("VACUUM")
+            return free_pages, self.pragma("freelist_count")
+
+        freed = 0
+        deadline = time.perf_counter() + time_budget
+        while free_pages and time.perf_counter() < deadline:
+            pages = min(free_pages, self.VACUUM_SLICE_PAGES)
+            self.pool.execute(f"PRAGMA incremental_vacuum({pages})").fetchall()
+            remaining = self.pragma("freelist_count")
+            freed += free_pages - remaining
+            if remaining >= free_pages:
+                break
+            free_pages = remaining
+        return freed, free_pages
+
+    def checkpoint(self) -> bool:
+        """Перенесення WAL у базу та обрізання WAL-файлу (False, якщо заважали читачі)"""
+        busy, _, _ = self.pool.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchone()
+        if busy:
+            self.pool.execute("PRAGMA wal_checkpoint(PASSIVE)").fetchone()
+        return not busy
+
+    def run(self, tasks: List[str], vacuum_budget: float = None) -> MaintenanceReport:
+        """Виконання задач у порядку integrity, analyze, vacuum, checkpoint"""
+        report = MaintenanceReport(self.name, list(tasks))
+        try:
+            report.size_before = self.disk_size()
+            for task in ('integrity', 'analyze', 'vacuum', 'checkpoint'):
+                if task not in tasks:
+                    continue
+                start = time.perf_counter()
+                if task == 'integrity':
+                    report.integrity = self.integrity_check()
+                elif task == 'analyze':
+                    self.analyze()
+                elif task == 'vacuum':
+                    report.freed_pages, report.free_pages_left = self.incremental_vacuum(vacuum_budget)
+                else:
+                    self.checkpoint()
+                report.task_ms[task] = round((time.perf_counter() - start) * 1000, 2)
+            report.size_after = self.disk_size()
+        except Exception as e:
+            report.error = str(e)
+            report.size_after = report.size_before
+        return report
+
+
+class MaintenanceScheduler(QObject):
+    """Планувальник обслуговування баз у простої програми (робота у фоновому потоці)"""
+
+    maintenance_finished = pyqtSignal(list)  # List[MaintenanceReport]
+    database_corrupted = pyqtSignal(str, str)  # database, повідомлення quick_check
+
+    # Інтервали задач (секунди)
+    TASK_INTERVALS = {
+        'checkpoint': 5 * 60,
+        'vacuum': 15 * 60,
+        'analyze': 6 * 60 * 60,
+        'integrity': 24 * 60 * 60,
+    }
+
+    # Перевірка розкладу та мінімальний простій користувача перед запуском
+    TICK_INTERVAL = 60 * 1000  # мс
+    IDLE_DELAY = 30.0  # секунди
+
+    # Події, які вважаються активністю користувача
+    ACTIVITY_EVENTS = (QEvent.KeyPress, QEvent.MouseButtonPress, QEvent.Wheel)
+
+    def __init__(self, parent: QObject = None, history_size: int = 200):
+        super().__init__(parent)
+        self.databases = {}  # name -> ConnectionPool або функція, що повертає чинний пул
+        self.shard_stores = []  # ShardedStateStore
+        self.last_run = {}  # (name, task) -> time.monotonic()
+        self.last_activity = time.monotonic()
+        self.reports = deque(maxlen=history_size)
+        self._worker = None
+
+        app = QApplication.instance()
+        if app is not None:
+            app.installEventFilter(self)
+
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.tick)
+        self.timer.start(self.TICK_INTERVAL)
+
+    def add_database(self, name: str, pool: Union[ConnectionPool, Callable[[], ConnectionPool]]):
+        """Реєстрація бази для обслуговування (пул або функція, що повертає чинний пул)"""
+        self.databases[name] = pool
+
+    def add_state_store(self, state):
+        """Реєстрація сховища стану профілів (sessions.db або шарди profiles/<id>/state.db)
+
+        state - сховище або функція, що повертає чинне (спільне сховище замінюється новим,
+        коли його пул закрито, тож пул береться з нього на кожен прохід)
+        """
+        current = state() if callable(state) else state
+        if current.pool is None:
+            self.shard_stores.append(current)
+        elif callable(state):
+            self.add_database(os.path.basename(current.db_path), lambda: state().pool)
+        else:
+            self.add_database(os.path.basename(current.db_path), current.pool)
+
+    def eventFilter(self, obj, event) -> bool:
+        """Відстеження активності користувача"""
+        if event.type() in self.ACTIVITY_EVENTS:
+            self.last_activity = time.monotonic()
+        return False
+
+    def notify_activity(self):
+        """Позначка активності (наприклад, навігація або запис стану профілю)"""
+        self.last_activity = time.monotonic()
+
+    def is_idle(self) -> bool:
+        """Користувач не активний щонайменше IDLE_DELAY секунд"""
+        return time.monotonic() - self.last_activity >= self.IDLE_DELAY
+
+    def is_running(self) -> bool:
+        """Чи виконується обслуговування"""
+        return self._worker is not None and self._worker.is_alive()
+
+    def targets(self) -> List[Tuple[str, ConnectionPool, Optional[object]]]:
+        """Бази для обслуговування: (назва, пул або None, сховище шардів або None)"""
+        targets = [
+            (name, pool() if callable(pool) else pool, None) for name, pool in self.databases.items()
+        ]
+        for store in self.shard_stores:
+            targets.extend(
+                (f"profiles/{profile_id}/{store.SHARD_FILE}", None, store)
+                for profile_id in store.profile_ids()
+            )
+        return targets
+
+    def due_tasks(self, name: str, now: float) -> List[str]:
+        """Задачі бази, для яких настав час"""
+        tasks = [
+            task for task, interval in self.TASK_INTERVALS.items()
+            if now - self.last_run.get((name, task), float('-inf')) >= interval
+        ]
+        # У режимі WAL файл бази зменшується лише після контрольної точки
+        if 'vacuum' in tasks and 'checkpoint' not in tasks:
+            tasks.append('checkpoint')
+        return tasks
+
+    def tick(self):
+        """Запуск обслуговування, якщо програма простоює і є задачі за розкладом"""
+        if self.is_running() or not self.is_idle():
+            return
+        self.run_now()
+
+    def run_now(self, tasks: List[str] = None) -> bool:
+        """Обслуговування у фоновому потоці (вказані задачі для всіх баз або задачі за розкладом)"""
+        if self.is_running():
+            return False
+
+        now = time.monotonic()
+        plan = []
+        for name, pool, store in self.targets():
+            due = list(tasks) if tasks else self.due_tasks(name, now)
+            if due:
+                plan.append((name, pool, store, due))
+        if not plan:
+            return False
+
+        self._worker = threading.Thread(target=self._run_plan, args=(plan,),
+                                        name="DatabaseMaintenance", daemon=True)
+        self._worker.start()
+        return True
+
+    def _run_plan(self, plan: list):
+        """Послідовне обслуговування баз (перерва, якщо користувач повернувся)"""
+        reports = []
+        for name, pool, store, tasks in plan:
+            # Між базами перевіряємо простій, щоб не заважати активній роботі
+            if reports and not self.is_idle():
+                break
+            if store is not None:
+                profile_id = name.split('/')[1]
+                with store.shard(profile_id, create=False) as shard:
+                    if shard is None:
+                        continue
+                    report = DatabaseMaintenance(name, shard.pool).run(tasks)
+            else:
+                report = DatabaseMaintenance(name, pool).run(tasks)
+
+            finished = time.monotonic()
+            for task in report.task_ms:
+                self.last_run[(name, task)] = finished
+            if report.error:
+                print(f"Помилка обслуговування {name}: {report.error}")
+            elif report.integrity and report.integrity != 'ok':
+                self.database_corrupted.emit(name, report.integrity)
+            reports.append(report)
+            self.reports.append(report)
+
+        if reports:
+            self.maintenance_finished.emit(reports)
+
+    def wait(self, timeout: float = None):
+        """Очікування завершення поточного обслуговування"""
+        if self._worker is not None:
+            self._worker.join(timeout)
+
+    def stop(self):
+        """Зупинка розкладу та очікування поточного проходу"""
+        self.timer.stop()
+        app = QApplication.instance()
+        if app is not None:
+            app.removeEventFilter(self)
+        self.wait()
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """Звільнене місце, час та кількість проходів по кожній базі"""
+        summary = {}
+        for report in self.reports:
+            entry = summary.setdefault(report.database, {
+                'runs': 0, 'reclaimed_bytes': 0, 'elapsed_ms': 0.0, 'freed_pages': 0, 'errors': 0,
+            })
+            entry['runs'] += 1
+            entry['reclaimed_bytes'] += report.reclaimed_bytes
+            entry['elapsed_ms'] = round(entry['elapsed_ms'] + report.elapsed_ms, 2)
+            entry['freed_pages'] += report.freed_pages
+            entry['errors'] += bool(report.error)
+            entry['integrity'] = report.integrity or entry.get('integrity', '')
+            entry['last_run'] = report.started_at
+        return summary
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Кеш розшифрованих профілів для AnDetect Browser
+Зберігає профілі в пам'яті процесу, щоб не розшифровувати їх при кожному читанні
+"""
+
+import os
+import copy
+import threading
+from typing import Dict, Iterable, Optional
+
+
+class ProfileCache:
+    """Кеш профілів на рівні процесу з версіонуванням рядків"""
+
+    _instances = {}
+    _instances_lock = threading.Lock()
+
+    @classmethod
+    def for_database(cls, db_path: str) -> 'ProfileCache':
+        """Спільний кеш для бази даних (один на процес)"""
+        key = os.path.abspath(db_path)
+        with cls._instances_lock:
+            cache = cls._instances.get(key)
+            if cache is None:
+                cache = cls()
+                cls._instances[key] = cache
+            return cache
+
+    def __init__(self):
+        self._entries = {}  # profile_id -> (version, profile)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, profile_id: str, version: int):
+        """Отримання копії профілю, якщо версія в кеші збігається"""
+        with self._lock:
+            entry = self._entries.get(profile_id)
+            if entry is not None and entry[0] == version:
+                self.hits += 1
+                return copy.copy(entry[1])
+            self.misses += 1
+        return None
+
+    def put(self, profile_id: str, version: int, profile):
+        """Збереження профілю в кеш"""
+        with self._lock:
+            current = self._entries.get(profile_id)
+            # Не перезаписуємо новішу версію старішою
+            if current is None or current[0] <= version:
+                self._entries[profile_id] = (version, copy.copy(profile))
+
+    def invalidate(self, profile_id: str):
+        """Видалення профілю з кешу"""
+        with self._lock:
+            self._entries.pop(profile_id, None)
+
+    def retain(self, profile_ids: Iterable[str]):
+        """Залишаємо в кеші тільки вказані профілі"""
+        keep = set(profile_ids)
+        with self._lock:
+            for profile_id in list(self._entries):
+                if profile_id not in keep:
+                    del self._entries[profile_id]
+
+    def clear(self):
+        """Очищення кешу"""
+        with self._lock:
+            self._entries.clear()
+
+    def reset_stats(self):
+        """Скидання лічильників"""
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict[str, int]:
+        """Статистика кешу"""
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'size': len(self._entries)
+            }
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, profile_id: Optional[str]) -> bool:
+        return profile_id in self._entries
@@ -7,16 +7,47 @@
 """
 
 import os
+import re
+import sys
 import json
 import sqlite3
 import uuid
 from datetime import datetime
-from typing import List, Dict, Optional
-from dataclasses import dataclass, asdict
+from typing import Callable, List, Dict, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, asdict, fields
 from cryptography.fernet import Fernet
 import random
 
+from .crypto import ProfileCipher, EnvelopeMigrator
+from .database import ConnectionPool
+from .profile_cache import ProfileCache
+from .profile_state import ProfileStateStore
+from .state_shards import ShardedStateStore
 
+
+def slotted(cls):
+    """Перестворення dataclass з __slots__ (аналог slots=True для Python < 3.10)"""
+    field_names = tuple(f.name for f in fields(cls))
+    cls_dict = dict(cls.__dict__)
+    cls_dict['__slots__'] = field_names
+    # Значення за замовчуванням уже збережені в __init__ та __dataclass_fields__
+    for name in field_names:
+        cls_dict.pop(name, None)
+    cls_dict.pop('__dict__', None)
+    cls_dict.pop('__weakref__', None)
+    return type(cls)(cls.__name__, cls.__bases__, cls_dict)
+
+
+def intern_fields(obj, field_names: tuple):
+    """Інтернування повторюваних рядкових значень (одна копія на процес)"""
+    for name in field_names:
+        value = getattr(obj, name)
+        if type(value) is str:
+            setattr(obj, name, sys.intern(value))
+
+
+@slotted
 @dataclass
 class BrowserProfile:
     """Клас для представлення профілю браузера"""
@@ -57,6 +88,13 @@ class BrowserProfile:
     status: str = "active"     # Статус: active, inactive, blocked
     notes: str = ""            # Нотатки користувача
     
+    # Категоріальні значення, які повторюються в тисячах профілів
+    INTERNED_FIELDS = ('user_agent', 'timezone', 'language', 'proxy_type', 'icon_type',
+                       'country_code', 'label_color', 'status')
+    
+    def __post_init__(self):
+        intern_fields(self, self.INTERNED_FIELDS)
+        
     def to_dict(self):
         """Конвертація в словник"""
         return asdict(self)
@@ -67,10 +105,93 @@ class BrowserProfile:
         return cls(**data)
 
 
+@slotted
+@dataclass
+class ProfileSummary:
+    """Короткий запис профілю для списків (тільки відкриті колонки, без розшифрування)"""
+    id: str
+    name: str
+    last_used: str
+    description: str = ""
+    tags: str = ""
+    status: str = "active"
+    icon_type: str = "default"
+    country_code: str = "UA"
+    favorite: bool = False
+    label_color: str = "blue"
+    proxy_type: str = "HTTP"
+    proxy_host: str = ""
+    proxy_port: int = 0
+    user_agent: str = ""
+    usage_count: int = 0
+    total_time: int = 0
+    
+    INTERNED_FIELDS = ('status', 'icon_type', 'country_code', 'label_color',
+                       'proxy_type', 'user_agent')
+    
+    def __post_init__(self):
+        intern_fields(self, self.INTERNED_FIELDS)
+        
+    @classmethod
+    def from_row(cls, row: tuple):
+        """Створення з рядка SUMMARY_COLUMNS"""
+        summary = cls(*row)
+        summary.favorite = bool(summary.favorite)
+        return summary
+
+
+@dataclass
+class ProfileChange:
+    """Подія зміни профілю для інкрементального оновлення UI"""
+    kind: str                     # added, updated, removed
+    profile_id: str
+    fields: Tuple[str, ...] = ()  # змінені поля (для updated)
+    external: bool = False        # зміна з іншого процесу (з журналу змін)
+
+
 class ProfileManager:
     """Менеджер профілів браузера"""
     
-    def __init__(self, data_dir: str = None):
+    # Не секретні поля, які дублюються у відкриті колонки (фільтри в SQL та короткі записи для списків)
+    PLAIN_FIELDS = {
+        'description': "TEXT NOT NULL DEFAULT ''",
+        'tags': "TEXT NOT NULL DEFAULT ''",
+        'status': "TEXT NOT NULL DEFAULT 'active'",
+        'icon_type': "TEXT NOT NULL DEFAULT 'default'",
+        'country_code': "TEXT NOT NULL DEFAULT 'UA'",
+        'favorite': "INTEGER NOT NULL DEFAULT 0",
+        'label_color': "TEXT NOT NULL DEFAULT 'blue'",
+        'proxy_type': "TEXT NOT NULL DEFAULT 'HTTP'",
+        'proxy_host': "TEXT NOT NULL DEFAULT ''",
+        'proxy_port': "INTEGER NOT NULL DEFAULT 0",
+        'user_agent': "TEXT NOT NULL DEFAULT ''",
+        'usage_count': "INTEGER NOT NULL DEFAULT 0",
+        'total_time': "INTEGER NOT NULL DEFAULT 0",
+    }
+    
+    # Відкриті колонки мають пріоритет над значеннями в зашифрованих даних
+    PLAIN_COLUMNS = ('name', 'last_used') + tuple(PLAIN_FIELDS)
+    PLAIN_ROW_COLUMNS = ", ".join(PLAIN_COLUMNS)
+    SUMMARY_COLUMNS = "id, " + PLAIN_ROW_COLUMNS
+    
+    INSERT_PROFILE_SQL = (
+        "INSERT INTO profiles (id, name, data, created_at, last_used, version, data_version, "
+        + ", ".join(PLAIN_FIELDS) + ") VALUES (?, ?, ?, ?, ?, 1, 1, "
+        + ", ".join("?" * len(PLAIN_FIELDS)) + ")"
+    )
+    
+    # Скільки останніх записів журналу змін зберігати
+    CHANGE_LOG_SIZE = 10000
+    
+    # Варіанти сортування для search_profile_ids
+    SORT_ORDERS = {
+        'last_used': "last_used DESC",
+        'name': "name COLLATE NOCASE ASC",
+        'status': "status ASC, last_used DESC",
+        'favorite': "favorite DESC, last_used DESC",
+    }
+    
+    def __init__(self, data_dir: str = None, sharded_state: bool = False):
         if data_dir is None:
             data_dir = os.path.join(os.path.expanduser("~"), "AnDetectBrowser")
             
@@ -82,12 +203,39 @@ class ProfileManager:
         os.makedirs(self.data_dir, exist_ok=True)
         os.makedirs(self.profiles_dir, exist_ok=True)
         
-        # Ініціалізуємо базу даних
-        self.init_database()
-        
         # Генеруємо ключ шифрування
         self.encryption_key = self.get_or_create_encryption_key()
-        self.cipher = Fernet(self.encryption_key)
+        self.cipher = ProfileCipher(self.encryption_key)
+        self.migrators = []
+        
+        # Підписники на події змін та позиція в журналі змін
+        self.listeners = []
+        self.origin = uuid.uuid4().hex
+        self.last_change_seq = 0
+        
+        # Спільний кеш розшифрованих профілів
+        self.cache = ProfileCache.for_database(self.db_path)
+        
+        # Ініціалізуємо базу даних (спільний пул з'єднань у режимі WAL)
+        self.pool = ConnectionPool.for_database(self.db_path)
+        self.fts_enabled = False
+        self.init_database()
+        
+        # Cookies, сесії та історія профілів - в єдиному сховищі sessions.db
+        # або (sharded_state) в окремій базі кожного профілю profiles/<id>/state.db
+        if sharded_state:
+            self._state = ShardedStateStore(self.profiles_dir, self.cipher)
+        else:
+            self._state = ProfileStateStore.for_database(os.path.join(data_dir, "sessions.db"), self.cipher)
+        self.migrate_profile_state()
+        
+    @property
+    def state(self):
+        """Сховище стану профілів (спільне сховище береться заново, якщо його пул закрито)"""
+        state = self._state
+        if state.pool is not None and state.pool.closed:
+            state = self._state = ProfileStateStore.for_database(state.db_path, self.cipher)
+        return state
         
     def get_or_create_encryption_key(self) -> bytes:
         """Отримання або створення ключа шифрування"""
@@ -104,7 +252,7 @@ class ProfileManager:
             
     def init_database(self):
         """Ініціалізація бази даних"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self.pool.transaction() as conn:
             cursor = conn.cursor()
             
             # Таблиця профілів
@@ -112,44 +260,160 @@ class ProfileManager:
                 CREATE TABLE IF NOT EXISTS profiles (
                     id TEXT PRIMARY KEY,
                     name TEXT UNIQUE NOT NULL,
-                    data TEXT NOT NULL,
+                    data BLOB NOT NULL,
                     created_at TEXT NOT NULL,
-                    last_used TEXT NOT NULL
+                    last_used TEXT NOT NULL,
+                    version INTEGER NOT NULL DEFAULT 1,
+                    data_version INTEGER NOT NULL DEFAULT 1
                 )
             """)
             
-            # Таблиця cookies
+            # Міграція старих баз без колонок версій та відкритих колонок
+            # version - будь-яка зміна рядка, data_version - зміна зашифрованих даних
+            cursor.execute("PRAGMA table_info(profiles)")
+            columns = {row[1] for row in cursor.fetchall()}
+            for column in ('version', 'data_version'):
+                if column not in columns:
+                    cursor.execute(f"ALTER TABLE profiles ADD COLUMN {column} INTEGER NOT NULL DEFAULT 1")
+                
+            added_columns = []
+            for field_name, definition in self.PLAIN_FIELDS.items():
+                if field_name not in columns:
+                    cursor.execute(f"ALTER TABLE profiles ADD COLUMN {field_name} {definition}")
+                    added_columns.append(field_name)
+                    
+            if added_columns:
+                self.backfill_plain_columns(cursor, added_columns)
+                
+            # Покриваючі індекси для фільтрів та сортування (без читання зашифрованих рядків)
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_profiles_last_used ON profiles(last_used, id)")
             cursor.execute("""
-                CREATE TABLE IF NOT EXISTS cookies (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                CREATE INDEX IF NOT EXISTS idx_profiles_status
+                ON profiles(status, icon_type, last_used, name COLLATE NOCASE, id)
+            """)
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_profiles_country
+                ON profiles(country_code, icon_type, status, favorite, last_used, name COLLATE NOCASE, id)
+            """)
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_profiles_favorite ON profiles(favorite, last_used, id)")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_profiles_name_nocase ON profiles(name COLLATE NOCASE, id)")
+            
+            # Повнотекстовий пошук по назві, опису та тегам
+            self.fts_enabled = self.init_fts(cursor)
+            
+            # Журнал змін профілів (для оновлення UI в інших процесах)
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS profile_changes (
+                    seq INTEGER PRIMARY KEY AUTOINCREMENT,
                     profile_id TEXT NOT NULL,
-                    domain TEXT NOT NULL,
-                    name TEXT NOT NULL,
-                    value TEXT NOT NULL,
-                    path TEXT DEFAULT '/',
-                    expires INTEGER,
-                    secure BOOLEAN DEFAULT 0,
-                    http_only BOOLEAN DEFAULT 0,
-                    created_at TEXT NOT NULL,
-                    FOREIGN KEY (profile_id) REFERENCES profiles (id)
+                    kind TEXT NOT NULL,
+                    fields TEXT NOT NULL DEFAULT '',
+                    origin TEXT NOT NULL,
+                    created_at TEXT NOT NULL
                 )
             """)
+            cursor.execute("SELECT COALESCE(MAX(seq), 0) FROM profile_changes")
+            self.last_change_seq = cursor.fetchone()[0]
+            cursor.execute(
+                "DELETE FROM profile_changes WHERE seq <= ?",
+                (self.last_change_seq - self.CHANGE_LOG_SIZE,)
+            )
+            
+    def migrate_profile_state(self):
+        """Одноразове перенесення старих таблиць cookies/sessions з profiles.db у сховище стану"""
+        try:
+            counts = self.state.import_legacy(self.pool, self.cipher)
+            if any(counts.values()):
+                print(f"Стан профілів перенесено в {self.state.db_path}: {counts}")
+        except Exception as e:
+            print(f"Помилка перенесення cookies та сесій: {e}")
             
-            # Таблиця сесій
+    def init_fts(self, cursor) -> bool:
+        """Створення FTS5 індексу профілів (False якщо FTS5 недоступний)"""
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'profiles_fts'")
+        exists = cursor.fetchone() is not None
+        
+        try:
             cursor.execute("""
-                CREATE TABLE IF NOT EXISTS sessions (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    profile_id TEXT NOT NULL,
-                    tab_data TEXT NOT NULL,
-                    created_at TEXT NOT NULL,
-                    FOREIGN KEY (profile_id) REFERENCES profiles (id)
+                CREATE VIRTUAL TABLE IF NOT EXISTS profiles_fts USING fts5(
+                    name, description, tags,
+                    content='profiles', content_rowid='rowid'
                 )
             """)
+        except sqlite3.OperationalError:
+            return False
             
-            conn.commit()
+        # Тригери синхронізують індекс з таблицею profiles
+        cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS profiles_fts_insert AFTER INSERT ON profiles BEGIN
+                INSERT INTO profiles_fts(rowid, name, description, tags)
+                VALUES (new.rowid, new.name, new.description, new.tags);
+            END
+        """)
+        cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS profiles_fts_delete AFTER DELETE ON profiles BEGIN
+                INSERT INTO profiles_fts(profiles_fts, rowid, name, description, tags)
+                VALUES ('delete', old.rowid, old.name, old.description, old.tags);
+            END
+        """)
+        cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS profiles_fts_update
+            AFTER UPDATE OF name, description, tags ON profiles BEGIN
+                INSERT INTO profiles_fts(profiles_fts, rowid, name, description, tags)
+                VALUES ('delete', old.rowid, old.name, old.description, old.tags);
+                INSERT INTO profiles_fts(rowid, name, description, tags)
+                VALUES (new.rowid, new.name, new.description, new.tags);
+            END
+        """)
+        
+        if not exists:
+            cursor.execute("INSERT INTO profiles_fts(profiles_fts) VALUES ('rebuild')")
+            
+        return True
+        
+    def backfill_plain_columns(self, cursor, field_names: List[str]):
+        """Заповнення нових відкритих колонок з зашифрованих даних (одноразова міграція)"""
+        cursor.execute("SELECT id, data FROM profiles")
+        rows = cursor.fetchall()
+        
+        updates = []
+        for profile_id, encrypted_data in rows:
+            profile = self.decrypt_profile(encrypted_data)
+            updates.append(tuple(
+                self.plain_value(field_name, getattr(profile, field_name)) for field_name in field_names
+            ) + (profile_id,))
             
+        assignments = ', '.join(f"{field_name} = ?" for field_name in field_names)
+        cursor.executemany(f"UPDATE profiles SET {assignments} WHERE id = ?", updates)
+        
+    @staticmethod
+    def plain_value(field_name: str, value):
+        """Значення для відкритої колонки (None - значення за замовчуванням, bool - 0/1)"""
+        if value is None:
+            value = BrowserProfile.__dataclass_fields__[field_name].default
+        if isinstance(value, bool):
+            value = int(value)
+        return value
+        
+    def plain_values(self, profile: BrowserProfile) -> tuple:
+        """Значення відкритих колонок профілю (у порядку PLAIN_FIELDS)"""
+        return tuple(
+            self.plain_value(field_name, getattr(profile, field_name)) for field_name in self.PLAIN_FIELDS
+        )
+        
+    def apply_plain_row(self, profile: BrowserProfile, row: tuple) -> BrowserProfile:
+        """Перенесення значень відкритих колонок (PLAIN_ROW_COLUMNS) у профіль"""
+        for field_name, value in zip(self.PLAIN_COLUMNS, row):
+            setattr(profile, field_name, bool(value) if field_name == 'favorite' else value)
+        intern_fields(profile, profile.INTERNED_FIELDS)
+        return profile
+        
     def generate_random_profile_data(self) -> Dict:
         """Генерація випадкових даних для профілю"""
+        return self.generate_random_profiles_data(1)[0]
+        
+    def generate_random_profiles_data(self, count: int) -> List[Dict]:
+        """Пакетна генерація випадкових даних для кількох профілів"""
         user_agents = [
             "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/119.0.0.0 Safari/537.36",
             "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/118.0.0.0 Safari/537.36",
@@ -170,147 +434,497 @@ class ProfileManager:
             "uk-UA,uk;q=0.9,en;q=0.8", "en-US,en;q=0.9", "en-GB,en;q=0.9", "de-DE,de;q=0.9"
         ]
         
-        width, height = random.choice(screen_resolutions)
-        
-        return {
-            'user_agent': random.choice(user_agents),
-            'screen_width': width,
-            'screen_height': height,
-            'timezone': random.choice(timezones),
-            'language': random.choice(languages),
-            'canvas_fingerprint': str(uuid.uuid4()),
-            'webgl_fingerprint': str(uuid.uuid4()),
-        }
+        # Вибираємо всі значення одним викликом на поле
+        agents = random.choices(user_agents, k=count)
+        resolutions = random.choices(screen_resolutions, k=count)
+        zones = random.choices(timezones, k=count)
+        langs = random.choices(languages, k=count)
         
-    def create_profile(self, name: str, custom_data: Dict = None) -> BrowserProfile:
-        """Створення нового профілю"""
-        profile_id = str(uuid.uuid4())
-        now = datetime.now().isoformat()
+        batch = []
+        for i in range(count):
+            width, height = resolutions[i]
+            batch.append({
+                'user_agent': agents[i],
+                'screen_width': width,
+                'screen_height': height,
+                'timezone': zones[i],
+                'language': langs[i],
+                'canvas_fingerprint': str(uuid.uuid4()),
+                'webgl_fingerprint': str(uuid.uuid4()),
+            })
+            
+        return batch
         
-        # Генеруємо базові дані
-        profile_data = self.generate_random_profile_data()
+    def build_profile(self, name: str, profile_data: Dict, custom_data: Dict = None,
+                      now: str = None) -> BrowserProfile:
+        """Створення об'єкта профілю з випадкових та кастомних даних"""
+        now = now or datetime.now().isoformat()
         
         # Додаємо кастомні дані якщо є
         if custom_data:
             # Видаляємо name з custom_data щоб уникнути конфлікту
             custom_data_copy = custom_data.copy()
             custom_data_copy.pop('name', None)
+            custom_data_copy.pop('id', None)
             profile_data.update(custom_data_copy)
             
-        # Створюємо профіль
-        profile = BrowserProfile(
-            id=profile_id,
+        return BrowserProfile(
+            id=str(uuid.uuid4()),
             name=name,
             created_at=now,
             last_used=now,
             **profile_data
         )
         
+    def encrypt_profile(self, profile: BrowserProfile) -> bytes:
+        """Шифрування профілю для збереження в базі даних"""
+        return self.cipher.encrypt(json.dumps(profile.to_dict()).encode())
+        
+    def profile_row(self, profile: BrowserProfile, encrypted_data: bytes) -> tuple:
+        """Параметри для INSERT_PROFILE_SQL"""
+        return (
+            profile.id, profile.name, encrypted_data, profile.created_at, profile.last_used
+        ) + self.plain_values(profile)
+        
+    def create_profile(self, name: str, custom_data: Dict = None) -> BrowserProfile:
+        """Створення нового профілю"""
+        # Генеруємо базові дані та створюємо профіль
+        profile = self.build_profile(name, self.generate_random_profile_data(), custom_data)
+        
         # Зберігаємо в базу даних
-        encrypted_data = self.cipher.encrypt(json.dumps(profile.to_dict()).encode())
+        encrypted_data = self.encrypt_profile(profile)
         
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute(
-                "INSERT INTO profiles (id, name, data, created_at, last_used) VALUES (?, ?, ?, ?, ?)",
-                (profile_id, name, encrypted_data.decode(), now, now)
-            )
-            conn.commit()
+        changes = [ProfileChange('added', profile.id)]
+        with self.pool.transaction() as conn:
+            conn.execute(self.INSERT_PROFILE_SQL, self.profile_row(profile, encrypted_data))
+            self.log_changes(conn, changes)
+            
+        self.cache.put(profile.id, 1, profile)
+        self.emit_changes(changes)
             
         # Створюємо директорію для профілю
-        profile_dir = os.path.join(self.profiles_dir, profile_id)
+        profile_dir = os.path.join(self.profiles_dir, profile.id)
         os.makedirs(profile_dir, exist_ok=True)
         
         return profile
         
+    def create_profiles_bulk(self, count: int, template: Dict = None,
+                             name_pattern: str = "Профіль {n}",
+                             progress_callback: Callable[[int, int], None] = None,
+                             max_workers: int = None) -> List[BrowserProfile]:
+        """Масове створення профілів за шаблоном
+        
+        name_pattern форматується з n (1..count), наприклад "Farm {n:04d}".
+        Усі профілі вставляються однією транзакцією: якщо хоч одна назва
+        зайнята, не створюється жоден профіль.
+        """
+        if count <= 0:
+            return []
+            
+        if '{' not in name_pattern:
+            name_pattern += " {n}"
+            
+        now = datetime.now().isoformat()
+        names = [name_pattern.format(n=i + 1) for i in range(count)]
+        profiles = [
+            self.build_profile(name, profile_data, template, now)
+            for name, profile_data in zip(names, self.generate_random_profiles_data(count))
+        ]
+        
+        done = 0
+        chunk_size = 100
+        chunks = [profiles[i:i + chunk_size] for i in range(0, count, chunk_size)]
+        
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            # Шифруємо на пулі потоків
+            encrypted = []
+            for chunk_result in executor.map(
+                    lambda chunk: [self.encrypt_profile(profile) for profile in chunk], chunks):
+                encrypted.extend(chunk_result)
+                done += len(chunk_result)
+                if progress_callback:
+                    progress_callback(done, count)
+                    
+            # Одна транзакція на всю партію
+            changes = [ProfileChange('added', profile.id) for profile in profiles]
+            with self.pool.transaction() as conn:
+                conn.executemany(
+                    self.INSERT_PROFILE_SQL,
+                    (self.profile_row(profile, data) for profile, data in zip(profiles, encrypted))
+                )
+                self.log_changes(conn, changes)
+                
+            for profile in profiles:
+                self.cache.put(profile.id, 1, profile)
+            self.emit_changes(changes)
+                
+            # Директорії профілів створюємо паралельно
+            list(executor.map(
+                lambda profile: os.makedirs(os.path.join(self.profiles_dir, profile.id), exist_ok=True),
+                profiles
+            ))
+            
+        return profiles
+        
+    def decrypt_profile(self, encrypted_data) -> BrowserProfile:
+        """Розшифрування профілю з рядка бази даних (конверт v1 або старий Fernet)"""
+        decrypted_data = self.cipher.decrypt(encrypted_data)
+        profile_data = json.loads(decrypted_data.decode())
+        return BrowserProfile.from_dict(profile_data)
+        
     def get_profile_by_id(self, profile_id: str) -> Optional[BrowserProfile]:
         """Отримання профілю за ID"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self.pool.transaction() as conn:
             cursor = conn.cursor()
-            cursor.execute("SELECT data FROM profiles WHERE id = ?", (profile_id,))
+            cursor.execute(
+                f"SELECT data_version, {self.PLAIN_ROW_COLUMNS} FROM profiles WHERE id = ?",
+                (profile_id,)
+            )
             row = cursor.fetchone()
-            
-            if row:
-                encrypted_data = row[0].encode()
-                decrypted_data = self.cipher.decrypt(encrypted_data)
-                profile_data = json.loads(decrypted_data.decode())
-                return BrowserProfile.from_dict(profile_data)
+            if not row:
+                self.cache.invalidate(profile_id)
+                return None
                 
-        return None
+            data_version = row[0]
+            profile = self.cache.get(profile_id, data_version)
+            if profile is None:
+                cursor.execute("SELECT data FROM profiles WHERE id = ?", (profile_id,))
+                data_row = cursor.fetchone()
+                if not data_row:
+                    return None
+                profile = self.decrypt_profile(data_row[0])
+                self.cache.put(profile_id, data_version, profile)
+                
+        return self.apply_plain_row(profile, row[1:])
         
     def get_profile_by_name(self, name: str) -> Optional[BrowserProfile]:
         """Отримання профілю за ім'ям"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self.pool.transaction() as conn:
             cursor = conn.cursor()
-            cursor.execute("SELECT data FROM profiles WHERE name = ?", (name,))
+            cursor.execute("SELECT id, version FROM profiles WHERE name = ?", (name,))
             row = cursor.fetchone()
             
-            if row:
-                encrypted_data = row[0].encode()
-                decrypted_data = self.cipher.decrypt(encrypted_data)
-                profile_data = json.loads(decrypted_data.decode())
-                return BrowserProfile.from_dict(profile_data)
+        if row:
+            return self.get_profile_by_id(row[0])
                 
         return None
         
     def get_all_profiles(self) -> List[BrowserProfile]:
         """Отримання всіх профілів"""
-        profiles = []
+        cursor = self.pool.execute("SELECT id FROM profiles ORDER BY last_used DESC")
+        profile_ids = [row[0] for row in cursor.fetchall()]
+        
+        profiles = self.get_profiles_by_ids(profile_ids)
+        self.cache.retain(profile_ids)
         
-        with sqlite3.connect(self.db_path) as conn:
+        return profiles
+        
+    def get_profiles_by_ids(self, profile_ids: List[str]) -> List[BrowserProfile]:
+        """Отримання профілів за списком ID (у тому ж порядку)"""
+        found = {}
+        plain_rows = {}
+        missing = []
+        
+        with self.pool.transaction() as conn:
+            cursor = conn.cursor()
+            
+            for offset in range(0, len(profile_ids), 500):
+                chunk = profile_ids[offset:offset + 500]
+                placeholders = ','.join('?' * len(chunk))
+                cursor.execute(
+                    f"SELECT id, data_version, {self.PLAIN_ROW_COLUMNS} "
+                    f"FROM profiles WHERE id IN ({placeholders})", chunk
+                )
+                for row in cursor.fetchall():
+                    profile_id, data_version = row[0], row[1]
+                    plain_rows[profile_id] = row[2:]
+                    profile = self.cache.get(profile_id, data_version)
+                    if profile is None:
+                        missing.append((profile_id, data_version))
+                    else:
+                        found[profile_id] = profile
+                        
+            # Розшифровуємо тільки профілі, яких немає в кеші
+            versions = dict(missing)
+            missing_ids = list(versions)
+            for offset in range(0, len(missing_ids), 500):
+                chunk = missing_ids[offset:offset + 500]
+                placeholders = ','.join('?' * len(chunk))
+                cursor.execute(
+                    f"SELECT id, data FROM profiles WHERE id IN ({placeholders})", chunk
+                )
+                for profile_id, encrypted_data in cursor.fetchall():
+                    profile = self.decrypt_profile(encrypted_data)
+                    self.cache.put(profile_id, versions[profile_id], profile)
+                    found[profile_id] = profile
+                    
+        return [
+            self.apply_plain_row(found[profile_id], plain_rows[profile_id])
+            for profile_id in profile_ids if profile_id in found
+        ]
+        
+    def get_profile_summaries(self, profile_ids: List[str] = None) -> List[ProfileSummary]:
+        """Короткі записи профілів для списків (у порядку profile_ids або за last_used)"""
+        if profile_ids is None:
+            cursor = self.pool.execute(
+                f"SELECT {self.SUMMARY_COLUMNS} FROM profiles ORDER BY last_used DESC"
+            )
+            return [ProfileSummary.from_row(row) for row in cursor.fetchall()]
+            
+        found = {}
+        with self.pool.transaction() as conn:
             cursor = conn.cursor()
-            cursor.execute("SELECT data FROM profiles ORDER BY last_used DESC")
-            rows = cursor.fetchall()
-            
-            for row in rows:
-                encrypted_data = row[0].encode()
-                decrypted_data = self.cipher.decrypt(encrypted_data)
-                profile_data = json.loads(decrypted_data.decode())
-                profiles.append(BrowserProfile.from_dict(profile_data))
+            for offset in range(0, len(profile_ids), 500):
+                chunk = profile_ids[offset:offset + 500]
+                placeholders = ','.join('?' * len(chunk))
+                cursor.execute(
+                    f"SELECT {self.SUMMARY_COLUMNS} FROM profiles WHERE id IN ({placeholders})", chunk
+                )
+                for row in cursor.fetchall():
+                    found[row[0]] = ProfileSummary.from_row(row)
+                    
+        return [found[profile_id] for profile_id in profile_ids if profile_id in found]
+        
+    def build_profile_filter(self, text: str = "", statuses: List[str] = None,
+                             icon_types: List[str] = None, country_codes: List[str] = None,
+                             favorites_only: bool = False) -> tuple:
+        """Побудова SQL умови WHERE для фільтрів профілів"""
+        conditions = []
+        params = []
+        
+        tokens = re.findall(r"\w+", text or "")
+        if tokens:
+            if self.fts_enabled:
+                match = ' '.join(f'"{token}"*' for token in tokens)
+                conditions.append("rowid IN (SELECT rowid FROM profiles_fts WHERE profiles_fts MATCH ?)")
+                params.append(match)
+            else:
+                for token in tokens:
+                    conditions.append("(name LIKE ? OR description LIKE ? OR tags LIKE ?)")
+                    params.extend([f"%{token}%"] * 3)
+                    
+        for column, values in (('status', statuses), ('icon_type', icon_types),
+                               ('country_code', country_codes)):
+            if values:
+                conditions.append(f"{column} IN ({','.join('?' * len(values))})")
+                params.extend(values)
                 
-        return profiles
+        if favorites_only:
+            conditions.append("favorite = 1")
+            
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        return where, params
         
-    def update_profile(self, profile_id: str, updated_data: Dict):
-        """Оновлення профілю"""
-        profile = self.get_profile_by_id(profile_id)
-        if not profile:
-            return False
+    def search_profile_ids(self, text: str = "", statuses: List[str] = None,
+                           icon_types: List[str] = None, country_codes: List[str] = None,
+                           favorites_only: bool = False, order_by: str = 'last_used',
+                           limit: int = None, offset: int = 0) -> List[str]:
+        """Пошук ID профілів за фільтрами (без розшифрування)"""
+        where, params = self.build_profile_filter(
+            text, statuses, icon_types, country_codes, favorites_only
+        )
+        order = self.SORT_ORDERS.get(order_by, self.SORT_ORDERS['last_used'])
+        sql = f"SELECT id FROM profiles {where} ORDER BY {order}"
+        if limit is not None:
+            sql += " LIMIT ? OFFSET ?"
+            params = params + [limit, offset]
+            
+        cursor = self.pool.execute(sql, params)
+        return [row[0] for row in cursor.fetchall()]
+        
+    def count_profiles(self, text: str = "", statuses: List[str] = None,
+                       icon_types: List[str] = None, country_codes: List[str] = None,
+                       favorites_only: bool = False) -> int:
+        """Кількість профілів за фільтрами"""
+        where, params = self.build_profile_filter(
+            text, statuses, icon_types, country_codes, favorites_only
+        )
+        cursor = self.pool.execute(f"SELECT COUNT(*) FROM profiles {where}", params)
+        return cursor.fetchone()[0]
+        
+    def start_reencryption(self, batch_size: int = 200, pause: float = 0.05) -> List[EnvelopeMigrator]:
+        """Фонове перешифрування старих рядків Fernet (profiles.data)"""
+        if any(migrator.is_alive() for migrator in self.migrators):
+            return self.migrators
+            
+        self.migrators = [
+            EnvelopeMigrator(self.pool, self.cipher, table, column, batch_size, pause)
+            for table, column in (('profiles', 'data'),)
+        ]
+        for migrator in self.migrators:
+            migrator.start()
+        return self.migrators
+        
+    def stop_reencryption(self):
+        """Зупинка фонового перешифрування"""
+        for migrator in self.migrators:
+            migrator.stop()
+        for migrator in self.migrators:
+            migrator.join()
+            
+    def add_listener(self, callback: Callable[[List[ProfileChange]], None]):
+        """Підписка на події змін профілів"""
+        if callback not in self.listeners:
+            self.listeners.append(callback)
             
-        # Оновлюємо дані
-        for key, value in updated_data.items():
-            if hasattr(profile, key):
-                setattr(profile, key, value)
+    def remove_listener(self, callback: Callable[[List[ProfileChange]], None]):
+        """Відписка від подій змін профілів"""
+        if callback in self.listeners:
+            self.listeners.remove(callback)
+            
+    def log_changes(self, conn, changes: List[ProfileChange]):
+        """Запис подій у журнал змін (в межах поточної транзакції)"""
+        now = datetime.now().isoformat()
+        conn.executemany(
+            "INSERT INTO profile_changes (profile_id, kind, fields, origin, created_at) "
+            "VALUES (?, ?, ?, ?, ?)",
+            ((change.profile_id, change.kind, ','.join(change.fields), self.origin, now)
+             for change in changes)
+        )
+        
+    def emit_changes(self, changes: List[ProfileChange]):
+        """Сповіщення підписників про зміни"""
+        if not changes:
+            return
+        for callback in list(self.listeners):
+            try:
+                callback(changes)
+            except Exception as e:
+                print(f"Помилка обробника змін профілів: {e}")
                 
-        profile.last_used = datetime.now().isoformat()
+    def poll_changes(self) -> List[ProfileChange]:
+        """Отримання змін, зроблених іншими процесами (або іншими екземплярами менеджера)"""
+        cursor = self.pool.execute(
+            "SELECT seq, profile_id, kind, fields, origin FROM profile_changes "
+            "WHERE seq > ? ORDER BY seq",
+            (self.last_change_seq,)
+        )
+        changes = []
+        for seq, profile_id, kind, fields, origin in cursor.fetchall():
+            self.last_change_seq = seq
+            if origin == self.origin:
+                continue
+            if kind == 'removed':
+                self.cache.invalidate(profile_id)
+            changes.append(ProfileChange(
+                kind, profile_id, tuple(fields.split(',')) if fields else (), external=True
+            ))
+            
+        self.emit_changes(changes)
+        return changes
+        
+    def get_cache_stats(self) -> Dict[str, int]:
+        """Статистика кешу профілів (hits/misses/size)"""
+        return self.cache.stats()
+        
+    def update_profile(self, profile_id: str, updated_data: Dict):
+        """Оновлення профілю"""
+        changes = dict(updated_data)
+        changes['last_used'] = datetime.now().isoformat()
+        return self.patch_profile(profile_id, changes)
         
-        # Зберігаємо в базу
-        encrypted_data = self.cipher.encrypt(json.dumps(profile.to_dict()).encode())
+    def patch_profile(self, profile_id: str, changes: Dict) -> bool:
+        """Оновлення тільки змінених полів профілю
         
-        with sqlite3.connect(self.db_path) as conn:
+        Поля з відкритих колонок записуються напряму, без розшифрування.
+        Зашифровані дані перешифровуються лише якщо змінено секретні поля.
+        Виконується під BEGIN IMMEDIATE, тому паралельні записи не губляться.
+        """
+        changes = {
+            key: value for key, value in changes.items()
+            if key in BrowserProfile.__dataclass_fields__ and key != 'id'
+        }
+        if not changes:
+            return self.get_profile_by_id(profile_id) is not None
+            
+        secret_changes = [key for key in changes if key not in self.PLAIN_COLUMNS]
+        
+        assignments = ["version = version + 1"]
+        params = []
+        for key, value in changes.items():
+            if key in self.PLAIN_COLUMNS:
+                assignments.append(f"{key} = ?")
+                params.append(self.plain_value(key, value))
+                
+        profile = None
+        with self.pool.transaction(immediate=True) as conn:
             cursor = conn.cursor()
+            cursor.execute("SELECT data_version FROM profiles WHERE id = ?", (profile_id,))
+            row = cursor.fetchone()
+            if not row:
+                self.cache.invalidate(profile_id)
+                return False
+                
+            data_version = row[0]
+            if secret_changes:
+                profile = self.cache.get(profile_id, data_version)
+                if profile is None:
+                    cursor.execute("SELECT data FROM profiles WHERE id = ?", (profile_id,))
+                    profile = self.decrypt_profile(cursor.fetchone()[0])
+                for key, value in changes.items():
+                    setattr(profile, key, value)
+                intern_fields(profile, profile.INTERNED_FIELDS)
+                
+                data_version += 1
+                assignments.extend(["data = ?", "data_version = ?"])
+                params.extend([self.encrypt_profile(profile), data_version])
+                
             cursor.execute(
-                "UPDATE profiles SET data = ?, last_used = ? WHERE id = ?",
-                (encrypted_data.decode(), profile.last_used, profile_id)
+                f"UPDATE profiles SET {', '.join(assignments)} WHERE id = ?",
+                params + [profile_id]
             )
-            conn.commit()
+            events = [ProfileChange('updated', profile_id, tuple(changes))]
+            self.log_changes(conn, events)
+            
+        if profile is not None:
+            self.cache.put(profile_id, data_version, profile)
+        self.emit_changes(events)
             
         return True
         
+    def increment_profile_counters(self, profile_id: str, usage_count: int = 0,
+                                   total_time: int = 0, touch: bool = True) -> bool:
+        """Атомарне збільшення лічильників використання (без розшифрування)"""
+        assignments = [
+            "usage_count = usage_count + ?",
+            "total_time = total_time + ?",
+            "version = version + 1",
+        ]
+        params = [int(usage_count), int(total_time)]
+        fields = ('usage_count', 'total_time')
+        if touch:
+            assignments.append("last_used = ?")
+            params.append(datetime.now().isoformat())
+            fields += ('last_used',)
+            
+        events = [ProfileChange('updated', profile_id, fields)]
+        with self.pool.transaction(immediate=True) as conn:
+            cursor = conn.execute(
+                f"UPDATE profiles SET {', '.join(assignments)} WHERE id = ?",
+                params + [profile_id]
+            )
+            if cursor.rowcount == 0:
+                return False
+            self.log_changes(conn, events)
+            
+        self.emit_changes(events)
+        return True
+        
     def delete_profile(self, profile_id: str) -> bool:
         """Видалення профілю"""
-        with sqlite3.connect(self.db_path) as conn:
+        # Видаляємо cookies, сесії та історію
+        self.state.delete_profile_state(profile_id)
+        
+        with self.pool.transaction() as conn:
             cursor = conn.cursor()
             
-            # Видаляємо cookies
-            cursor.execute("DELETE FROM cookies WHERE profile_id = ?", (profile_id,))
-            
-            # Видаляємо сесії
-            cursor.execute("DELETE FROM sessions WHERE profile_id = ?", (profile_id,))
-            
             # Видаляємо профіль
             cursor.execute("DELETE FROM profiles WHERE id = ?", (profile_id,))
+            events = [ProfileChange('removed', profile_id)] if cursor.rowcount else []
+            self.log_changes(conn, events)
             
-            conn.commit()
+        self.cache.invalidate(profile_id)
+        self.emit_changes(events)
             
         # Видаляємо директорію профілю
         profile_dir = os.path.join(self.profiles_dir, profile_id)
@@ -320,95 +934,24 @@ class ProfileManager:
             
         return True
         
-    def save_cookies(self, profile_id: str, cookies: List[Dict]):
-        """Збереження cookies для профілю"""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            
-            # Очищаємо старі cookies
-            cursor.execute("DELETE FROM cookies WHERE profile_id = ?", (profile_id,))
-            
-            # Зберігаємо нові cookies
-            now = datetime.now().isoformat()
-            for cookie in cookies:
-                cursor.execute("""
-                    INSERT INTO cookies 
-                    (profile_id, domain, name, value, path, expires, secure, http_only, created_at)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """, (
-                    profile_id,
-                    cookie.get('domain', ''),
-                    cookie.get('name', ''),
-                    cookie.get('value', ''),
-                    cookie.get('path', '/'),
-                    cookie.get('expires', 0),
-                    cookie.get('secure', False),
-                    cookie.get('httpOnly', False),
-                    now
-                ))
+    def save_cookies(self, profile_id: str, cookies: List[Dict]) -> Dict[str, int]:
+        """Збереження cookies для профілю (тільки змінені, повертає кількість змін)"""
+        return self.state.sync_cookies(profile_id, cookies)
                 
-            conn.commit()
-            
     def load_cookies(self, profile_id: str) -> List[Dict]:
-        """Завантаження cookies для профілю"""
-        cookies = []
-        
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute("""
-                SELECT domain, name, value, path, expires, secure, http_only
-                FROM cookies WHERE profile_id = ?
-            """, (profile_id,))
-            
-            rows = cursor.fetchall()
-            for row in rows:
-                cookies.append({
-                    'domain': row[0],
-                    'name': row[1],
-                    'value': row[2],
-                    'path': row[3],
-                    'expires': row[4],
-                    'secure': bool(row[5]),
-                    'httpOnly': bool(row[6])
-                })
-                
+        """Завантаження cookies для профілю (expires - секунди Unix, 0 для сесійних)"""
+        cookies = self.state.load_cookies(profile_id)
+        for cookie in cookies:
+            cookie['expires'] = self.state.expiry_epoch(cookie['expires']) or 0
         return cookies
         
     def save_session(self, profile_id: str, tab_data: List[Dict]):
         """Збереження сесії (відкритих вкладок)"""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            
-            # Очищаємо стару сесію
-            cursor.execute("DELETE FROM sessions WHERE profile_id = ?", (profile_id,))
-            
-            # Зберігаємо нову сесію
-            now = datetime.now().isoformat()
-            encrypted_data = self.cipher.encrypt(json.dumps(tab_data).encode())
-            
-            cursor.execute(
-                "INSERT INTO sessions (profile_id, tab_data, created_at) VALUES (?, ?, ?)",
-                (profile_id, encrypted_data.decode(), now)
-            )
-            
-            conn.commit()
+        self.state.save_session(profile_id, tab_data)
             
     def load_session(self, profile_id: str) -> List[Dict]:
         """Завантаження сесії"""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute(
-                "SELECT tab_data FROM sessions WHERE profile_id = ? ORDER BY created_at DESC LIMIT 1",
-                (profile_id,)
-            )
-            
-            row = cursor.fetchone()
-            if row:
-                encrypted_data = row[0].encode()
-                decrypted_data = self.cipher.decrypt(encrypted_data)
-                return json.loads(decrypted_data.decode())
-                
-        return []
+        return self.state.load_session(profile_id) or []
         
     def get_profile_directory(self, profile_id: str) -> str:
         """Отримання директорії профілю"""
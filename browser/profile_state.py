@@ -0,0 +1,877 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Єдине сховище стану профілів для AnDetect Browser
+Cookies, знімки сесій та історія браузінгу в одній базі (sessions.db)
+для ProfileManager та SessionManager
+"""
+
+import re
+import json
+import zlib
+import time
+import atexit
+import hashlib
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+from typing import List, Dict, Optional, Tuple
+
+from .cookie_sync import ensure_cookie_key, sync_cookies, upsert_cookies, delete_cookies
+from .crypto import ProfileCipher
+from .database import ConnectionPool
+from .history_writer import HistoryWriter
+
+
+class ProfileStateStore:
+    """Сховище cookies, сесій та історії профілів (один екземпляр на базу)"""
+
+    # Колонки saved_cookies, які порівнюються при збереженні
+    COOKIE_VALUE_COLUMNS = ('value', 'expires_at', 'expires_epoch', 'is_secure', 'is_http_only', 'same_site')
+
+    # Видалення протермінованих cookies обмеженими пакетами
+    COOKIE_PURGE_BATCH = 500
+    COOKIE_PURGE_MAX_BATCHES = 20
+
+    # Зберігання знімків сесій: останні N на профіль та не старші за M днів
+    SESSION_KEEP_LAST = 20
+    SESSION_MAX_AGE_DAYS = 30
+    SESSION_COMPRESS_LEVEL = 6
+
+    # Ваги BM25 для колонок history_fts (url, title, profile_id)
+    HISTORY_RANK_WEIGHTS = (2.0, 1.0, 0.0)
+
+    # PRAGMA user_version ініціалізованої бази (збільшується з кожною новою міграцією)
+    SCHEMA_VERSION = 2
+
+    # Префікс ключів знімків HMAC (шістнадцяткові ключі SHA-256 сортуються перед ним)
+    SESSION_BLOB_KEY_PREFIX = 'h1:'
+
+    _stores = {}
+    _stores_lock = threading.Lock()
+
+    @classmethod
+    def for_database(cls, db_path: str, cipher: ProfileCipher = None) -> 'ProfileStateStore':
+        """Спільне сховище для файлу бази даних (одне на процес)"""
+        pool = ConnectionPool.for_database(db_path)
+        with cls._stores_lock:
+            store = cls._stores.get(pool.db_path)
+            if store is None or store.pool is not pool:
+                store = cls(pool, cipher)
+                cls._stores[pool.db_path] = store
+            elif cipher is not None and store.cipher is None:
+                store.cipher = cipher
+                store.ensure_session_blob_keys()
+            return store
+
+    def __init__(self, pool: ConnectionPool, cipher: ProfileCipher = None):
+        self.pool = pool
+        self.db_path = pool.db_path
+        # Знімки сесій шифруються, якщо передано шифр профілів
+        self.cipher = cipher
+        self.history_fts_enabled = False
+        self.init_database()
+
+        # Історія записується у фоновому потоці пакетами (потік стартує при першому відвідуванні)
+        self.history_writer = HistoryWriter(self.pool)
+        self._writer_lock = threading.Lock()
+        atexit.register(self.shutdown)
+
+    def init_database(self):
+        """Ініціалізація таблиць стану профілів"""
+        # Актуальна схема - без транзакції запису та перевірки міграцій (повторне відкриття шардів)
+        if self.pool.execute("PRAGMA user_version").fetchone()[0] == self.SCHEMA_VERSION:
+            self.history_fts_enabled = self.pool.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'history_fts'"
+            ).fetchone() is not None
+            self.ensure_session_blob_keys()
+            return
+
+        with self.pool.transaction(immediate=True) as conn:
+            cursor = conn.cursor()
+
+            # Таблиця сесій
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS browser_sessions (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    profile_id TEXT NOT NULL,
+                    session_name TEXT,
+                    tabs_data TEXT NOT NULL DEFAULT '',
+                    created_at TEXT NOT NULL,
+                    last_accessed TEXT NOT NULL,
+                    is_active BOOLEAN DEFAULT 0,
+                    blob_hash TEXT
+                )
+            """)
+
+            # Стиснені знімки вкладок, адресовані за вмістом (HMAC-SHA256 JSON з ключем профілів,
+            # без шифру - SHA-256)
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS session_blobs (
+                    hash TEXT PRIMARY KEY,
+                    data BLOB NOT NULL,
+                    raw_size INTEGER NOT NULL,
+                    created_at TEXT NOT NULL
+                ) WITHOUT ROWID
+            """)
+            self.migrate_session_blobs(cursor)
+            self.rekey_session_blobs(cursor)
+
+            # Таблиця історії
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS browsing_history (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    profile_id TEXT NOT NULL,
+                    url TEXT NOT NULL,
+                    title TEXT,
+                    visit_time TEXT NOT NULL,
+                    visit_count INTEGER DEFAULT 1
+                )
+            """)
+
+            # Таблиця збережених cookies
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS saved_cookies (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    profile_id TEXT NOT NULL,
+                    domain TEXT NOT NULL,
+                    name TEXT NOT NULL,
+                    value TEXT NOT NULL,
+                    path TEXT DEFAULT '/',
+                    expires_at TEXT,
+                    expires_epoch INTEGER,
+                    is_secure BOOLEAN DEFAULT 0,
+                    is_http_only BOOLEAN DEFAULT 0,
+                    same_site TEXT DEFAULT 'Lax',
+                    created_at TEXT NOT NULL,
+                    updated_at TEXT NOT NULL
+                )
+            """)
+
+            # Індекси для швидкого пошуку
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_sessions_profile ON browser_sessions(profile_id)")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_sessions_blob ON browser_sessions(blob_hash)")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_history_profile ON browsing_history(profile_id)")
+            self.ensure_history_key(cursor)
+            self.history_fts_enabled = self.init_history_fts(cursor)
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_cookies_domain ON saved_cookies(domain)")
+            ensure_cookie_key(cursor, 'saved_cookies')
+            self.migrate_cookie_expiry(cursor)
+            # Відновлення читає лише дійсні cookies профілю, очищення - лише протерміновані
+            # (idx_cookies_profile_expiry покриває і старий індекс по profile_id)
+            cursor.execute("DROP INDEX IF EXISTS idx_cookies_profile")
+            cursor.execute(
+                "CREATE INDEX IF NOT EXISTS idx_cookies_profile_expiry "
+                "ON saved_cookies(profile_id, expires_epoch)"
+            )
+            cursor.execute(
+                "CREATE INDEX IF NOT EXISTS idx_cookies_expiry ON saved_cookies(expires_epoch) "
+                "WHERE expires_epoch IS NOT NULL"
+            )
+            cursor.execute(f"PRAGMA user_version = {self.SCHEMA_VERSION}")
+
+    def migrate_cookie_expiry(self, cursor):
+        """Додавання expires_epoch та заповнення його з expires_at (одноразова міграція)"""
+        cursor.execute("PRAGMA table_info(saved_cookies)")
+        if 'expires_epoch' in {row[1] for row in cursor.fetchall()}:
+            return
+
+        cursor.execute("ALTER TABLE saved_cookies ADD COLUMN expires_epoch INTEGER")
+        cursor.execute("SELECT id, expires_at FROM saved_cookies WHERE expires_at IS NOT NULL")
+        cursor.executemany(
+            "UPDATE saved_cookies SET expires_epoch = ? WHERE id = ?",
+            [(self.expiry_epoch(expires_at), cookie_id) for cookie_id, expires_at in cursor.fetchall()]
+        )
+
+    def migrate_session_blobs(self, cursor):
+        """Перенесення tabs_data старих сесій у стиснені знімки session_blobs"""
+        cursor.execute("PRAGMA table_info(browser_sessions)")
+        if 'blob_hash' not in {row[1] for row in cursor.fetchall()}:
+            cursor.execute("ALTER TABLE browser_sessions ADD COLUMN blob_hash TEXT")
+
+        cursor.execute(
+            "SELECT id, tabs_data FROM browser_sessions WHERE blob_hash IS NULL AND tabs_data != ''"
+        )
+        rows = cursor.fetchall()
+        if not rows:
+            return
+
+        now = datetime.now().isoformat()
+        updates = []
+        for session_id, tabs_json in rows:
+            try:
+                blob_hash = self.store_session_blob(cursor, json.loads(tabs_json), now)
+            except ValueError as e:
+                print(f"Помилка міграції сесії {session_id}: {e}")
+                continue
+            updates.append((blob_hash, session_id))
+        cursor.executemany(
+            "UPDATE browser_sessions SET blob_hash = ?, tabs_data = '' WHERE id = ?", updates
+        )
+
+    def ensure_session_blob_keys(self):
+        """Перенесення зашифрованих знімків зі старими ключами, якщо шифр з'явився після міграції"""
+        if self.cipher is None:
+            return
+        # Перевірка без блокування запису: старі ключі вибираються діапазоном первинного ключа
+        if self.pool.execute(
+            "SELECT 1 FROM session_blobs WHERE hash < ? AND substr(data, 1, 1) = x'01' LIMIT 1",
+            (self.SESSION_BLOB_KEY_PREFIX,)
+        ).fetchone() is None:
+            return
+        with self.pool.transaction(immediate=True) as conn:
+            self.rekey_session_blobs(conn.cursor())
+
+    def rekey_session_blobs(self, cursor):
+        """Перенесення знімків, адресованих SHA-256 вмісту, на HMAC з ключем профілів"""
+        if self.cipher is None:
+            return
+
+        renamed = []
+        cursor.execute(
+            "SELECT hash, data FROM session_blobs WHERE hash < ?", (self.SESSION_BLOB_KEY_PREFIX,)
+        )
+        for blob_hash, data in cursor.fetchall():
+            # Незашифровані знімки (збережені без шифру) лишаються зі своїм ключем
+            if not ProfileCipher.is_current(data):
+                continue
+            try:
+                key = self.session_blob_key(zlib.decompress(self.cipher.decrypt(data)))
+            except Exception as e:
+                print(f"Помилка перенесення знімка сесії {blob_hash[:12]}: {e}")
+                continue
+            renamed.append((key, blob_hash))
+
+        # Знімок з новим ключем уже може існувати - тоді старий рядок просто видаляється
+        cursor.executemany("""
+            INSERT OR IGNORE INTO session_blobs (hash, data, raw_size, created_at)
+            SELECT ?, data, raw_size, created_at FROM session_blobs WHERE hash = ?
+        """, renamed)
+        cursor.executemany("DELETE FROM session_blobs WHERE hash = ?", [(old,) for _, old in renamed])
+        cursor.executemany("UPDATE browser_sessions SET blob_hash = ? WHERE blob_hash = ?", renamed)
+
+    def ensure_history_key(self, cursor):
+        """Унікальний індекс (profile_id, url) з об'єднанням старих дублікатів"""
+        cursor.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = 'idx_history_profile_url'"
+        )
+        if cursor.fetchone():
+            return
+
+        # Лічильники дублікатів сумуються в найновіший запис
+        cursor.execute("""
+            UPDATE browsing_history SET
+                visit_count = (
+                    SELECT SUM(visit_count) FROM browsing_history h
+                    WHERE h.profile_id = browsing_history.profile_id AND h.url = browsing_history.url
+                ),
+                visit_time = (
+                    SELECT MAX(visit_time) FROM browsing_history h
+                    WHERE h.profile_id = browsing_history.profile_id AND h.url = browsing_history.url
+                )
+            WHERE id IN (
+                SELECT MAX(id) FROM browsing_history GROUP BY profile_id, url HAVING COUNT(*) > 1
+            )
+        """)
+        cursor.execute("""
+            DELETE FROM browsing_history WHERE id NOT IN (
+                SELECT MAX(id) FROM browsing_history GROUP BY profile_id, url
+            )
+        """)
+        cursor.execute("CREATE UNIQUE INDEX idx_history_profile_url ON browsing_history(profile_id, url)")
+
+    def init_history_fts(self, cursor) -> bool:
+        """Створення FTS5 індексу історії (False якщо FTS5 недоступний)"""
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'history_fts'")
+        exists = cursor.fetchone() is not None
+
+        # profile_id індексується, щоб фільтр профілю виконувався всередині FTS
+        try:
+            cursor.execute("""
+                CREATE VIRTUAL TABLE IF NOT EXISTS history_fts USING fts5(
+                    url, title, profile_id,
+                    content='browsing_history', content_rowid='id'
+                )
+            """)
+        except sqlite3.OperationalError:
+            return False
+
+        # Тригери синхронізують індекс з browsing_history
+        cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS history_fts_insert AFTER INSERT ON browsing_history BEGIN
+                INSERT INTO history_fts(rowid, url, title, profile_id)
+                VALUES (new.id, new.url, new.title, new.profile_id);
+            END
+        """)
+        cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS history_fts_delete AFTER DELETE ON browsing_history BEGIN
+                INSERT INTO history_fts(history_fts, rowid, url, title, profile_id)
+                VALUES ('delete', old.id, old.url, old.title, old.profile_id);
+            END
+        """)
+        # Повторні відвідування змінюють лише лічильник - індекс оновлюємо тільки при зміні тексту
+        cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS history_fts_update
+            AFTER UPDATE OF url, title, profile_id ON browsing_history
+            WHEN old.url IS NOT new.url OR old.title IS NOT new.title
+                OR old.profile_id IS NOT new.profile_id
+            BEGIN
+                INSERT INTO history_fts(history_fts, rowid, url, title, profile_id)
+                VALUES ('delete', old.id, old.url, old.title, old.profile_id);
+                INSERT INTO history_fts(rowid, url, title, profile_id)
+                VALUES (new.id, new.url, new.title, new.profile_id);
+            END
+        """)
+
+        if not exists:
+            cursor.execute("INSERT INTO history_fts(history_fts) VALUES ('rebuild')")
+
+        # Ранжування за замовчуванням (ORDER BY rank) - BM25 з вагами колонок
+        weights = ', '.join(str(weight) for weight in self.HISTORY_RANK_WEIGHTS)
+        cursor.execute(
+            "INSERT INTO history_fts(history_fts, rank) VALUES ('rank', ?)", (f"bm25({weights})",)
+        )
+
+        return True
+
+    def import_legacy(self, legacy_pool: ConnectionPool, cipher: ProfileCipher = None) -> Dict[str, int]:
+        """Одноразове перенесення таблиць cookies та sessions з profiles.db (з видаленням)"""
+        cipher = cipher or self.cipher
+        cursor = legacy_pool.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table' AND name IN ('cookies', 'sessions')"
+        )
+        tables = {row[0] for row in cursor.fetchall()}
+        counts = {'cookies': 0, 'sessions': 0}
+        if not tables:
+            return counts
+
+        cookies = []
+        if 'cookies' in tables:
+            cookies = legacy_pool.execute("""
+                SELECT profile_id, domain, name, value, path, expires, secure, http_only, created_at
+                FROM cookies
+            """).fetchall()
+
+        sessions = []
+        if 'sessions' in tables:
+            for profile_id, tab_data, created_at in legacy_pool.execute(
+                "SELECT profile_id, tab_data, created_at FROM sessions ORDER BY created_at"
+            ).fetchall():
+                try:
+                    sessions.append((profile_id, json.loads(cipher.decrypt(tab_data)), created_at))
+                except Exception as e:
+                    print(f"Помилка перенесення сесії профілю {profile_id}: {e}")
+
+        with self.pool.transaction(immediate=True) as conn:
+            cursor = conn.cursor()
+
+            # Новіший запис перемагає: created_at старого рядка проти updated_at у saved_cookies
+            rows = []
+            for profile_id, domain, name, value, path, expires, secure, http_only, created_at in cookies:
+                key, values = self.cookie_row({
+                    'domain': domain, 'name': name, 'value': value, 'path': path,
+                    'expires': expires, 'secure': secure, 'httpOnly': http_only,
+                })
+                rows.append((profile_id,) + key + values + (created_at, created_at))
+            columns = ('profile_id', 'domain', 'name', 'path') + self.COOKIE_VALUE_COLUMNS
+            assignments = ', '.join(
+                f"{column} = excluded.{column}" for column in self.COOKIE_VALUE_COLUMNS + ('updated_at',)
+            )
+            cursor.executemany(
+                f"INSERT INTO saved_cookies ({', '.join(columns)}, created_at, updated_at) "
+                f"VALUES ({', '.join('?' * (len(columns) + 2))}) "
+                f"ON CONFLICT(profile_id, domain, name, path) DO UPDATE SET {assignments} "
+                f"WHERE excluded.updated_at > saved_cookies.updated_at",
+                rows
+            )
+            counts['cookies'] = len(rows)
+
+            # Сесії стають знімками; активною лише якщо профіль ще не має активної сесії
+            for profile_id, tabs_data, created_at in sessions:
+                blob_hash = self.store_session_blob(cursor, tabs_data, created_at)
+                cursor.execute("""
+                    INSERT INTO browser_sessions
+                    (profile_id, session_name, tabs_data, blob_hash, created_at, last_accessed, is_active)
+                    SELECT ?, 'Перенесена сесія', '', ?, ?, ?,
+                        NOT EXISTS (SELECT 1 FROM browser_sessions WHERE profile_id = ? AND is_active = 1)
+                    WHERE NOT EXISTS (
+                        SELECT 1 FROM browser_sessions
+                        WHERE profile_id = ? AND blob_hash = ? AND created_at = ?
+                    )
+                """, (profile_id, blob_hash, created_at, created_at,
+                      profile_id, profile_id, blob_hash, created_at))
+                counts['sessions'] += cursor.rowcount
+
+        # Старі таблиці видаляються лише після успішного запису в єдине сховище
+        with legacy_pool.transaction(immediate=True) as conn:
+            for table in tables:
+                conn.execute(f"DROP TABLE IF EXISTS {table}")
+        return counts
+
+    def shutdown(self):
+        """Запис черги історії перед завершенням роботи"""
+        self.history_writer.stop()
+
+    def close(self):
+        """Запис черги історії та закриття з'єднань (сховище більше не використовується)"""
+        self.shutdown()
+        atexit.unregister(self.shutdown)
+        with self._stores_lock:
+            if self._stores.get(self.db_path) is self:
+                del self._stores[self.db_path]
+        self.pool.close()
+
+    # ---- Cookies ----
+
+    @staticmethod
+    def expiry_epoch(expires_at: Optional[str]) -> Optional[int]:
+        """Час закінчення cookie в секундах Unix (None для сесійних)"""
+        if not expires_at:
+            return None
+        try:
+            return int(datetime.fromisoformat(expires_at).timestamp())
+        except (TypeError, ValueError, OverflowError, OSError):
+            return None
+
+    @classmethod
+    def cookie_row(cls, cookie: Dict) -> Tuple[tuple, tuple]:
+        """Ключ та значення COOKIE_VALUE_COLUMNS для словника cookie"""
+        key = (cookie.get('domain', ''), cookie.get('name', ''), cookie.get('path') or '/')
+        expires = cookie.get('expires')
+        if isinstance(expires, (int, float)):
+            # Формат ProfileManager: секунди Unix, 0 - сесійний cookie
+            try:
+                expires_epoch = int(expires) or None
+                expires = datetime.fromtimestamp(expires_epoch).isoformat() if expires_epoch else None
+            except (ValueError, OverflowError, OSError):
+                # Поза діапазоном дат (рік 10000, від'ємні значення на Windows) - сесійний cookie,
+                # а не помилка всього пакета
+                expires_epoch = expires = None
+        else:
+            expires_epoch = cls.expiry_epoch(expires)
+        return key, (
+            cookie.get('value', ''),
+            expires,
+            expires_epoch,
+            int(bool(cookie.get('secure', False))),
+            int(bool(cookie.get('httpOnly', False))),
+            cookie.get('sameSite', 'Lax'),
+        )
+
+    def sync_cookies(self, profile_id: str, cookies: List[Dict]) -> Dict[str, int]:
+        """Збереження повного набору cookies профілю (записуються тільки зміни)"""
+        rows = dict(self.cookie_row(cookie) for cookie in cookies)
+        with self.pool.transaction(immediate=True) as conn:
+            return sync_cookies(
+                conn, 'saved_cookies', profile_id, rows, self.COOKIE_VALUE_COLUMNS,
+                datetime.now().isoformat(), updated_column='updated_at'
+            )
+
+    def apply_cookie_changes(self, profile_id: str, cookies: List[Dict],
+                             removed: List[tuple]) -> Dict[str, int]:
+        """Збереження тільки змінених та видалених cookies (без читання всього набору)"""
+        rows = dict(self.cookie_row(cookie) for cookie in cookies)
+        with self.pool.transaction(immediate=True) as conn:
+            delete_cookies(conn, 'saved_cookies', profile_id, removed)
+            upsert_cookies(
+                conn, 'saved_cookies', profile_id, rows, self.COOKIE_VALUE_COLUMNS,
+                datetime.now().isoformat(), updated_column='updated_at'
+            )
+        return {'upserted': len(rows), 'removed': len(removed)}
+
+    def load_cookies(self, profile_id: str) -> List[Dict]:
+        """Дійсні cookies профілю"""
+        # Протерміновані cookies відфільтровуються в запиті: дві діапазонні вибірки
+        # по idx_cookies_profile_expiry (сесійні та ще дійсні) замість сканування профілю
+        cursor = self.pool.execute("""
+            SELECT domain, name, value, path, expires_at, is_secure, is_http_only, same_site
+            FROM saved_cookies WHERE profile_id = ? AND expires_epoch IS NULL
+            UNION ALL
+            SELECT domain, name, value, path, expires_at, is_secure, is_http_only, same_site
+            FROM saved_cookies WHERE profile_id = ? AND expires_epoch > ?
+        """, (profile_id, profile_id, int(time.time())))
+
+        return [
+            {
+                'domain': row[0],
+                'name': row[1],
+                'value': row[2],
+                'path': row[3],
+                'expires': row[4],
+                'secure': bool(row[5]),
+                'httpOnly': bool(row[6]),
+                'sameSite': row[7]
+            }
+            for row in cursor.fetchall()
+        ]
+
+    def purge_expired_cookies(self, batch_size: int = None, max_batches: int = None) -> int:
+        """Видалення протермінованих cookies пакетами (кількість видалених)"""
+        batch_size = batch_size or self.COOKIE_PURGE_BATCH
+        max_batches = max_batches or self.COOKIE_PURGE_MAX_BATCHES
+        now = int(time.time())
+        purged = 0
+
+        # Кожен пакет - окрема коротка транзакція, щоб не блокувати запис cookies
+        for _ in range(max_batches):
+            with self.pool.transaction(immediate=True) as conn:
+                cursor = conn.execute("""
+                    DELETE FROM saved_cookies WHERE id IN (
+                        SELECT id FROM saved_cookies WHERE expires_epoch <= ? LIMIT ?
+                    )
+                """, (now, batch_size))
+            purged += cursor.rowcount
+            if cursor.rowcount < batch_size:
+                break
+
+        return purged
+
+    def clear_cookies(self, profile_id: str):
+        """Видалення всіх cookies профілю"""
+        with self.pool.transaction(immediate=True) as conn:
+            conn.execute("DELETE FROM saved_cookies WHERE profile_id = ?", (profile_id,))
+
+    # ---- Сесії ----
+
+    def store_session_blob(self, cursor, tabs_data: List[Dict], now: str) -> str:
+        """Запис знімка вкладок (однаковий вміст зберігається один раз)"""
+        raw = json.dumps(tabs_data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        blob_hash = self.session_blob_key(raw)
+        data = zlib.compress(raw, self.SESSION_COMPRESS_LEVEL)
+        if self.cipher is not None:
+            data = self.cipher.encrypt(data)
+        cursor.execute(
+            "INSERT OR IGNORE INTO session_blobs (hash, data, raw_size, created_at) VALUES (?, ?, ?, ?)",
+            (blob_hash, data, len(raw), now)
+        )
+        return blob_hash
+
+    def session_blob_key(self, raw: bytes) -> str:
+        """Адреса знімка за вмістом"""
+        # З шифром адреса - HMAC: хеш відкритого JSON дозволяв би перевірити здогадку про вкладки
+        if self.cipher is not None:
+            return self.SESSION_BLOB_KEY_PREFIX + self.cipher.digest(raw)
+        return hashlib.sha256(raw).hexdigest()
+
+    def load_session_blob(self, data: bytes) -> List[Dict]:
+        """Розшифрування (для конверта v1) та розпакування знімка вкладок"""
+        if ProfileCipher.is_current(data):
+            data = self.cipher.decrypt(data)
+        return json.loads(zlib.decompress(data))
+
+    def prune_sessions(self, cursor, profile_id: str, keep_last: int = None,
+                       max_age_days: int = None) -> int:
+        """Видалення старих сесій профілю за політикою зберігання (активна лишається)"""
+        keep_last = self.SESSION_KEEP_LAST if keep_last is None else keep_last
+        max_age_days = self.SESSION_MAX_AGE_DAYS if max_age_days is None else max_age_days
+        cutoff = (datetime.now() - timedelta(days=max_age_days)).isoformat()
+
+        cursor.execute("""
+            DELETE FROM browser_sessions WHERE profile_id = ? AND is_active = 0 AND (
+                last_accessed < ? OR id NOT IN (
+                    SELECT id FROM browser_sessions WHERE profile_id = ?
+                    ORDER BY last_accessed DESC, id DESC LIMIT ?
+                )
+            )
+        """, (profile_id, cutoff, profile_id, keep_last))
+        removed = cursor.rowcount
+        if removed:
+            self.prune_session_blobs(cursor)
+        return removed
+
+    @staticmethod
+    def prune_session_blobs(cursor):
+        """Видалення знімків, на які не посилається жодна сесія"""
+        cursor.execute("""
+            DELETE FROM session_blobs WHERE NOT EXISTS (
+                SELECT 1 FROM browser_sessions WHERE blob_hash = session_blobs.hash
+            )
+        """)
+
+    def write_session(self, cursor, profile_id: str, tabs_data: List[Dict],
+                      session_name: str = None, replace: bool = False) -> int:
+        """Запис нової активної сесії в поточній транзакції (id сесії)"""
+        if not session_name:
+            session_name = f"Сесія {datetime.now().strftime('%Y-%m-%d %H:%M')}"
+        now = datetime.now().isoformat()
+
+        # Незмінена сесія додає тільки рядок-посилання на наявний знімок
+        blob_hash = self.store_session_blob(cursor, tabs_data, now)
+
+        # Знімок замінює попередні сесії профілю з тією ж назвою (автозбереження)
+        replaced = 0
+        if replace:
+            cursor.execute(
+                "DELETE FROM browser_sessions WHERE profile_id = ? AND session_name = ?",
+                (profile_id, session_name)
+            )
+            replaced = cursor.rowcount
+
+        # Деактивуємо попередні активні сесії
+        cursor.execute(
+            "UPDATE browser_sessions SET is_active = 0 WHERE profile_id = ? AND is_active = 1",
+            (profile_id,)
+        )
+
+        # Зберігаємо нову сесію
+        cursor.execute("""
+            INSERT INTO browser_sessions
+            (profile_id, session_name, tabs_data, blob_hash, created_at, last_accessed, is_active)
+            VALUES (?, ?, '', ?, ?, ?, 1)
+        """, (profile_id, session_name, blob_hash, now, now))
+        session_id = cursor.lastrowid
+
+        if not self.prune_sessions(cursor, profile_id) and replaced:
+            self.prune_session_blobs(cursor)
+        return session_id
+
+    def save_session(self, profile_id: str, tabs_data: List[Dict], session_name: str = None,
+                     replace: bool = False) -> int:
+        """Збереження сесії профілю (id сесії)"""
+        with self.pool.transaction(immediate=True) as conn:
+            return self.write_session(conn.cursor(), profile_id, tabs_data, session_name, replace)
+
+    def load_session(self, profile_id: str, session_id: int = None,
+                     touch: bool = False) -> Optional[List[Dict]]:
+        """Вкладки конкретної або останньої активної сесії (None якщо сесії немає)"""
+        with self.pool.transaction(immediate=touch) as conn:
+            cursor = conn.cursor()
+
+            if session_id:
+                cursor.execute("""
+                    SELECT s.id, s.tabs_data, b.data FROM browser_sessions s
+                    LEFT JOIN session_blobs b ON b.hash = s.blob_hash
+                    WHERE s.id = ? AND s.profile_id = ?
+                """, (session_id, profile_id))
+            else:
+                cursor.execute("""
+                    SELECT s.id, s.tabs_data, b.data FROM browser_sessions s
+                    LEFT JOIN session_blobs b ON b.hash = s.blob_hash
+                    WHERE s.profile_id = ? AND s.is_active = 1
+                    ORDER BY s.last_accessed DESC LIMIT 1
+                """, (profile_id,))
+
+            row = cursor.fetchone()
+            if not row:
+                return None
+
+            tabs_data = self.load_session_blob(row[2]) if row[2] is not None else json.loads(row[1])
+
+            # Оновлюємо час останнього доступу
+            if touch:
+                cursor.execute(
+                    "UPDATE browser_sessions SET last_accessed = ? WHERE id = ?",
+                    (datetime.now().isoformat(), row[0])
+                )
+            return tabs_data
+
+    def list_sessions(self, profile_id: str) -> List[Dict]:
+        """Список збережених сесій профілю"""
+        cursor = self.pool.execute("""
+            SELECT id, session_name, created_at, last_accessed, is_active
+            FROM browser_sessions WHERE profile_id = ?
+            ORDER BY last_accessed DESC
+        """, (profile_id,))
+
+        return [
+            {
+                'id': row[0],
+                'name': row[1],
+                'created_at': row[2],
+                'last_accessed': row[3],
+                'is_active': bool(row[4])
+            }
+            for row in cursor.fetchall()
+        ]
+
+    def delete_session(self, session_id: int, profile_id: str = None) -> bool:
+        """Видалення сесії (лише сесії вказаного профілю, якщо його передано)"""
+        with self.pool.transaction(immediate=True) as conn:
+            cursor = conn.cursor()
+            if profile_id:
+                cursor.execute(
+                    "DELETE FROM browser_sessions WHERE id = ? AND profile_id = ?", (session_id, profile_id)
+                )
+            else:
+                cursor.execute("DELETE FROM browser_sessions WHERE id = ?", (session_id,))
+            deleted = cursor.rowcount > 0
+            if deleted:
+                self.prune_session_blobs(cursor)
+        return deleted
+
+    def clear_sessions(self, profile_id: str):
+        """Видалення всіх сесій профілю"""
+        with self.pool.transaction(immediate=True) as conn:
+            cursor = conn.cursor()
+            cursor.execute("DELETE FROM browser_sessions WHERE profile_id = ?", (profile_id,))
+            self.prune_session_blobs(cursor)
+
+    # ---- Історія ----
+
+    def add_visit(self, profile_id: str, url: str, title: str = "", visits: int = 1):
+        """Додавання відвідування в чергу фонового запису"""
+        writer = self.history_writer
+        if writer.stopped or not writer.is_alive():
+            with self._writer_lock:
+                writer = self.history_writer
+                # Після shutdown() сховище лишається спільним, тож зупинений потік замінюється новим
+                if writer.stopped:
+                    writer = self.history_writer = HistoryWriter(self.pool)
+                if not writer.is_alive() and not writer.ident:
+                    writer.start()
+        writer.add_visit(profile_id, url, title, visits=visits)
+
+    def history_metrics(self) -> Dict[str, float]:
+        """Метрики фонового запису історії (глибина черги, затримки)"""
+        return self.history_writer.metrics()
+
+    def get_history(self, profile_id: str, limit: int = 100) -> List[Dict]:
+        """Останні відвідування профілю"""
+        self.history_writer.flush()
+        cursor = self.pool.execute("""
+            SELECT url, title, visit_time, visit_count
+            FROM browsing_history WHERE profile_id = ?
+            ORDER BY visit_time DESC LIMIT ?
+        """, (profile_id, limit))
+
+        return [
+            {
+                'url': row[0],
+                'title': row[1],
+                'visit_time': row[2],
+                'visit_count': row[3]
+            }
+            for row in cursor.fetchall()
+        ]
+
+    def search_history(self, query: str, profile_id: str = None,
+                       limit: int = 50, offset: int = 0) -> List[Dict]:
+        """Пошук в історії за префіксами слів URL та заголовка (за релевантністю BM25)"""
+        tokens = re.findall(r"\w+", query or "")
+        if not tokens:
+            return []
+
+        self.history_writer.flush()
+        if self.history_fts_enabled:
+            match = "{url title} : (" + ' '.join(f'"{token}"*' for token in tokens) + ")"
+            if profile_id:
+                match += ' AND profile_id : "' + profile_id.replace('"', '""') + '"'
+            # Сторінка ранжується всередині FTS, з таблицею з'єднуються лише її рядки
+            cursor = self.pool.execute("""
+                SELECT h.profile_id, h.url, h.title, h.visit_time, h.visit_count, found.rank
+                FROM (
+                    SELECT rowid, rank FROM history_fts WHERE history_fts MATCH ?
+                    ORDER BY rank LIMIT ? OFFSET ?
+                ) AS found JOIN browsing_history h ON h.id = found.rowid
+                ORDER BY found.rank
+            """, (match, limit, offset))
+        else:
+            conditions = ["(url LIKE ? OR title LIKE ?)"] * len(tokens)
+            params = [f"%{token}%" for token in tokens for _ in range(2)]
+            if profile_id:
+                conditions.append("profile_id = ?")
+                params.append(profile_id)
+            cursor = self.pool.execute(f"""
+                SELECT profile_id, url, title, visit_time, visit_count, -visit_count
+                FROM browsing_history WHERE {' AND '.join(conditions)}
+                ORDER BY visit_count DESC, visit_time DESC
+                LIMIT ? OFFSET ?
+            """, params + [limit, offset])
+
+        return [
+            {
+                'profile_id': row[0],
+                'url': row[1],
+                'title': row[2],
+                'visit_time': row[3],
+                'visit_count': row[4],
+                'rank': row[5]  # менше - релевантніше
+            }
+            for row in cursor.fetchall()
+        ]
+
+    def recent_history(self, limit: int = 100) -> List[Dict]:
+        """Останні відвідування всіх профілів"""
+        self.history_writer.flush()
+        cursor = self.pool.execute("""
+            SELECT profile_id, url, title, visit_time, visit_count
+            FROM browsing_history ORDER BY visit_time DESC LIMIT ?
+        """, (limit,))
+
+        return [
+            {
+                'profile_id': row[0],
+                'url': row[1],
+                'title': row[2],
+                'visit_time': row[3],
+                'visit_count': row[4]
+            }
+            for row in cursor.fetchall()
+        ]
+
+    def clear_history(self, profile_id: str, older_than_days: int = None):
+        """Видалення історії профілю (всієї або старшої за вказану кількість днів)"""
+        self.history_writer.flush()
+        with self.pool.transaction(immediate=True) as conn:
+            if older_than_days:
+                cutoff_date = (datetime.now() - timedelta(days=older_than_days)).isoformat()
+                conn.execute(
+                    "DELETE FROM browsing_history WHERE profile_id = ? AND visit_time < ?",
+                    (profile_id, cutoff_date)
+                )
+            else:
+                conn.execute("DELETE FROM browsing_history WHERE profile_id = ?", (profile_id,))
+
+    # ---- Стан профілю цілком ----
+
+    def save_profile_state(self, profile_id: str, cookies: List[Dict] = None,
+                           tabs_data: List[Dict] = None, session_name: str = None) -> Dict[str, int]:
+        """Збереження cookies та сесії профілю однією транзакцією"""
+        counts = {}
+        with self.pool.transaction(immediate=True) as conn:
+            if cookies is not None:
+                counts.update(sync_cookies(
+                    conn, 'saved_cookies', profile_id,
+                    dict(self.cookie_row(cookie) for cookie in cookies),
+                    self.COOKIE_VALUE_COLUMNS, datetime.now().isoformat(), updated_column='updated_at'
+                ))
+            if tabs_data is not None:
+                counts['session_id'] = self.write_session(conn.cursor(), profile_id, tabs_data, session_name)
+        return counts
+
+    def stats(self) -> Dict[str, int]:
+        """Кількість профілів, cookies, сесій, записів історії та розмір бази"""
+        self.history_writer.flush()
+        cursor = self.pool.execute("""
+            SELECT
+                (SELECT COUNT(*) FROM (
+                    SELECT profile_id FROM saved_cookies UNION
+                    SELECT profile_id FROM browser_sessions UNION
+                    SELECT profile_id FROM browsing_history
+                )),
+                (SELECT COUNT(*) FROM saved_cookies),
+                (SELECT COUNT(*) FROM browser_sessions),
+                (SELECT COUNT(*) FROM browsing_history),
+                (SELECT COALESCE(SUM(visit_count), 0) FROM browsing_history)
+        """)
+        profiles, cookies, sessions, history, visits = cursor.fetchone()
+        page_count = self.pool.execute("PRAGMA page_count").fetchone()[0]
+        page_size = self.pool.execute("PRAGMA page_size").fetchone()[0]
+        return {
+            'profiles': profiles,
+            'cookies': cookies,
+            'sessions': sessions,
+            'history': history,
+            'visits': visits,
+            'size_bytes': page_count * page_size,
+        }
+
+    def delete_profile_state(self, profile_id: str):
+        """Видалення cookies, сесій та історії профілю"""
+        self.history_writer.flush()
+        with self.pool.transaction(immediate=True) as conn:
+            cursor = conn.cursor()
+            cursor.execute("DELETE FROM saved_cookies WHERE profile_id = ?", (profile_id,))
+            cursor.execute("DELETE FROM browser_sessions WHERE profile_id = ?", (profile_id,))
+            cursor.execute("DELETE FROM browsing_history WHERE profile_id = ?", (profile_id,))
+            self.prune_session_blobs(cursor)
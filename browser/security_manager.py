@@ -1,4 +1,3 @@
-<<<<<<< HEAD
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 """
@@ -8,240 +7,590 @@
 
 import os
 import json
-import sqlite3
+import time
+import hashlib
+import threading
 import requests
+import requests.adapters
 from datetime import datetime, timedelta
-from typing import List, Dict, Set, Optional
+from typing import List, Dict, Set, Optional, Iterable, Iterator, Tuple
 from urllib.parse import urlparse
+from concurrent.futures import ThreadPoolExecutor
 from PyQt5.QtCore import QObject, pyqtSignal, QThread, QTimer
 import re
 
+from .database import ConnectionPool
+from .domain_matcher import DomainMatcher, ListSnapshot
+from .adblock_engine import NetworkFilterEngine, request_type, url_host
+
 
 class SecurityDatabase:
-    """База даних безпеки"""
+    """База даних безпеки (перевірки доменів - за знімком списків у пам'яті)"""
+    
+    # Скомпільований знімок списків поруч із security.db
+    SNAPSHOT_FILE = "security_lists.bin"
+    
+    # Таблиці списків: колонка категорії та схема (для створення і проміжної таблиці оновлення)
+    LIST_TABLES = {
+        'malware_domains': ('category', """
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    domain TEXT UNIQUE NOT NULL,
+                    category TEXT NOT NULL,
+                    added_at TEXT NOT NULL,
+                    source TEXT
+                """),
+        'ad_domains': ('category', """
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    domain TEXT UNIQUE NOT NULL,
+                    category TEXT NOT NULL,
+                    added_at TEXT NOT NULL,
+                    source TEXT
+                """),
+        'tracking_domains': ('company', """
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    domain TEXT UNIQUE NOT NULL,
+                    company TEXT,
+                    added_at TEXT NOT NULL,
+                    source TEXT
+                """),
+    }
+    
+    # Індекси таблиць списків (відновлюються після заміни таблиці)
+    LIST_INDEXES = {
+        'malware_domains': "idx_malware_domain",
+        'ad_domains': "idx_ad_domain",
+        'tracking_domains': "idx_tracking_domain",
+    }
+    
+    # Частка змін списку, вище якої замість різниці виконується повна заміна таблиці
+    DIFF_LIMIT = 0.5
     
     def __init__(self, data_dir: str):
         self.data_dir = data_dir
         self.db_path = os.path.join(data_dir, "security.db")
+        self.snapshot_path = os.path.join(data_dir, self.SNAPSHOT_FILE)
+        self.pool = ConnectionPool.for_database(self.db_path)
         self.init_database()
         
+        # SQLite - лише сховище; при старті списки відкриваються зі скомпільованого знімка,
+        # а якщо його немає або він пошкоджений - будуються зі сховища
+        self.matcher = DomainMatcher()
+        if not self.open_snapshot():
+            self.reload_lists(write_snapshot=True)
+            
+        # Рушій мережевих фільтрів ABP будується окремо (reload_filter_engine)
+        self.filter_engine: Optional[NetworkFilterEngine] = None
+            
+    def open_snapshot(self) -> bool:
+        """Перевірки за скомпільованим знімком (рядки, додані після компіляції, - з SQLite)"""
+        generation = self.list_generation()
+        snapshot = ListSnapshot.open(self.snapshot_path)
+        if snapshot is None:
+            return False
+        if snapshot.generation != generation:
+            # Таблиці замінено після компіляції знімка: його останні id не відповідають рядкам
+            print(f"Знімок списків безпеки застарів (покоління {snapshot.generation}, у сховищі {generation})")
+            snapshot.close()
+            return False
+        self.matcher.swap(self.matcher.build(self.pool, snapshot, generation))
+        return True
+        
+    def list_generation(self) -> int:
+        """Покоління таблиць списків (збільшується, коли id рядків перестають відповідати знімку)"""
+        return self.pool.execute("SELECT generation FROM list_generation WHERE id = 1").fetchone()[0]
+        
+    def reload_lists(self, write_snapshot: bool = False) -> int:
+        """Побудова нового знімка списків зі сховища та атомарна заміна (повертає версію)"""
+        lists = self.matcher.reload(self.pool, self.write_snapshot if write_snapshot else None,
+                                    self.list_generation())
+        if write_snapshot:
+            self.install_snapshot()
+        return lists.version
+        
+    def write_snapshot(self, lists):
+        """Компіляція знімка списків у файл поруч із чинним (до заміни, поки в нього не додають
+        домени інші потоки)"""
+        try:
+            ListSnapshot.write(self.snapshot_path + ".new", lists)
+        except Exception as e:
+            print(f"Помилка запису знімка списків безпеки: {e}")
+            
+    def install_snapshot(self):
+        """Заміна файлу знімка новим (після заміни списків, коли попередній знімок уже закрито)"""
+        try:
+            os.replace(self.snapshot_path + ".new", self.snapshot_path)
+        except OSError as e:
+            print(f"Помилка заміни знімка списків безпеки: {e}")
+        
+    def replace_list(self, table: str, source: str, entries: Iterable[Tuple[str, str]]) -> int:
+        """Заміна рядків списку одного джерела: (домен, категорія) пакетно в проміжну таблицю,
+        яка атомарно підміняє живу (повертає кількість доменів зі списку)
+        
+        Домени, які вже належать іншим джерелам (додані вручну, базові списки), лишаються за ними
+        """
+        category_column, schema = self.LIST_TABLES[table]
+        staging = f"{table}_staging"
+        columns = f"domain, {category_column}, added_at, source"
+        added_at = datetime.now().isoformat()
+        
+        # Відсортовані домени лягають у кінець індексу UNIQUE, а не випадковими вставками,
+        # тож запис блокує базу якомога коротше
+        rows = sorted({domain: category for domain, category in entries}.items())
+        if not rows:
+            # Порожня відповідь (збій джерела) не очищає список
+            return 0
+        with self.pool.transaction(immediate=True) as conn:
+            conn.execute(f"DROP TABLE IF EXISTS {staging}")
+            conn.execute(f"CREATE TABLE {staging} ({schema})")
+            
+            # Спершу рядки інших джерел без змін, потім домени списку, яких у них немає
+            conn.execute(f"""
+                INSERT INTO {staging} ({columns})
+                SELECT {columns} FROM {table} WHERE source IS NOT NULL AND source != ?
+            """, (source,))
+            conn.executemany(
+                f"INSERT OR IGNORE INTO {staging} ({columns}) VALUES (?, ?, ?, ?)",
+                ((domain, category, added_at, source) for domain, category in rows)
+            )
+            conn.execute(f"DROP TABLE {table}")
+            conn.execute(f"ALTER TABLE {staging} RENAME TO {table}")
+            conn.execute(f"CREATE INDEX IF NOT EXISTS {self.LIST_INDEXES[table]} ON {table}(domain)")
+            
+            # id рядків змінилися: знімок попереднього покоління відкидається при відкритті
+            conn.execute("UPDATE list_generation SET generation = generation + 1 WHERE id = 1")
+            
+        # Файл знімка видаляється лише після фіксації (збій видалення не скасовує оновлення)
+        self.discard_snapshot()
+        return len(rows)
+        
+    def discard_snapshot(self):
+        """Видалення скомпільованого знімка списків
+        
+        Якщо перевірки ще йдуть за цим знімком, вони переходять на списки зі сховища,
+        а відображення файлу закривається (інакше на Windows файл не видалити)
+        """
+        if self.matcher.lists.snapshot is not None:
+            self.matcher.swap(self.matcher.build(self.pool, generation=self.list_generation()))
+        try:
+            os.remove(self.snapshot_path)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            print(f"Помилка видалення знімка списків безпеки: {e}")
+            
+    def replace_filter_rules(self, list_name: str, rules: List[str]) -> int:
+        """Заміна всіх правил списку фільтрів однією транзакцією (повертає кількість)"""
+        with self.pool.transaction(immediate=True) as conn:
+            conn.execute("DELETE FROM filter_rules WHERE list_name = ?", (list_name,))
+            conn.executemany("INSERT INTO filter_rules (list_name, rule) VALUES (?, ?)",
+                             ((list_name, rule) for rule in rules))
+        return len(rules)
+        
+    def sync_list(self, table: str, source: str, entries: Iterable[Tuple[str, str]]) -> Tuple[int, int, int]:
+        """Оновлення рядків списку одного джерела лише доданими та видаленими доменами;
+        перше завантаження і великі зміни - заміною таблиці (повертає кількість, додано, видалено)"""
+        category_column, _ = self.LIST_TABLES[table]
+        rows = {domain: category for domain, category in entries}
+        if not rows:
+            return 0, 0, 0
+        # Усі домени таблиці з ознакою, чи рядок належить цьому джерелу: домен іншого
+        # джерела не додається, тож і не рахується доданим при кожному оновленні
+        existing = dict(self.pool.execute(f"SELECT domain, source IS ? FROM {table}", (source,)))
+        added = sorted((domain, category) for domain, category in rows.items() if domain not in existing)
+        removed = sorted(domain for domain, owned in existing.items() if owned and domain not in rows)
+        if not added and not removed:
+            return len(rows), 0, 0
+        if not any(existing.values()) or len(added) + len(removed) > len(rows) * self.DIFF_LIMIT:
+            return self.replace_list(table, source, rows.items()), len(added), len(removed)
+            
+        added_at = datetime.now().isoformat()
+        with self.pool.transaction(immediate=True) as conn:
+            # Кількості - за фактично зміненими рядками (домен міг з'явитися з іншого джерела)
+            inserted = conn.executemany(f"""
+                INSERT OR IGNORE INTO {table} (domain, {category_column}, added_at, source)
+                VALUES (?, ?, ?, ?)
+            """, ((domain, category, added_at, source) for domain, category in added)).rowcount
+            deleted = conn.executemany(f"DELETE FROM {table} WHERE domain = ? AND source = ?",
+                                       ((domain, source) for domain in removed)).rowcount
+            
+            # Нові рядки знімок підхоплює поверх себе, а видалені лишилися б у ньому
+            if deleted:
+                conn.execute("UPDATE list_generation SET generation = generation + 1 WHERE id = 1")
+        if deleted:
+            self.discard_snapshot()
+        return len(rows), inserted, deleted
+        
+    def sync_filter_rules(self, list_name: str, rules: List[str]) -> Tuple[int, int, int]:
+        """Оновлення правил списку фільтрів лише доданими та видаленими правилами
+        (повертає кількість, додано, видалено)"""
+        if not rules:
+            return 0, 0, 0
+        wanted = dict.fromkeys(rules)
+        current = {rule for (rule,) in self.pool.execute(
+            "SELECT rule FROM filter_rules WHERE list_name = ?", (list_name,))}
+        added = [rule for rule in wanted if rule not in current]
+        removed = current.difference(wanted)
+        if not current or len(added) + len(removed) > len(wanted) * self.DIFF_LIMIT:
+            return self.replace_filter_rules(list_name, list(wanted)), len(added), len(removed)
+            
+        if added or removed:
+            with self.pool.transaction(immediate=True) as conn:
+                conn.executemany("INSERT INTO filter_rules (list_name, rule) VALUES (?, ?)",
+                                 ((list_name, rule) for rule in added))
+                conn.executemany("DELETE FROM filter_rules WHERE list_name = ? AND rule = ?",
+                                 ((list_name, rule) for rule in removed))
+        return len(wanted), len(added), len(removed)
+        
+    def get_list_meta(self, name: str) -> Optional[Dict[str, any]]:
+        """Метадані останнього завантаження списку (None, якщо список ще не завантажувався)"""
+        row = self.pool.execute("""
+            SELECT url, etag, last_modified, content_hash, entry_count
+            FROM filter_lists WHERE name = ?
+        """, (name,)).fetchone()
+        if row is None:
+            return None
+        return dict(zip(('url', 'etag', 'last_modified', 'content_hash', 'entry_count'), row))
+        
+    def save_list_meta(self, name: str, url: str, etag: Optional[str], last_modified: Optional[str],
+                       content_hash: str, entry_count: int, added: int = 0, removed: int = 0):
+        """Збереження метаданих завантаженого списку (після запису його рядків)"""
+        now = datetime.now().isoformat()
+        with self.pool.transaction() as conn:
+            conn.execute("""
+                INSERT OR REPLACE INTO filter_lists
+                (name, url, etag, last_modified, content_hash, entry_count, added, removed, checked_at, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, (name, url, etag, last_modified, content_hash, entry_count, added, removed, now, now))
+            
+    def touch_list_meta(self, name: str):
+        """Позначка перевірки списку, який не змінився"""
+        with self.pool.transaction() as conn:
+            conn.execute("UPDATE filter_lists SET checked_at = ? WHERE name = ?",
+                         (datetime.now().isoformat(), name))
+            
+    def reload_filter_engine(self) -> NetworkFilterEngine:
+        """Побудова рушія мережевих фільтрів зі сховища та атомарна заміна"""
+        rows = self.pool.execute("SELECT list_name, rule FROM filter_rules ORDER BY id").fetchall()
+        self.filter_engine = NetworkFilterEngine.from_rules(rows)
+        return self.filter_engine
+        
     def init_database(self):
         """Ініціалізація бази даних безпеки"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self.pool.transaction() as conn:
             cursor = conn.cursor()
             
-            # Таблиця шкідливих доменів
+            # Таблиці шкідливих доменів, рекламних доменів і трекерів
+            for table, (_, schema) in self.LIST_TABLES.items():
+                cursor.execute(f"CREATE TABLE IF NOT EXISTS {table} ({schema})")
+                
+            # Колонка джерела в таблицях, створених до її появи (рядки без джерела - зі списків)
+            for table in self.LIST_TABLES:
+                columns = [row[1] for row in cursor.execute(f"PRAGMA table_info({table})")]
+                if 'source' not in columns:
+                    cursor.execute(f"ALTER TABLE {table} ADD COLUMN source TEXT")
+            
+            # Таблиця білого списку
             cursor.execute("""
-                CREATE TABLE IF NOT EXISTS malware_domains (
+                CREATE TABLE IF NOT EXISTS whitelist_domains (
                     id INTEGER PRIMARY KEY AUTOINCREMENT,
                     domain TEXT UNIQUE NOT NULL,
-                    category TEXT NOT NULL,
                     added_at TEXT NOT NULL,
-                    source TEXT
+                    added_by_user BOOLEAN DEFAULT 1
                 )
             """)
             
-            # Таблиця рекламних доменів
+            # Таблиця мережевих правил ABP (повні списки EasyList, EasyPrivacy)
             cursor.execute("""
-                CREATE TABLE IF NOT EXISTS ad_domains (
+                CREATE TABLE IF NOT EXISTS filter_rules (
                     id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    domain TEXT UNIQUE NOT NULL,
-                    category TEXT NOT NULL,
-                    added_at TEXT NOT NULL
+                    list_name TEXT NOT NULL,
+                    rule TEXT NOT NULL
                 )
             """)
             
-            # Таблиця трекерів
+            # Метадані завантажених списків (умовні запити та пропуск незмінених списків)
             cursor.execute("""
-                CREATE TABLE IF NOT EXISTS tracking_domains (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    domain TEXT UNIQUE NOT NULL,
-                    company TEXT,
-                    added_at TEXT NOT NULL
+                CREATE TABLE IF NOT EXISTS filter_lists (
+                    name TEXT PRIMARY KEY,
+                    url TEXT NOT NULL,
+                    etag TEXT,
+                    last_modified TEXT,
+                    content_hash TEXT,
+                    entry_count INTEGER DEFAULT 0,
+                    added INTEGER DEFAULT 0,
+                    removed INTEGER DEFAULT 0,
+                    checked_at TEXT,
+                    updated_at TEXT
                 )
             """)
             
-            # Таблиця білого списку
+            # Покоління таблиць списків (записується в заголовок скомпільованого знімка)
             cursor.execute("""
-                CREATE TABLE IF NOT EXISTS whitelist_domains (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    domain TEXT UNIQUE NOT NULL,
-                    added_at TEXT NOT NULL,
-                    added_by_user BOOLEAN DEFAULT 1
+                CREATE TABLE IF NOT EXISTS list_generation (
+                    id INTEGER PRIMARY KEY CHECK (id = 1),
+                    generation INTEGER NOT NULL
                 )
             """)
+            cursor.execute("INSERT OR IGNORE INTO list_generation (id, generation) VALUES (1, 0)")
             
-            # Індекси
-            cursor.execute("CREATE INDEX IF NOT EXISTS idx_malware_domain ON malware_domains(domain)")
-            cursor.execute("CREATE INDEX IF NOT EXISTS idx_ad_domain ON ad_domains(domain)")
-            cursor.execute("CREATE INDEX IF NOT EXISTS idx_tracking_domain ON tracking_domains(domain)")
+            # Індекси (правила - за списком і текстом правила для видалення різницею)
+            cursor.execute("DROP INDEX IF EXISTS idx_filter_rules_list")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_filter_rules_rule ON filter_rules(list_name, rule)")
+            for table, index in self.LIST_INDEXES.items():
+                cursor.execute(f"CREATE INDEX IF NOT EXISTS {index} ON {table}(domain)")
             cursor.execute("CREATE INDEX IF NOT EXISTS idx_whitelist_domain ON whitelist_domains(domain)")
             
-            conn.commit()
-            
-    def add_malware_domain(self, domain: str, category: str, source: str = "manual"):
+    def add_malware_domain(self, domain: str, category: str, source: str = "manual", live: bool = True):
         """Додавання шкідливого домену"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self.pool.transaction() as conn:
             cursor = conn.cursor()
             cursor.execute("""
                 INSERT OR IGNORE INTO malware_domains (domain, category, added_at, source)
                 VALUES (?, ?, ?, ?)
             """, (domain, category, datetime.now().isoformat(), source))
-            conn.commit()
+        if live and cursor.rowcount:
+            self.matcher.add('malware', domain, category)
             
     def is_malware_domain(self, domain: str) -> tuple[bool, str]:
         """Перевірка чи домен є шкідливим"""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute("SELECT category FROM malware_domains WHERE domain = ?", (domain,))
-            row = cursor.fetchone()
-            return (True, row[0]) if row else (False, "")
+        category = self.matcher.malware_category(domain)
+        return (True, category) if category is not None else (False, "")
             
-    def add_ad_domain(self, domain: str, category: str = "ads"):
+    def add_ad_domain(self, domain: str, category: str = "ads", source: str = "manual", live: bool = True):
         """Додавання рекламного домену"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self.pool.transaction() as conn:
             cursor = conn.cursor()
             cursor.execute("""
-                INSERT OR IGNORE INTO ad_domains (domain, category, added_at)
-                VALUES (?, ?, ?)
-            """, (domain, category, datetime.now().isoformat()))
-            conn.commit()
+                INSERT OR IGNORE INTO ad_domains (domain, category, added_at, source)
+                VALUES (?, ?, ?, ?)
+            """, (domain, category, datetime.now().isoformat(), source))
+        if live and cursor.rowcount:
+            self.matcher.add('ads', domain)
             
     def is_ad_domain(self, domain: str) -> bool:
         """Перевірка чи домен є рекламним"""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute("SELECT 1 FROM ad_domains WHERE domain = ?", (domain,))
-            return cursor.fetchone() is not None
+        return self.matcher.is_ad_domain(domain)
             
-    def add_tracking_domain(self, domain: str, company: str = ""):
+    def add_tracking_domain(self, domain: str, company: str = "", source: str = "manual", live: bool = True):
         """Додавання трекінгового домену"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self.pool.transaction() as conn:
             cursor = conn.cursor()
             cursor.execute("""
-                INSERT OR IGNORE INTO tracking_domains (domain, company, added_at)
-                VALUES (?, ?, ?)
-            """, (domain, company, datetime.now().isoformat()))
-            conn.commit()
+                INSERT OR IGNORE INTO tracking_domains (domain, company, added_at, source)
+                VALUES (?, ?, ?, ?)
+            """, (domain, company, datetime.now().isoformat(), source))
+        if live and cursor.rowcount:
+            self.matcher.add('tracking', domain)
             
     def is_tracking_domain(self, domain: str) -> bool:
         """Перевірка чи домен є трекінговим"""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute("SELECT 1 FROM tracking_domains WHERE domain = ?", (domain,))
-            return cursor.fetchone() is not None
+        return self.matcher.is_tracking_domain(domain)
             
     def add_to_whitelist(self, domain: str):
         """Додавання домену в білий список"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self.pool.transaction() as conn:
             cursor = conn.cursor()
             cursor.execute("""
                 INSERT OR IGNORE INTO whitelist_domains (domain, added_at)
                 VALUES (?, ?)
             """, (domain, datetime.now().isoformat()))
-            conn.commit()
+        if cursor.rowcount:
+            self.matcher.add('whitelist', domain)
             
     def is_whitelisted(self, domain: str) -> bool:
         """Перевірка чи домен в білому списку"""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute("SELECT 1 FROM whitelist_domains WHERE domain = ?", (domain,))
-            return cursor.fetchone() is not None
+        return self.matcher.is_whitelisted(domain)
 
 
 class SecurityListUpdater(QThread):
     """Потік для оновлення списків безпеки"""
     
-    update_completed = pyqtSignal(str, int)  # list_type, count
+    update_completed = pyqtSignal(str, int, float)  # list_type, count, записів/с
     update_failed = pyqtSignal(str, str)  # list_type, error
+    list_unchanged = pyqtSignal(str)  # list_type
+    lists_swapped = pyqtSignal(int)  # версія нового знімка списків
+    
+    MALWARE_LIST_URL = "https://malware-filter.gitlab.io/malware-filter/malware-filter-domains.txt"
+    AD_LIST_URL = "https://easylist.to/easylist/easylist.txt"
+    TRACKING_LIST_URL = "https://easylist.to/easylist/easyprivacy.txt"
+    
+    # Розмір блоку потокового читання відповіді
+    STREAM_CHUNK_SIZE = 64 * 1024
+    
+    # Списки мережевих фільтрів (після їх зміни перебудовується рушій фільтрів)
+    FILTER_LIST_TYPES = ('ads', 'tracking')
     
     def __init__(self, security_db: SecurityDatabase):
         super().__init__()
         self.security_db = security_db
         
+        # Спільний пул з'єднань для всіх списків (EasyList і EasyPrivacy - з одного хоста)
+        self.session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=3, pool_maxsize=3)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        
     def run(self):
         """Запуск оновлення"""
+        updates = {
+            'malware': self.update_malware_list,
+            'ads': self.update_ad_list,
+            'tracking': self.update_tracking_list,
+        }
         try:
-            self.update_malware_list()
-            self.update_ad_list()
-            self.update_tracking_list()
+            # Списки завантажуються паралельно; запис у сховище серіалізує SQLite
+            with ThreadPoolExecutor(max_workers=len(updates), thread_name_prefix="ListUpdate") as executor:
+                changed = dict(zip(updates, executor.map(lambda update: update(), updates.values())))
         except Exception as e:
             self.update_failed.emit("all", str(e))
+            return
+        finally:
+            self.session.close()
             
-    def update_malware_list(self):
-        """Оновлення списку шкідливих доменів"""
-        try:
-            # Malware Domain List
-            url = "https://malware-filter.gitlab.io/malware-filter/malware-filter-domains.txt"
-            response = requests.get(url, timeout=30)
+        if not any(changed.values()):
+            return
             
-            if response.status_code == 200:
-                count = 0
-                for line in response.text.split('\n'):
-                    line = line.strip()
-                    if line and not line.startswith('#') and not line.startswith('!'):
-                        domain = line.replace('0.0.0.0 ', '').replace('127.0.0.1 ', '')
-                        if domain and '.' in domain:
-                            self.security_db.add_malware_domain(domain, "malware", "malware-filter")
-                            count += 1
-                            
-                self.update_completed.emit("malware", count)
-            else:
-                self.update_failed.emit("malware", f"HTTP {response.status_code}")
-                
+        # Оновлені списки записуються лише в сховище; перевірки переходять
+        # на новий знімок однією заміною після завершення всіх списків,
+        # а скомпільований знімок пришвидшує наступний запуск
+        try:
+            if any(changed[list_type] for list_type in self.FILTER_LIST_TYPES):
+                self.security_db.reload_filter_engine()
+            self.lists_swapped.emit(self.security_db.reload_lists(write_snapshot=True))
         except Exception as e:
-            self.update_failed.emit("malware", str(e))
+            self.update_failed.emit("all", str(e))
             
-    def update_ad_list(self):
-        """Оновлення списку рекламних доменів"""
+    def stream_lines(self, response) -> Iterator[str]:
+        """Рядки тіла відповіді по мірі завантаження (без копії всього тексту в пам'яті)"""
+        response.encoding = 'utf-8'
+        return response.iter_lines(chunk_size=self.STREAM_CHUNK_SIZE, decode_unicode=True)
+        
+    @staticmethod
+    def hash_lines(lines: Iterable[str], digest) -> Iterator[str]:
+        """Рядки без змін із накопиченням хешу вмісту"""
+        for line in lines:
+            digest.update(line.encode('utf-8'))
+            digest.update(b'\n')
+            yield line
+            
+    @staticmethod
+    def parse_host_list(lines: Iterable[str]) -> Iterator[str]:
+        """Домени зі списку у форматі hosts або по домену на рядок"""
+        for line in lines:
+            line = line.strip()
+            if line and not line.startswith('#') and not line.startswith('!'):
+                domain = line.replace('0.0.0.0 ', '').replace('127.0.0.1 ', '')
+                if domain and '.' in domain:
+                    yield domain
+                    
+    @staticmethod
+    def parse_filter_list(lines: Iterable[str]) -> tuple[List[str], List[str]]:
+        """Мережеві правила списку ABP та домени з правил виду ||домен^"""
+        rules, domains = [], []
+        for line in lines:
+            line = line.strip()
+            if not line or line.startswith('[') or line.startswith('!') or '#' in line:
+                continue
+            rules.append(line)
+            # У таблиці доменів - лише безумовне блокування домену (без опцій і винятків)
+            if line.startswith('||') and line.endswith('^') and '$' not in line:
+                domain = line[2:-1]
+                if domain and '.' in domain and '*' not in domain and '/' not in domain:
+                    domains.append(domain)
+        return rules, domains
+        
+    def refresh_list(self, list_type: str, name: str, url: str, parse, apply) -> bool:
+        """Умовне завантаження списку: незмінений список (304 або той самий вміст) пропускається,
+        змінений розбирається parse і записується apply (повертає True, якщо список змінився)"""
         try:
-            # EasyList
-            url = "https://easylist.to/easylist/easylist.txt"
-            response = requests.get(url, timeout=30)
-            
-            if response.status_code == 200:
-                count = 0
-                for line in response.text.split('\n'):
-                    line = line.strip()
-                    if line and not line.startswith('[') and not line.startswith('!'):
-                        # Вилучаємо домени з AdBlock правил
-                        if '||' in line and '^' in line:
-                            domain = line.split('||')[1].split('^')[0]
-                            if domain and '.' in domain and not domain.startswith('*'):
-                                self.security_db.add_ad_domain(domain, "ads")
-                                count += 1
-                                
-                self.update_completed.emit("ads", count)
-            else:
-                self.update_failed.emit("ads", f"HTTP {response.status_code}")
+            started = time.perf_counter()
+            meta = self.security_db.get_list_meta(name)
+            if meta is not None and meta['url'] != url:
+                meta = None
+                
+            headers = {}
+            if meta is not None and meta['etag']:
+                headers['If-None-Match'] = meta['etag']
+            if meta is not None and meta['last_modified']:
+                headers['If-Modified-Since'] = meta['last_modified']
+                
+            with self.session.get(url, headers=headers, timeout=30, stream=True) as response:
+                if response.status_code == 304 and meta is not None:
+                    self.security_db.touch_list_meta(name)
+                    self.list_unchanged.emit(list_type)
+                    return False
+                if response.status_code != 200:
+                    self.update_failed.emit(list_type, f"HTTP {response.status_code}")
+                    return False
+                    
+                # Розбір під час завантаження з хешем вмісту
+                digest = hashlib.sha256()
+                parsed = parse(SecurityListUpdater.hash_lines(self.stream_lines(response), digest))
+                etag = response.headers.get('ETag')
+                last_modified = response.headers.get('Last-Modified')
+                
+            content_hash = digest.hexdigest()
+            if meta is not None and meta['content_hash'] == content_hash:
+                # Сервер без умовних запитів віддав той самий список
+                self.security_db.save_list_meta(name, url, etag, last_modified, content_hash, meta['entry_count'])
+                self.list_unchanged.emit(list_type)
+                return False
                 
+            count, added, removed = apply(parsed)
+            if not count:
+                self.update_failed.emit(list_type, "Порожній список")
+                return False
+            # Метадані - лише після запису рядків, щоб збій між ними не залишив список застарілим
+            self.security_db.save_list_meta(name, url, etag, last_modified, content_hash, count, added, removed)
+            if not added and not removed:
+                # Змінилися лише коментарі (версія, дата в заголовку списку)
+                self.list_unchanged.emit(list_type)
+                return False
+            self.report(list_type, count, started)
+            return True
+            
         except Exception as e:
-            self.update_failed.emit("ads", str(e))
+            self.update_failed.emit(list_type, str(e))
+            return False
             
-    def update_tracking_list(self):
+    def report(self, list_type: str, count: int, started: float):
+        """Сигнал про завершення оновлення списку зі швидкістю завантаження"""
+        elapsed = time.perf_counter() - started
+        self.update_completed.emit(list_type, count, count / elapsed if elapsed > 0 else 0.0)
+        
+    def update_malware_list(self) -> bool:
+        """Оновлення списку шкідливих доменів"""
+        # Malware Domain List
+        return self.refresh_list(
+            "malware", "malware-filter", self.MALWARE_LIST_URL,
+            lambda lines: list(SecurityListUpdater.parse_host_list(lines)),
+            lambda domains: self.security_db.sync_list(
+                'malware_domains', "malware-filter", ((domain, "malware") for domain in domains)
+            )
+        )
+        
+    def update_ad_list(self) -> bool:
+        """Оновлення списку рекламних доменів"""
+        # EasyList
+        return self.refresh_list(
+            "ads", "easylist", self.AD_LIST_URL, SecurityListUpdater.parse_filter_list,
+            lambda parsed: self.apply_filter_list("easylist", 'ad_domains', "ads", *parsed)
+        )
+        
+    def update_tracking_list(self) -> bool:
         """Оновлення списку трекерів"""
-        try:
-            # EasyPrivacy
-            url = "https://easylist.to/easylist/easyprivacy.txt"
-            response = requests.get(url, timeout=30)
-            
-            if response.status_code == 200:
-                count = 0
-                for line in response.text.split('\n'):
-                    line = line.strip()
-                    if line and not line.startswith('[') and not line.startswith('!'):
-                        if '||' in line and '^' in line:
-                            domain = line.split('||')[1].split('^')[0]
-                            if domain and '.' in domain and not domain.startswith('*'):
-                                self.security_db.add_tracking_domain(domain, "tracker")
-                                count += 1
-                                
-                self.update_completed.emit("tracking", count)
-            else:
-                self.update_failed.emit("tracking", f"HTTP {response.status_code}")
-                
-        except Exception as e:
-            self.update_failed.emit("tracking", str(e))
+        # EasyPrivacy
+        return self.refresh_list(
+            "tracking", "easyprivacy", self.TRACKING_LIST_URL, SecurityListUpdater.parse_filter_list,
+            lambda parsed: self.apply_filter_list("easyprivacy", 'tracking_domains', "tracker", *parsed)
+        )
+        
+    def apply_filter_list(self, name: str, table: str, category: str,
+                          rules: List[str], domains: List[str]) -> Tuple[int, int, int]:
+        """Запис правил списку фільтрів і доменів з його правил (кількість і різниця - за правилами)"""
+        result = self.security_db.sync_filter_rules(name, rules)
+        self.security_db.sync_list(table, name, ((domain, category) for domain in domains))
+        return result
 
 
 class SecurityManager(QObject):
@@ -251,6 +600,9 @@ class SecurityManager(QObject):
     request_blocked = pyqtSignal(str, str)  # url, reason
     security_status_changed = pyqtSignal(str)  # status
     
+    # Списки фільтрів, збіги з якими вважаються трекерами (решта - реклама)
+    TRACKING_FILTER_LISTS = {'easyprivacy'}
+    
     def __init__(self, data_dir: str):
         super().__init__()
         self.data_dir = data_dir
@@ -265,8 +617,11 @@ class SecurityManager(QObject):
         # Кеш для швидкого доступу
         self.domain_cache = {}
         self.cache_expiry = datetime.now() + timedelta(hours=1)
+        # Хост сторінки останнього запиту - підресурси однієї сторінки йдуть підряд
+        self._first_party = ("", "")
         
-        # Автоматичне оновлення
+        # Автоматичне оновлення (умовними запитами - незмінені списки не завантажуються)
+        self.list_updater: Optional[SecurityListUpdater] = None
         self.update_timer = QTimer()
         self.update_timer.timeout.connect(self.auto_update_lists)
         self.update_timer.start(24 * 60 * 60 * 1000)  # 24 години
@@ -274,6 +629,16 @@ class SecurityManager(QObject):
         # Завантажуємо базові списки
         self.load_default_lists()
         
+        # Повні списки фільтрів розбираються у фоні; до готовності рушія діють списки доменів
+        threading.Thread(target=self.load_filter_engine, name="FilterEngine", daemon=True).start()
+        
+    def load_filter_engine(self):
+        """Побудова рушія мережевих фільтрів зі збережених правил"""
+        try:
+            self.security_db.reload_filter_engine()
+        except Exception as e:
+            print(f"Помилка побудови рушія фільтрів: {e}")
+        
     def load_default_lists(self):
         """Завантаження базових списків безпеки"""
         # Основні рекламні домени
@@ -284,7 +649,7 @@ class SecurityManager(QObject):
         ]
         
         for domain in ad_domains:
-            self.security_db.add_ad_domain(domain, "ads")
+            self.security_db.add_ad_domain(domain, "ads", "default")
             
         # Основні трекери
         tracking_domains = [
@@ -294,7 +659,7 @@ class SecurityManager(QObject):
         ]
         
         for domain in tracking_domains:
-            self.security_db.add_tracking_domain(domain, "analytics")
+            self.security_db.add_tracking_domain(domain, "analytics", "default")
             
     def check_url_security(self, url: str) -> Dict[str, any]:
         """Комплексна перевірка безпеки URL"""
@@ -302,44 +667,47 @@ class SecurityManager(QObject):
             'safe': True,
             'blocked': False,
             'threats': [],
-            'blocked_reason': ''
+            'blocked_reason': '',
+            'whitelisted': False
         }
         
         try:
-            parsed_url = urlparse(url)
-            domain = parsed_url.netloc.lower()
+            # Хост тим самим регулярним виразом, що й у рушії фільтрів (about:, data: - без хоста)
+            domain = url_host(url) if '://' in url else ''
             
             # Видаляємо www.
             if domain.startswith('www.'):
                 domain = domain[4:]
                 
+            # Усі перевірки списків (домен і батьківські домени) - за одним знімком у пам'яті
+            whitelisted, malware_category, is_ad, is_tracking = self.security_db.matcher.classify(domain)
+                
             # Перевірка білого списку
-            if self.security_db.is_whitelisted(domain):
+            if whitelisted:
+                result['whitelisted'] = True
                 return result
                 
-            # Перевірка кешу
+            # Перевірка кешу (і для дозволених доменів - інакше фішинг перевіряється на кожен запит)
             if domain in self.domain_cache and datetime.now() < self.cache_expiry:
-                cached_result = self.domain_cache[domain]
-                if cached_result['blocked']:
-                    result.update(cached_result)
-                    return result
+                result.update(self.domain_cache[domain])
+                result['threats'] = list(result['threats'])
+                return result
                     
             # Перевірка шкідливих доменів
             if self.malware_protection_enabled:
-                is_malware, category = self.security_db.is_malware_domain(domain)
-                if is_malware:
+                if malware_category is not None:
                     result['safe'] = False
                     result['blocked'] = True
-                    result['threats'].append(f'Шкідливий сайт ({category})')
+                    result['threats'].append(f'Шкідливий сайт ({malware_category})')
                     result['blocked_reason'] = 'malware'
                     
             # Перевірка реклами
-            if self.ad_blocking_enabled and self.security_db.is_ad_domain(domain):
+            if self.ad_blocking_enabled and is_ad:
                 result['blocked'] = True
                 result['blocked_reason'] = 'ads'
                 
             # Перевірка трекерів
-            if self.tracking_protection_enabled and self.security_db.is_tracking_domain(domain):
+            if self.tracking_protection_enabled and is_tracking:
                 result['blocked'] = True
                 result['blocked_reason'] = 'tracking'
                 
@@ -411,12 +779,36 @@ class SecurityManager(QObject):
                 
             return previous_row[-1]
             
-        distance = levenshtein_distance(domain, legitimate)
         threshold = min(len(legitimate) * 0.3, 3)  # 30% від довжини або максимум 3 символи
+        # Відстань не менша за різницю довжин - для більшості доменів рахувати її не потрібно
+        if abs(len(domain) - len(legitimate)) > threshold:
+            return False
+        distance = levenshtein_distance(domain, legitimate)
         
         return distance <= threshold and domain != legitimate
         
-    def should_block_request(self, url: str) -> tuple[bool, str]:
+    def check_filters(self, url: str, first_party_url: str = "", resource_type: str = "other") -> str:
+        """Перевірка запиту мережевими фільтрами ABP (причина блокування або '')"""
+        engine = self.security_db.filter_engine
+        if engine is None or not (self.ad_blocking_enabled or self.tracking_protection_enabled):
+            return ''
+            
+        # Сайт у білому списку - фільтри не діють ні на нього, ні на його підресурси
+        if first_party_url:
+            if self._first_party[0] != first_party_url:
+                self._first_party = (first_party_url, urlparse(first_party_url).hostname or '')
+            if self.security_db.matcher.is_whitelisted(self._first_party[1]):
+                return ''
+            
+        network_filter = engine.match(url, first_party_url, resource_type)
+        if network_filter is None:
+            return ''
+        if network_filter.list_name in self.TRACKING_FILTER_LISTS:
+            return 'tracking' if self.tracking_protection_enabled else ''
+        return 'ads' if self.ad_blocking_enabled else ''
+        
+    def should_block_request(self, url: str, first_party_url: str = "",
+                             resource_type: str = "other") -> tuple[bool, str]:
         """Перевірка чи потрібно блокувати запит"""
         result = self.check_url_security(url)
         
@@ -430,8 +822,20 @@ class SecurityManager(QObject):
             self.threat_detected.emit(url, 'security', threat_desc)
             return True, 'security_threat'
             
+        # Правила шляхів, опції та винятки - з урахуванням типу запиту і сторінки
+        if not result['whitelisted']:
+            reason = self.check_filters(url, first_party_url, resource_type)
+            if reason:
+                self.request_blocked.emit(url, reason)
+                return True, reason
+                
         return False, ''
         
+    def should_block_request_info(self, info) -> tuple[bool, str]:
+        """Перевірка запиту з QWebEngineUrlRequestInterceptor.interceptRequest"""
+        return self.should_block_request(info.requestUrl().toString(), info.firstPartyUrl().toString(),
+                                         request_type(info))
+        
     def add_to_whitelist(self, domain: str):
         """Додавання домену в білий список"""
         parsed_domain = urlparse(f"http://{domain}").netloc.lower()
@@ -440,9 +844,8 @@ class SecurityManager(QObject):
             
         self.security_db.add_to_whitelist(parsed_domain)
         
-        # Очищаємо кеш для цього домену
-        if parsed_domain in self.domain_cache:
-            del self.domain_cache[parsed_domain]
+        # Білий список діє і на піддомени, тому очищаємо весь кеш
+        self.domain_cache.clear()
             
     def remove_from_whitelist(self, domain: str):
         """Видалення домену з білого списку"""
@@ -451,17 +854,29 @@ class SecurityManager(QObject):
         
     def update_security_lists(self):
         """Оновлення списків безпеки"""
+        # Посилання на потік тримається до його завершення; друге оновлення поверх першого не запускається
+        if self.list_updater is not None and self.list_updater.isRunning():
+            return
         updater = SecurityListUpdater(self.security_db)
         updater.update_completed.connect(self.on_lists_updated)
         updater.update_failed.connect(self.on_update_failed)
+        updater.list_unchanged.connect(self.on_list_unchanged)
+        updater.lists_swapped.connect(self.on_lists_swapped)
+        self.list_updater = updater
         updater.start()
         
         self.security_status_changed.emit("Оновлення списків безпеки...")
         
-    def on_lists_updated(self, list_type: str, count: int):
+    def on_lists_updated(self, list_type: str, count: int, rate: float):
         """Обробка успішного оновлення списків"""
-        self.security_status_changed.emit(f"Оновлено {list_type}: {count} записів")
+        self.security_status_changed.emit(f"Оновлено {list_type}: {count} записів ({rate:,.0f} записів/с)")
+        
+    def on_list_unchanged(self, list_type: str):
+        """Список не змінився з останнього завантаження"""
+        self.security_status_changed.emit(f"Список {list_type} без змін")
         
+    def on_lists_swapped(self, version: int):
+        """Перехід перевірок на новий знімок списків"""
         # Очищаємо кеш після оновлення
         self.domain_cache.clear()
         self.cache_expiry = datetime.now() + timedelta(hours=1)
@@ -476,7 +891,7 @@ class SecurityManager(QObject):
         
     def get_security_stats(self) -> Dict[str, int]:
         """Отримання статистики безпеки"""
-        with sqlite3.connect(self.security_db.db_path) as conn:
+        with self.security_db.pool.transaction() as conn:
             cursor = conn.cursor()
             
             cursor.execute("SELECT COUNT(*) FROM malware_domains")
@@ -517,523 +932,3 @@ class SecurityManager(QObject):
         """Увімкнення/вимкнення захисту від фішингу"""
         self.phishing_protection_enabled = enabled
         self.domain_cache.clear()
-=======
-#!/usr/bin/env python3
-# -*- coding: utf-8 -*-
-"""
-Менеджер безпеки для AnDetect Browser
-Включає антифішинг, блокування реклами та шкідливих сайтів
-"""
-
-import os
-import json
-import sqlite3
-import requests
-from datetime import datetime, timedelta
-from typing import List, Dict, Set, Optional
-from urllib.parse import urlparse
-from PyQt5.QtCore import QObject, pyqtSignal, QThread, QTimer
-import re
-
-
-class SecurityDatabase:
-    """База даних безпеки"""
-    
-    def __init__(self, data_dir: str):
-        self.data_dir = data_dir
-        self.db_path = os.path.join(data_dir, "security.db")
-        self.init_database()
-        
-    def init_database(self):
-        """Ініціалізація бази даних безпеки"""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            
-            # Таблиця шкідливих доменів
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS malware_domains (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    domain TEXT UNIQUE NOT NULL,
-                    category TEXT NOT NULL,
-                    added_at TEXT NOT NULL,
-                    source TEXT
-                )
-            """)
-            
-            # Таблиця рекламних доменів
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS ad_domains (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    domain TEXT UNIQUE NOT NULL,
-                    category TEXT NOT NULL,
-                    added_at TEXT NOT NULL
-                )
-            """)
-            
-            # Таблиця трекерів
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS tracking_domains (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    domain TEXT UNIQUE NOT NULL,
-                    company TEXT,
-                    added_at TEXT NOT NULL
-                )
-            """)
-            
-            # Таблиця білого списку
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS whitelist_domains (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    domain TEXT UNIQUE NOT NULL,
-                    added_at TEXT NOT NULL,
-                    added_by_user BOOLEAN DEFAULT 1
-                )
-            """)
-            
-            # Індекси
-            cursor.execute("CREATE INDEX IF NOT EXISTS idx_malware_domain ON malware_domains(domain)")
-            cursor.execute("CREATE INDEX IF NOT EXISTS idx_ad_domain ON ad_domains(domain)")
-            cursor.execute("CREATE INDEX IF NOT EXISTS idx_tracking_domain ON tracking_domains(domain)")
-            cursor.execute("CREATE INDEX IF NOT EXISTS idx_whitelist_domain ON whitelist_domains(domain)")
-            
-            conn.commit()
-            
-    def add_malware_domain(self, domain: str, category: str, source: str = "manual"):
-        """Додавання шкідливого домену"""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute("""
-                INSERT OR IGNORE INTO malware_domains (domain, category, added_at, source)
-                VALUES (?, ?, ?, ?)
-            """, (domain, category, datetime.now().isoformat(), source))
-            conn.commit()
-            
-    def is_malware_domain(self, domain: str) -> tuple[bool, str]:
-        """Перевірка чи домен є шкідливим"""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute("SELECT category FROM malware_domains WHERE domain = ?", (domain,))
-            row = cursor.fetchone()
-            return (True, row[0]) if row else (False, "")
-            
-    def add_ad_domain(self, domain: str, category: str = "ads"):
-        """Додавання рекламного домену"""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute("""
-                INSERT OR IGNORE INTO ad_domains (domain, category, added_at)
-                VALUES (?, ?, ?)
-            """, (domain, category, datetime.now().isoformat()))
-            conn.commit()
-            
-    def is_ad_domain(self, domain: str) -> bool:
-        """Перевірка чи домен є рекламним"""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute("SELECT 1 FROM ad_domains WHERE domain = ?", (domain,))
-            return cursor.fetchone() is not None
-            
-    def add_tracking_domain(self, domain: str, company: str = ""):
-        """Додавання трекінгового домену"""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute("""
-                INSERT OR IGNORE INTO tracking_domains (domain, company, added_at)
-                VALUES (?, ?, ?)
-            """, (domain, company, datetime.now().isoformat()))
-            conn.commit()
-            
-    def is_tracking_domain(self, domain: str) -> bool:
-        """Перевірка чи домен є трекінговим"""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute("SELECT 1 FROM tracking_domains WHERE domain = ?", (domain,))
-            return cursor.fetchone() is not None
-            
-    def add_to_whitelist(self, domain: str):
-        """Додавання домену в білий список"""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute("""
-                INSERT OR IGNORE INTO whitelist_domains (domain, added_at)
-                VALUES (?, ?)
-            """, (domain, datetime.now().isoformat()))
-            conn.commit()
-            
-    def is_whitelisted(self, domain: str) -> bool:
-        """Перевірка чи домен в білому списку"""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute("SELECT 1 FROM whitelist_domains WHERE domain = ?", (domain,))
-            return cursor.fetchone() is not None
-
-
-class SecurityListUpdater(QThread):
-    """Потік для оновлення списків безпеки"""
-    
-    update_completed = pyqtSignal(str, int)  # list_type, count
-    update_failed = pyqtSignal(str, str)  # list_type, error
-    
-    def __init__(self, security_db: SecurityDatabase):
-        super().__init__()
-        self.security_db = security_db
-        
-    def run(self):
-        """Запуск оновлення"""
-        try:
-            self.update_malware_list()
-            self.update_ad_list()
-            self.update_tracking_list()
-        except Exception as e:
-            self.update_failed.emit("all", str(e))
-            
-    def update_malware_list(self):
-        """Оновлення списку шкідливих доменів"""
-        try:
-            # Malware Domain List
-            url = "https://malware-filter.gitlab.io/malware-filter/malware-filter-domains.txt"
-            response = requests.get(url, timeout=30)
-            
-            if response.status_code == 200:
-                count = 0
-                for line in response.text.split('\n'):
-                    line = line.strip()
-                    if line and not line.startswith('#') and not line.startswith('!'):
-                        domain = line.replace('0.0.0.0 ', '').replace('127.0.0.1 ', '')
-                        if domain and '.' in domain:
-                            self.security_db.add_malware_domain(domain, "malware", "malware-filter")
-                            count += 1
-                            
-                self.update_completed.emit("malware", count)
-            else:
-                self.update_failed.emit("malware", f"HTTP {response.status_code}")
-                
-        except Exception as e:
-            self.update_failed.emit("malware", str(e))
-            
-    def update_ad_list(self):
-        """Оновлення списку рекламних доменів"""
-        try:
-            # EasyList
-            url = "https://easylist.to/easylist/easylist.txt"
-            response = requests.get(url, timeout=30)
-            
-            if response.status_code == 200:
-                count = 0
-                for line in response.text.split('\n'):
-                    line = line.strip()
-                    if line and not line.startswith('[') and not line.startswith('!'):
-                        # Вилучаємо домени з AdBlock правил
-                        if '||' in line and '^' in line:
-                            domain = line.split('||')[1].split('^')[0]
-                            if domain and '.' in domain and not domain.startswith('*'):
-                                self.security_db.add_ad_domain(domain, "ads")
-                                count += 1
-                                
-                self.update_completed.emit("ads", count)
-            else:
-                self.update_failed.emit("ads", f"HTTP {response.status_code}")
-                
-        except Exception as e:
-            self.update_failed.emit("ads", str(e))
-            
-    def update_tracking_list(self):
-        """Оновлення списку трекерів"""
-        try:
-            # EasyPrivacy
-            url = "https://easylist.to/easylist/easyprivacy.txt"
-            response = requests.get(url, timeout=30)
-            
-            if response.status_code == 200:
-                count = 0
-                for line in response.text.split('\n'):
-                    line = line.strip()
-                    if line and not line.startswith('[') and not line.startswith('!'):
-                        if '||' in line and '^' in line:
-                            domain = line.split('||')[1].split('^')[0]
-                            if domain and '.' in domain and not domain.startswith('*'):
-                                self.security_db.add_tracking_domain(domain, "tracker")
-                                count += 1
-                                
-                self.update_completed.emit("tracking", count)
-            else:
-                self.update_failed.emit("tracking", f"HTTP {response.status_code}")
-                
-        except Exception as e:
-            self.update_failed.emit("tracking", str(e))
-
-
-class SecurityManager(QObject):
-    """Менеджер безпеки браузера"""
-    
-    threat_detected = pyqtSignal(str, str, str)  # url, threat_type, description
-    request_blocked = pyqtSignal(str, str)  # url, reason
-    security_status_changed = pyqtSignal(str)  # status
-    
-    def __init__(self, data_dir: str):
-        super().__init__()
-        self.data_dir = data_dir
-        self.security_db = SecurityDatabase(data_dir)
-        
-        # Налаштування
-        self.ad_blocking_enabled = True
-        self.malware_protection_enabled = True
-        self.tracking_protection_enabled = True
-        self.phishing_protection_enabled = True
-        
-        # Кеш для швидкого доступу
-        self.domain_cache = {}
-        self.cache_expiry = datetime.now() + timedelta(hours=1)
-        
-        # Автоматичне оновлення
-        self.update_timer = QTimer()
-        self.update_timer.timeout.connect(self.auto_update_lists)
-        self.update_timer.start(24 * 60 * 60 * 1000)  # 24 години
-        
-        # Завантажуємо базові списки
-        self.load_default_lists()
-        
-    def load_default_lists(self):
-        """Завантаження базових списків безпеки"""
-        # Основні рекламні домени
-        ad_domains = [
-            'googlesyndication.com', 'doubleclick.net', 'googleadservices.com',
-            'amazon-adsystem.com', 'facebook.com/tr', 'outbrain.com',
-            'taboola.com', 'adsystem.amazon.com', 'ads.twitter.com'
-        ]
-        
-        for domain in ad_domains:
-            self.security_db.add_ad_domain(domain, "ads")
-            
-        # Основні трекери
-        tracking_domains = [
-            'google-analytics.com', 'googletagmanager.com', 'hotjar.com',
-            'mixpanel.com', 'segment.com', 'fullstory.com', 'mouseflow.com',
-            'crazyegg.com', 'quantserve.com'
-        ]
-        
-        for domain in tracking_domains:
-            self.security_db.add_tracking_domain(domain, "analytics")
-            
-    def check_url_security(self, url: str) -> Dict[str, any]:
-        """Комплексна перевірка безпеки URL"""
-        result = {
-            'safe': True,
-            'blocked': False,
-            'threats': [],
-            'blocked_reason': ''
-        }
-        
-        try:
-            parsed_url = urlparse(url)
-            domain = parsed_url.netloc.lower()
-            
-            # Видаляємо www.
-            if domain.startswith('www.'):
-                domain = domain[4:]
-                
-            # Перевірка білого списку
-            if self.security_db.is_whitelisted(domain):
-                return result
-                
-            # Перевірка кешу
-            if domain in self.domain_cache and datetime.now() < self.cache_expiry:
-                cached_result = self.domain_cache[domain]
-                if cached_result['blocked']:
-                    result.update(cached_result)
-                    return result
-                    
-            # Перевірка шкідливих доменів
-            if self.malware_protection_enabled:
-                is_malware, category = self.security_db.is_malware_domain(domain)
-                if is_malware:
-                    result['safe'] = False
-                    result['blocked'] = True
-                    result['threats'].append(f'Шкідливий сайт ({category})')
-                    result['blocked_reason'] = 'malware'
-                    
-            # Перевірка реклами
-            if self.ad_blocking_enabled and self.security_db.is_ad_domain(domain):
-                result['blocked'] = True
-                result['blocked_reason'] = 'ads'
-                
-            # Перевірка трекерів
-            if self.tracking_protection_enabled and self.security_db.is_tracking_domain(domain):
-                result['blocked'] = True
-                result['blocked_reason'] = 'tracking'
-                
-            # Перевірка фішингу
-            if self.phishing_protection_enabled:
-                if self.is_potential_phishing(url, domain):
-                    result['safe'] = False
-                    result['blocked'] = True
-                    result['threats'].append('Підозра на фішинг')
-                    result['blocked_reason'] = 'phishing'
-                    
-            # Зберігаємо в кеш
-            self.domain_cache[domain] = result.copy()
-            
-        except Exception as e:
-            print(f"Помилка перевірки безпеки URL {url}: {e}")
-            
-        return result
-        
-    def is_potential_phishing(self, url: str, domain: str) -> bool:
-        """Перевірка на потенційний фішинг"""
-        # Список популярних сайтів для перевірки на фішинг
-        legitimate_domains = {
-            'google.com', 'facebook.com', 'amazon.com', 'microsoft.com',
-            'apple.com', 'paypal.com', 'ebay.com', 'instagram.com',
-            'twitter.com', 'linkedin.com', 'github.com', 'stackoverflow.com'
-        }
-        
-        # Перевірка на схожість з популярними доменами
-        for legit_domain in legitimate_domains:
-            if self.is_domain_suspicious(domain, legit_domain):
-                return True
-                
-        # Перевірка на підозрілі символи
-        suspicious_chars = ['0', '1', 'l', 'i', 'o']
-        for char in suspicious_chars:
-            if char in domain and any(legit in domain for legit in legitimate_domains):
-                return True
-                
-        # Перевірка на довгі домени з багатьма субдоменами
-        if domain.count('.') > 3:
-            return True
-            
-        # Перевірка на IP-адреси замість доменів
-        if re.match(r'^\d+\.\d+\.\d+\.\d+', domain):
-            return True
-            
-        return False
-        
-    def is_domain_suspicious(self, domain: str, legitimate: str) -> bool:
-        """Перевірка схожості доменів"""
-        # Левенштейнова відстань
-        def levenshtein_distance(s1, s2):
-            if len(s1) < len(s2):
-                return levenshtein_distance(s2, s1)
-                
-            if len(s2) == 0:
-                return len(s1)
-                
-            previous_row = range(len(s2) + 1)
-            for i, c1 in enumerate(s1):
-                current_row = [i + 1]
-                for j, c2 in enumerate(s2):
-                    insertions = previous_row[j + 1] + 1
-                    deletions = current_row[j] + 1
-                    substitutions = previous_row[j] + (c1 != c2)
-                    current_row.append(min(insertions, deletions, substitutions))
-                previous_row = current_row
-                
-            return previous_row[-1]
-            
-        distance = levenshtein_distance(domain, legitimate)
-        threshold = min(len(legitimate) * 0.3, 3)  # 30% від довжини або максимум 3 символи
-        
-        return distance <= threshold and domain != legitimate
-        
-    def should_block_request(self, url: str) -> tuple[bool, str]:
-        """Перевірка чи потрібно блокувати запит"""
-        result = self.check_url_security(url)
-        
-        if result['blocked']:
-            reason = result['blocked_reason']
-            self.request_blocked.emit(url, reason)
-            return True, reason
-            
-        if not result['safe']:
-            threat_desc = ', '.join(result['threats'])
-            self.threat_detected.emit(url, 'security', threat_desc)
-            return True, 'security_threat'
-            
-        return False, ''
-        
-    def add_to_whitelist(self, domain: str):
-        """Додавання домену в білий список"""
-        parsed_domain = urlparse(f"http://{domain}").netloc.lower()
-        if parsed_domain.startswith('www.'):
-            parsed_domain = parsed_domain[4:]
-            
-        self.security_db.add_to_whitelist(parsed_domain)
-        
-        # Очищаємо кеш для цього домену
-        if parsed_domain in self.domain_cache:
-            del self.domain_cache[parsed_domain]
-            
-    def remove_from_whitelist(self, domain: str):
-        """Видалення домену з білого списку"""
-        # TODO: Додати метод видалення з білого списку в SecurityDatabase
-        pass
-        
-    def update_security_lists(self):
-        """Оновлення списків безпеки"""
-        updater = SecurityListUpdater(self.security_db)
-        updater.update_completed.connect(self.on_lists_updated)
-        updater.update_failed.connect(self.on_update_failed)
-        updater.start()
-        
-        self.security_status_changed.emit("Оновлення списків безпеки...")
-        
-    def on_lists_updated(self, list_type: str, count: int):
-        """Обробка успішного оновлення списків"""
-        self.security_status_changed.emit(f"Оновлено {list_type}: {count} записів")
-        
-        # Очищаємо кеш після оновлення
-        self.domain_cache.clear()
-        self.cache_expiry = datetime.now() + timedelta(hours=1)
-        
-    def on_update_failed(self, list_type: str, error: str):
-        """Обробка помилки оновлення"""
-        self.security_status_changed.emit(f"Помилка оновлення {list_type}: {error}")
-        
-    def auto_update_lists(self):
-        """Автоматичне оновлення списків"""
-        self.update_security_lists()
-        
-    def get_security_stats(self) -> Dict[str, int]:
-        """Отримання статистики безпеки"""
-        with sqlite3.connect(self.security_db.db_path) as conn:
-            cursor = conn.cursor()
-            
-            cursor.execute("SELECT COUNT(*) FROM malware_domains")
-            malware_count = cursor.fetchone()[0]
-            
-            cursor.execute("SELECT COUNT(*) FROM ad_domains")
-            ad_count = cursor.fetchone()[0]
-            
-            cursor.execute("SELECT COUNT(*) FROM tracking_domains")
-            tracking_count = cursor.fetchone()[0]
-            
-            cursor.execute("SELECT COUNT(*) FROM whitelist_domains")
-            whitelist_count = cursor.fetchone()[0]
-            
-        return {
-            'malware_domains': malware_count,
-            'ad_domains': ad_count,
-            'tracking_domains': tracking_count,
-            'whitelisted_domains': whitelist_count
-        }
-        
-    def enable_ad_blocking(self, enabled: bool):
-        """Увімкнення/вимкнення блокування реклами"""
-        self.ad_blocking_enabled = enabled
-        self.domain_cache.clear()
-        
-    def enable_malware_protection(self, enabled: bool):
-        """Увімкнення/вимкнення захисту від шкідливих сайтів"""
-        self.malware_protection_enabled = enabled
-        self.domain_cache.clear()
-        
-    def enable_tracking_protection(self, enabled: bool):
-        """Увімкнення/вимкнення захисту від трекінгу"""
-        self.tracking_protection_enabled = enabled
-        self.domain_cache.clear()
-        
-    def enable_phishing_protection(self, enabled: bool):
-        """Увімкнення/вимкнення захисту від фішингу"""
-        self.phishing_protection_enabled = enabled
-        self.domain_cache.clear()
->>>>>>> 5a38118ad408679126e5a17483fa7875264c621b
@@ -0,0 +1,422 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Розподілене сховище стану профілів для AnDetect Browser
+Кожен профіль пише cookies, сесії та історію у власну базу profiles/<id>/state.db,
+тож профілі не чекають один одного на єдиному блокуванні запису sessions.db
+"""
+
+import os
+import time
+import heapq
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import List, Dict, Optional, Iterator
+
+from .crypto import ProfileCipher
+from .database import ConnectionPool
+from .profile_state import ProfileStateStore
+
+
+@dataclass
+class StateShard:
+    """Відкрита база стану одного профілю"""
+    profile_id: str
+    store: ProfileStateStore
+    users: int = 0
+    last_used: float = field(default_factory=time.monotonic)
+
+
+class ShardedStateStore:
+    """Стан профілів у окремих базах з LRU-кешем відкритих шардів"""
+
+    SHARD_FILE = "state.db"
+
+    # Відкритих шардів одночасно та час простою до закриття (секунди)
+    MAX_OPEN_SHARDS = 32
+    SHARD_IDLE_TIMEOUT = 300.0
+
+    # Формат рядків та колонки cookies спільні з ProfileStateStore
+    COOKIE_VALUE_COLUMNS = ProfileStateStore.COOKIE_VALUE_COLUMNS
+    cookie_row = staticmethod(ProfileStateStore.cookie_row)
+    expiry_epoch = staticmethod(ProfileStateStore.expiry_epoch)
+
+    # Спільного пулу немає - кожен шард має власний
+    pool = None
+
+    def __init__(self, profiles_dir: str, cipher: ProfileCipher = None,
+                 max_open: int = None, idle_timeout: float = None):
+        self.profiles_dir = profiles_dir
+        self.db_path = profiles_dir
+        self.cipher = cipher
+        self.max_open = max_open or self.MAX_OPEN_SHARDS
+        self.idle_timeout = self.SHARD_IDLE_TIMEOUT if idle_timeout is None else idle_timeout
+
+        self._shards = OrderedDict()  # profile_id -> StateShard (від найдавніше використаного)
+        self._lock = threading.Lock()
+
+        # Статистика кешу
+        self.hits = 0
+        self.opened = 0
+        self.evicted = 0
+
+    def shard_path(self, profile_id: str) -> str:
+        """Шлях до бази стану профілю"""
+        return os.path.join(self.profiles_dir, profile_id, self.SHARD_FILE)
+
+    def profile_ids(self) -> List[str]:
+        """Профілі, для яких існує база стану"""
+        if not os.path.isdir(self.profiles_dir):
+            return []
+        return sorted(
+            entry.name for entry in os.scandir(self.profiles_dir)
+            if entry.is_dir() and os.path.exists(os.path.join(entry.path, self.SHARD_FILE))
+        )
+
+    # ---- Кеш шардів ----
+
+    @contextmanager
+    def shard(self, profile_id: str, create: bool = True) -> Iterator[Optional[ProfileStateStore]]:
+        """Сховище профілю на час блоку (None, якщо бази немає і create=False)"""
+        entry = self._acquire(profile_id, create)
+        try:
+            yield entry.store if entry is not None else None
+        finally:
+            if entry is not None:
+                self._release(entry)
+
+    def _acquire(self, profile_id: str, create: bool) -> Optional[StateShard]:
+        """Відкритий шард профілю (відкривається при першому зверненні)"""
+        with self._lock:
+            entry = self._shards.get(profile_id)
+            if entry is not None:
+                self._shards.move_to_end(profile_id)
+                entry.users += 1
+                self.hits += 1
+                return entry
+
+        path = self.shard_path(profile_id)
+        if not create and not os.path.exists(path):
+            return None
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        # Відкриття (з ініціалізацією схеми) - поза блокуванням кешу
+        store = ProfileStateStore(ConnectionPool(path), self.cipher)
+        with self._lock:
+            entry = self._shards.get(profile_id)
+            if entry is None:
+                entry = StateShard(profile_id, store)
+                self._shards[profile_id] = entry
+                self.opened += 1
+                store = None
+            else:
+                self._shards.move_to_end(profile_id)
+            entry.users += 1
+
+        # Інший потік встиг відкрити цей самий шард
+        if store is not None:
+            store.close()
+        return entry
+
+    def _release(self, entry: StateShard):
+        """Звільнення шарду та закриття зайвих або простоюючих"""
+        with self._lock:
+            entry.users -= 1
+            entry.last_used = time.monotonic()
+            expired = self._collect_evictable()
+        for victim in expired:
+            victim.store.close()
+
+    def _collect_evictable(self) -> List[StateShard]:
+        """Вилучення з кешу найдавніших вільних шардів понад ліміт та простоюючих"""
+        victims = []
+        excess = len(self._shards) - self.max_open
+        idle_before = time.monotonic() - self.idle_timeout
+        for profile_id, entry in list(self._shards.items()):
+            if excess <= 0 and entry.last_used > idle_before:
+                break
+            if entry.users:
+                continue
+            del self._shards[profile_id]
+            victims.append(entry)
+            excess -= 1
+        self.evicted += len(victims)
+        return victims
+
+    def evict_idle(self) -> int:
+        """Закриття шардів, що простоюють довше за idle_timeout (кількість закритих)"""
+        with self._lock:
+            victims = self._collect_evictable()
+        for victim in victims:
+            victim.store.close()
+        return len(victims)
+
+    def close_shard(self, profile_id: str):
+        """Закриття шарду профілю (наприклад, перед видаленням файлів)"""
+        with self._lock:
+            entry = self._shards.pop(profile_id, None)
+        if entry is not None:
+            entry.store.close()
+
+    def cache_stats(self) -> Dict[str, int]:
+        """Відкриті шарди та статистика кешу"""
+        with self._lock:
+            return {
+                'open_shards': len(self._shards),
+                'busy_shards': sum(1 for entry in self._shards.values() if entry.users),
+                'max_open': self.max_open,
+                'hits': self.hits,
+                'opened': self.opened,
+                'evicted': self.evicted,
+            }
+
+    def shutdown(self):
+        """Запис черг історії та закриття всіх шардів"""
+        with self._lock:
+            entries = list(self._shards.values())
+            self._shards.clear()
+        for entry in entries:
+            entry.store.close()
+
+    # ---- Перенесення з єдиної бази ----
+
+    def import_legacy(self, legacy_pool: ConnectionPool, cipher: ProfileCipher = None) -> Dict[str, int]:
+        """Перенесення старих таблиць profiles.db та вмісту sessions.db по шардах профілів"""
+        data_dir = os.path.dirname(os.path.abspath(self.profiles_dir))
+        single_path = os.path.join(data_dir, "sessions.db")
+        cursor = legacy_pool.execute(
+            "SELECT COUNT(*) FROM sqlite_master WHERE type = 'table' AND name IN ('cookies', 'sessions')"
+        )
+        if not cursor.fetchone()[0] and not os.path.exists(single_path):
+            return {'cookies': 0, 'sessions': 0, 'profiles': 0}
+
+        # Старі таблиці спершу зливаються в sessions.db звичайним шляхом
+        single = ProfileStateStore.for_database(single_path, cipher or self.cipher)
+        try:
+            counts = single.import_legacy(legacy_pool, cipher)
+            counts['profiles'] = self.import_store(single)
+        finally:
+            single.close()
+        return counts
+
+    def import_store(self, source: ProfileStateStore) -> int:
+        """Перенесення стану всіх профілів з єдиної бази у шарди (кількість профілів)"""
+        source.history_writer.flush()
+        profile_ids = [row[0] for row in source.pool.execute("""
+            SELECT profile_id FROM saved_cookies UNION
+            SELECT profile_id FROM browser_sessions UNION
+            SELECT profile_id FROM browsing_history
+        """).fetchall()]
+
+        for profile_id in profile_ids:
+            with self.shard(profile_id) as store:
+                self._copy_profile(store, source.db_path, profile_id)
+            # Рядки видаляються з джерела лише після коміту в шарді
+            source.delete_profile_state(profile_id)
+        return len(profile_ids)
+
+    def _copy_profile(self, store: ProfileStateStore, source_path: str, profile_id: str):
+        """Копіювання рядків профілю з приєднаної бази в шард однією транзакцією"""
+        conn = store.pool.connection()
+        conn.execute("ATTACH DATABASE ? AS source", (source_path,))
+        try:
+            with store.pool.transaction(immediate=True):
+                cookie_columns = ('profile_id', 'domain', 'name', 'path') + self.COOKIE_VALUE_COLUMNS + (
+                    'created_at', 'updated_at'
+                )
+                columns = ', '.join(cookie_columns)
+                assignments = ', '.join(
+                    f"{column} = excluded.{column}"
+                    for column in self.COOKIE_VALUE_COLUMNS + ('updated_at',)
+                )
+                conn.execute(f"""
+                    INSERT INTO main.saved_cookies ({columns})
+                    SELECT {columns} FROM source.saved_cookies WHERE profile_id = ?
+                    ON CONFLICT(profile_id, domain, name, path) DO UPDATE SET {assignments}
+                    WHERE excluded.updated_at > saved_cookies.updated_at
+                """, (profile_id,))
+
+                conn.execute("""
+                    INSERT OR IGNORE INTO main.session_blobs (hash, data, raw_size, created_at)
+                    SELECT hash, data, raw_size, created_at FROM source.session_blobs
+                    WHERE hash IN (SELECT blob_hash FROM source.browser_sessions WHERE profile_id = ?)
+                """, (profile_id,))
+                conn.execute("""
+                    INSERT INTO main.browser_sessions
+                    (profile_id, session_name, tabs_data, blob_hash, created_at, last_accessed, is_active)
+                    SELECT s.profile_id, s.session_name, s.tabs_data, s.blob_hash,
+                        s.created_at, s.last_accessed, s.is_active
+                    FROM source.browser_sessions s
+                    WHERE s.profile_id = ? AND NOT EXISTS (
+                        SELECT 1 FROM main.browser_sessions m
+                        WHERE m.profile_id = s.profile_id AND m.created_at = s.created_at
+                        AND m.blob_hash IS s.blob_hash
+                    )
+                    ORDER BY s.id
+                """, (profile_id,))
+
+                conn.execute("""
+                    INSERT INTO main.browsing_history (profile_id, url, title, visit_time, visit_count)
+                    SELECT profile_id, url, title, visit_time, visit_count
+                    FROM source.browsing_history WHERE profile_id = ?
+                    ON CONFLICT(profile_id, url) DO UPDATE SET
+                        visit_count = visit_count + excluded.visit_count,
+                        visit_time = MAX(visit_time, excluded.visit_time)
+                """, (profile_id,))
+        finally:
+            conn.execute("DETACH DATABASE source")
+
+    # ---- Cookies ----
+
+    def sync_cookies(self, profile_id: str, cookies: List[Dict]) -> Dict[str, int]:
+        """Збереження повного набору cookies профілю (записуються тільки зміни)"""
+        with self.shard(profile_id) as store:
+            return store.sync_cookies(profile_id, cookies)
+
+    def apply_cookie_changes(self, profile_id: str, cookies: List[Dict],
+                             removed: List[tuple]) -> Dict[str, int]:
+        """Збереження тільки змінених та видалених cookies"""
+        with self.shard(profile_id) as store:
+            return store.apply_cookie_changes(profile_id, cookies, removed)
+
+    def load_cookies(self, profile_id: str) -> List[Dict]:
+        """Дійсні cookies профілю"""
+        with self.shard(profile_id, create=False) as store:
+            return store.load_cookies(profile_id) if store else []
+
+    def purge_expired_cookies(self, batch_size: int = None, max_batches: int = None) -> int:
+        """Видалення протермінованих cookies у всіх шардах (кількість видалених)"""
+        purged = 0
+        for profile_id in self.profile_ids():
+            with self.shard(profile_id, create=False) as store:
+                if store:
+                    purged += store.purge_expired_cookies(batch_size, max_batches)
+        return purged
+
+    def clear_cookies(self, profile_id: str):
+        """Видалення всіх cookies профілю"""
+        with self.shard(profile_id, create=False) as store:
+            if store:
+                store.clear_cookies(profile_id)
+
+    # ---- Сесії ----
+
+    def save_session(self, profile_id: str, tabs_data: List[Dict], session_name: str = None,
+                     replace: bool = False) -> int:
+        """Збереження сесії профілю (id сесії в межах шарду)"""
+        with self.shard(profile_id) as store:
+            return store.save_session(profile_id, tabs_data, session_name, replace)
+
+    def load_session(self, profile_id: str, session_id: int = None,
+                     touch: bool = False) -> Optional[List[Dict]]:
+        """Вкладки конкретної або останньої активної сесії"""
+        with self.shard(profile_id, create=False) as store:
+            return store.load_session(profile_id, session_id, touch) if store else None
+
+    def list_sessions(self, profile_id: str) -> List[Dict]:
+        """Список збережених сесій профілю"""
+        with self.shard(profile_id, create=False) as store:
+            return store.list_sessions(profile_id) if store else []
+
+    def delete_session(self, session_id: int, profile_id: str = None) -> bool:
+        """Видалення сесії (id сесій унікальні лише в межах профілю)"""
+        if not profile_id:
+            raise ValueError("Для розподіленого сховища потрібен profile_id сесії")
+        with self.shard(profile_id, create=False) as store:
+            return store.delete_session(session_id, profile_id) if store else False
+
+    def clear_sessions(self, profile_id: str):
+        """Видалення всіх сесій профілю"""
+        with self.shard(profile_id, create=False) as store:
+            if store:
+                store.clear_sessions(profile_id)
+
+    # ---- Історія ----
+
+    def add_visit(self, profile_id: str, url: str, title: str = "", visits: int = 1):
+        """Додавання відвідування в чергу фонового запису шарду"""
+        with self.shard(profile_id) as store:
+            store.add_visit(profile_id, url, title, visits)
+
+    def history_metrics(self) -> Dict[str, float]:
+        """Сумарні метрики фонового запису історії відкритих шардів"""
+        with self._lock:
+            metrics = [entry.store.history_metrics() for entry in self._shards.values()]
+        totals = {
+            key: sum(item[key] for item in metrics)
+            for key in ('queue_depth', 'queued_visits', 'flushed_rows', 'flushes', 'failed_flushes')
+        }
+        totals['max_flush_ms'] = max((item['max_flush_ms'] for item in metrics), default=0.0)
+        totals['avg_flush_ms'] = round(
+            sum(item['avg_flush_ms'] * item['flushes'] for item in metrics) / totals['flushes'], 3
+        ) if totals['flushes'] else 0.0
+        totals['open_shards'] = len(metrics)
+        return totals
+
+    def get_history(self, profile_id: str, limit: int = 100) -> List[Dict]:
+        """Останні відвідування профілю"""
+        with self.shard(profile_id, create=False) as store:
+            return store.get_history(profile_id, limit) if store else []
+
+    def search_history(self, query: str, profile_id: str = None,
+                       limit: int = 50, offset: int = 0) -> List[Dict]:
+        """Пошук в історії профілю або (без profile_id) в усіх шардах"""
+        if profile_id:
+            with self.shard(profile_id, create=False) as store:
+                return store.search_history(query, profile_id, limit, offset) if store else []
+
+        # Кожен шард віддає свою першу сторінку limit + offset, далі злиття за rank.
+        # BM25 рахується за статистикою шарду, тож порядок між профілями наближений
+        results = []
+        for shard_id in self.profile_ids():
+            with self.shard(shard_id, create=False) as store:
+                if store:
+                    results.append(store.search_history(query, None, limit + offset, 0))
+        merged = heapq.merge(*results, key=lambda item: item['rank'])
+        return list(merged)[offset:offset + limit]
+
+    def recent_history(self, limit: int = 100) -> List[Dict]:
+        """Останні відвідування всіх профілів (злиття шардів за часом)"""
+        results = []
+        for profile_id in self.profile_ids():
+            with self.shard(profile_id, create=False) as store:
+                if store:
+                    results.append(store.recent_history(limit))
+        merged = heapq.merge(*results, key=lambda item: item['visit_time'], reverse=True)
+        return list(merged)[:limit]
+
+    def clear_history(self, profile_id: str, older_than_days: int = None):
+        """Видалення історії профілю (всієї або старшої за вказану кількість днів)"""
+        with self.shard(profile_id, create=False) as store:
+            if store:
+                store.clear_history(profile_id, older_than_days)
+
+    # ---- Стан профілю цілком ----
+
+    def save_profile_state(self, profile_id: str, cookies: List[Dict] = None,
+                           tabs_data: List[Dict] = None, session_name: str = None) -> Dict[str, int]:
+        """Збереження cookies та сесії профілю однією транзакцією шарду"""
+        with self.shard(profile_id) as store:
+            return store.save_profile_state(profile_id, cookies, tabs_data, session_name)
+
+    def delete_profile_state(self, profile_id: str):
+        """Закриття шарду та видалення бази стану профілю"""
+        self.close_shard(profile_id)
+        path = self.shard_path(profile_id)
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(path + suffix):
+                os.remove(path + suffix)
+
+    def stats(self) -> Dict[str, int]:
+        """Сумарна статистика всіх шардів"""
+        totals = {'profiles': 0, 'cookies': 0, 'sessions': 0, 'history': 0, 'visits': 0, 'size_bytes': 0}
+        profile_ids = self.profile_ids()
+        for profile_id in profile_ids:
+            with self.shard(profile_id, create=False) as store:
+                if store:
+                    for key, value in store.stats().items():
+                        totals[key] += value
+        totals['shards'] = len(profile_ids)
+        return totals
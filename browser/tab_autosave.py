@@ -0,0 +1,402 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Автозбереження вкладок для AnDetect Browser
+Зміни вкладок (відкриття, закриття, URL, порядок) накопичуються з затримкою та дописуються
+компактними дельтами в журнал профілю; журнал періодично стискається в знімок SessionManager
+"""
+
+import os
+import json
+import zlib
+import time
+from collections import OrderedDict
+from typing import List, Dict, Optional, Tuple
+
+from PyQt5.QtCore import QObject, QTimer, pyqtSignal
+from PyQt5.QtWidgets import QTabWidget
+
+
+class TabJournal:
+    """Журнал вкладок профілю: базовий стан та дельти, один запис з CRC32 на рядок"""
+
+    # Стиснення журналу після стількох дельт або такого розміру файлу
+    COMPACT_RECORDS = 200
+    COMPACT_BYTES = 64 * 1024
+
+    def __init__(self, path: str, fsync: bool = False):
+        self.path = path
+        # fsync на кожен запис захищає і від збою ОС; без нього - від падіння процесу
+        self.fsync = fsync
+
+        self.tabs = OrderedDict()  # tab_id -> [url, title] у порядку вкладок
+        self.active = None
+        self.next_id = 1
+
+        self.records = 0  # дельт після базового запису
+        self.size = 0
+        self.bytes_written = 0
+        self.deltas_written = 0
+        self._file = None
+
+    @staticmethod
+    def encode(record: Dict) -> bytes:
+        """Рядок журналу: CRC32 та компактний JSON"""
+        payload = json.dumps(record, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        return b"%08x " % zlib.crc32(payload) + payload + b"\n"
+
+    @staticmethod
+    def decode(line: bytes) -> Optional[Dict]:
+        """Запис з рядка журналу (None для обірваного або пошкодженого)"""
+        if len(line) < 11 or not line.endswith(b"\n") or line[8:9] != b" ":
+            return None
+        payload = line[9:-1]
+        try:
+            if int(line[:8], 16) != zlib.crc32(payload):
+                return None
+            return json.loads(payload)
+        except ValueError:
+            return None
+
+    def apply(self, record: Dict):
+        """Застосування запису до стану в пам'яті"""
+        if 'b' in record:
+            self.tabs = OrderedDict((tab_id, [url, title]) for tab_id, url, title in record['b'])
+            self.active = None
+        for tab_id in record.get('c', ()):
+            self.tabs.pop(tab_id, None)
+        for tab_id, url, title in record.get('u', ()):
+            entry = self.tabs.setdefault(tab_id, ["", ""])
+            if url is not None:
+                entry[0] = url
+            if title is not None:
+                entry[1] = title
+        if 'o' in record:
+            self.tabs = OrderedDict(
+                (tab_id, self.tabs[tab_id]) for tab_id in record['o'] if tab_id in self.tabs
+            )
+        if 'a' in record:
+            self.active = record['a']
+        if self.tabs:
+            self.next_id = max(self.next_id, max(self.tabs) + 1)
+
+    def load(self) -> int:
+        """Відновлення стану з журналу (кількість записів; обірваний хвіст відкидається)"""
+        if not os.path.exists(self.path):
+            return 0
+
+        with open(self.path, 'rb') as f:
+            data = f.read()
+
+        count = 0
+        valid = 0
+        for line in data.splitlines(keepends=True):
+            record = self.decode(line)
+            if record is None:
+                break
+            self.apply(record)
+            valid += len(line)
+            count += 1
+            self.records = 0 if 'b' in record else self.records + 1
+
+        # Хвіст після збою обрізається, щоб нові записи не йшли після пошкодженого рядка
+        if valid < len(data):
+            with open(self.path, 'r+b') as f:
+                f.truncate(valid)
+        self.size = valid
+        return count
+
+    def diff(self, tabs: List[Tuple[int, str, str]], active: Optional[int]) -> Optional[Dict]:
+        """Дельта від збереженого стану до поточних вкладок (None, якщо змін немає)"""
+        record = {}
+        current_ids = [tab_id for tab_id, _, _ in tabs]
+        current = set(current_ids)
+
+        closed = [tab_id for tab_id in self.tabs if tab_id not in current]
+        if closed:
+            record['c'] = closed
+
+        updates = []
+        added = []
+        for tab_id, url, title in tabs:
+            previous = self.tabs.get(tab_id)
+            if previous is None:
+                updates.append([tab_id, url, title])
+                added.append(tab_id)
+            elif previous[0] != url or previous[1] != title:
+                updates.append([
+                    tab_id,
+                    url if url != previous[0] else None,
+                    title if title != previous[1] else None,
+                ])
+        if updates:
+            record['u'] = updates
+
+        # Порядок пишеться лише якщо він відрізняється від "старі вкладки + нові в кінці"
+        expected = [tab_id for tab_id in self.tabs if tab_id in current] + added
+        if expected != current_ids:
+            record['o'] = current_ids
+
+        if active != self.active:
+            record['a'] = active
+        return record or None
+
+    def _open(self):
+        """Файл журналу для дописування"""
+        if self._file is None:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            self._file = open(self.path, 'ab')
+        return self._file
+
+    def append(self, record: Dict) -> int:
+        """Дописування запису (записані байти)"""
+        data = self.encode(record)
+        f = self._open()
+        f.write(data)
+        f.flush()
+        if self.fsync:
+            os.fsync(f.fileno())
+
+        self.apply(record)
+        self.records += 1
+        self.size += len(data)
+        self.bytes_written += len(data)
+        self.deltas_written += 1
+        return len(data)
+
+    def record(self, tabs: List[Tuple[int, str, str]], active: Optional[int]) -> int:
+        """Запис змін вкладок (записані байти, 0 якщо змін немає)"""
+        record = self.diff(tabs, active)
+        return self.append(record) if record is not None else 0
+
+    def needs_compaction(self) -> bool:
+        """Чи настав час стиснути журнал"""
+        return self.records >= self.COMPACT_RECORDS or self.size >= self.COMPACT_BYTES
+
+    def compact(self, tabs: List[Tuple[int, str, str]] = None, active: Optional[int] = None) -> int:
+        """Атомарна заміна журналу одним базовим записом (поточного або переданого стану)"""
+        if tabs is not None:
+            self.apply({'b': tabs, 'a': active})
+        data = self.encode({
+            'b': [[tab_id, url, title] for tab_id, (url, title) in self.tabs.items()],
+            'a': self.active,
+        })
+
+        self.close()
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        temp_path = self.path + ".tmp"
+        with open(temp_path, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, self.path)
+
+        self.records = 0
+        self.size = len(data)
+        self.bytes_written += len(data)
+        return len(data)
+
+    def snapshot(self) -> List[Dict]:
+        """Вкладки у форматі знімка сесії"""
+        return [
+            {'url': url, 'title': title, 'active': tab_id == self.active}
+            for tab_id, (url, title) in self.tabs.items()
+        ]
+
+    def close(self):
+        """Закриття файлу журналу"""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class TabAutosave(QObject):
+    """Автозбереження вкладок QTabWidget у журнал профілю зі стисненням у знімок сесії"""
+
+    tabs_saved = pyqtSignal(str, int)  # profile_id, записані байти
+    session_compacted = pyqtSignal(str, int)  # profile_id, кількість вкладок
+
+    JOURNAL_FILE = "tabs.journal"
+    AUTOSAVE_SESSION_NAME = "Автозбереження"
+
+    # Затримка запису після останньої зміни та максимальне очікування при безперервних змінах
+    DEBOUNCE_MS = 800
+    MAX_DELAY_MS = 5000
+
+    # Контрольне опитування вкладок (додані у фоні без сигналів) та стиснення журналу
+    POLL_INTERVAL = 5000  # мс
+    COMPACT_INTERVAL = 10 * 60 * 1000  # мс
+
+    def __init__(self, session_manager, profile_id: str, journal_path: str = None,
+                 fsync: bool = False, parent: QObject = None):
+        super().__init__(parent)
+        self.session_manager = session_manager
+        self.profile_id = profile_id
+        if journal_path is None:
+            profile_dir = session_manager.profile_manager.get_profile_directory(profile_id)
+            journal_path = os.path.join(profile_dir, self.JOURNAL_FILE)
+        self.journal = TabJournal(journal_path, fsync)
+
+        self.tab_widget = None
+        self.tab_ids = {}  # віджет вкладки -> tab_id
+        self.navigations = 0
+        self._pending_since = None
+        self._rebase = True
+        self._snapshot_tabs = None  # вкладки останнього знімка сесії
+
+        self.debounce_timer = QTimer(self)
+        self.debounce_timer.setSingleShot(True)
+        self.debounce_timer.timeout.connect(self.flush)
+        self.poll_timer = QTimer(self)
+        self.poll_timer.timeout.connect(self.flush)
+        self.compact_timer = QTimer(self)
+        self.compact_timer.timeout.connect(self.compact)
+
+    def restore(self) -> List[Dict]:
+        """Вкладки для відновлення: з журналу, а якщо його немає - з останнього знімка сесії"""
+        try:
+            if self.journal.load() and self.journal.tabs:
+                return self.journal.snapshot()
+        except OSError as e:
+            print(f"Помилка читання журналу вкладок: {e}")
+
+        return self.session_manager.restore_session(self.profile_id) or []
+
+    def attach(self, tab_widget: QTabWidget):
+        """Відстеження вкладок (перший запис стає новим базовим станом журналу)"""
+        self.detach()
+        self.tab_widget = tab_widget
+        tab_widget.currentChanged.connect(self.schedule)
+        tab_widget.tabCloseRequested.connect(self.schedule)
+        tab_widget.tabBar().tabMoved.connect(self.schedule)
+        self._rebase = True
+        self.poll_timer.start(self.POLL_INTERVAL)
+        self.compact_timer.start(self.COMPACT_INTERVAL)
+        self.schedule()
+
+    def detach(self):
+        """Запис змін та відключення від вкладок"""
+        if self.tab_widget is None:
+            return
+        self.flush()
+        for signal in (self.tab_widget.currentChanged, self.tab_widget.tabCloseRequested,
+                       self.tab_widget.tabBar().tabMoved):
+            try:
+                signal.disconnect(self.schedule)
+            except TypeError:
+                pass
+        self.tab_widget = None
+        self.tab_ids.clear()
+        self.poll_timer.stop()
+        self.compact_timer.stop()
+
+    def schedule(self, *args):
+        """Відкладений запис після серії змін"""
+        now = time.monotonic()
+        if self._pending_since is None:
+            self._pending_since = now
+        # Безперервні зміни (редиректи, заголовки) не відкладають запис довше MAX_DELAY_MS
+        if (now - self._pending_since) * 1000 >= self.MAX_DELAY_MS:
+            self.flush()
+        else:
+            self.debounce_timer.start(self.DEBOUNCE_MS)
+
+    def on_navigation(self, *args):
+        """Зміна URL вкладки"""
+        self.navigations += 1
+        self.schedule()
+
+    def tab_state(self, widget) -> Tuple[str, str]:
+        """URL та заголовок вкладки"""
+        url = widget.url().toString() if hasattr(widget, 'url') else ""
+        title = widget.title() if hasattr(widget, 'title') else ""
+        return url, title
+
+    def current_tabs(self) -> Tuple[List[Tuple[int, str, str]], Optional[int]]:
+        """Вкладки віджета з ідентифікаторами журналу та активна вкладка"""
+        tabs = []
+        widgets = set()
+        for index in range(self.tab_widget.count()):
+            widget = self.tab_widget.widget(index)
+            widgets.add(widget)
+            tab_id = self.tab_ids.get(widget)
+            if tab_id is None:
+                tab_id = self.journal.next_id
+                self.journal.next_id += 1
+                self.tab_ids[widget] = tab_id
+                if hasattr(widget, 'urlChanged'):
+                    widget.urlChanged.connect(self.on_navigation)
+                if hasattr(widget, 'titleChanged'):
+                    widget.titleChanged.connect(self.schedule)
+            tabs.append((tab_id,) + self.tab_state(widget))
+
+        # Закриті вкладки
+        for widget in [widget for widget in self.tab_ids if widget not in widgets]:
+            del self.tab_ids[widget]
+
+        current = self.tab_widget.currentWidget()
+        return tabs, self.tab_ids.get(current) if current is not None else None
+
+    def flush(self) -> int:
+        """Запис накопичених змін у журнал (записані байти)"""
+        self.debounce_timer.stop()
+        self._pending_since = None
+        if self.tab_widget is None:
+            return 0
+
+        try:
+            tabs, active = self.current_tabs()
+            if self._rebase:
+                # Після відновлення або підключення старі ідентифікатори вкладок не діють
+                self._rebase = False
+                written = self.journal.compact(tabs, active)
+            else:
+                written = self.journal.record(tabs, active)
+        except OSError as e:
+            print(f"Помилка запису журналу вкладок: {e}")
+            return 0
+
+        if written:
+            self.tabs_saved.emit(self.profile_id, written)
+            if self.journal.needs_compaction():
+                self.compact()
+        return written
+
+    def compact(self) -> bool:
+        """Стиснення журналу та збереження знімка сесії"""
+        self.flush()
+        if not self.journal.records and self._snapshot_tabs == self.journal.snapshot():
+            return False
+
+        try:
+            self.journal.compact()
+        except OSError as e:
+            print(f"Помилка стиснення журналу вкладок: {e}")
+            return False
+
+        tabs_data = self.journal.snapshot()
+        if self.session_manager.save_session(
+            self.profile_id, tabs_data, self.AUTOSAVE_SESSION_NAME, replace=True
+        ):
+            self._snapshot_tabs = tabs_data
+            self.session_compacted.emit(self.profile_id, len(tabs_data))
+            return True
+        return False
+
+    def metrics(self) -> Dict[str, float]:
+        """Навігації, записані дельти та байти журналу"""
+        return {
+            'navigations': self.navigations,
+            'deltas': self.journal.deltas_written,
+            'journal_bytes': self.journal.bytes_written,
+            'journal_size': self.journal.size,
+            'bytes_per_navigation': round(self.journal.bytes_written / self.navigations, 1)
+            if self.navigations else 0.0,
+        }
+
+    def close(self):
+        """Запис змін, стиснення у знімок сесії та закриття журналу"""
+        self.flush()
+        self.compact()
+        self.detach()
+        self.journal.close()
@@ -10,6 +10,7 @@ import os
 import subprocess
 import json
 import shutil
+import time
 from datetime import datetime, timedelta
 
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QVBoxLayout, QHBoxLayout,
@@ -20,12 +21,12 @@ from PyQt5.QtWidgets import (QApplication, QMainWindow, QVBoxLayout, QHBoxLayout
                             QProgressBar, QStatusBar, QMenuBar, QAction,
                             QToolBar, QSpacerItem, QSizePolicy, QTabWidget,
                             QFormLayout, QSpinBox, QToolButton, QMenu,
-                            QFileDialog, QDialog)
+                            QFileDialog, QDialog, QProgressDialog)
 from PyQt5.QtCore import Qt, QThread, pyqtSignal, QTimer, QSize, QSettings
 from PyQt5.QtGui import QIcon, QPixmap, QFont, QMovie, QPalette, QColor
 
 # Локальні імпорти
-from browser.profile_manager import ProfileManager, BrowserProfile
+from browser.profile_manager import ProfileManager, BrowserProfile, ProfileSummary
 from profile_icons import (ProfileIcon, PROFILE_ICONS, COUNTRY_FLAGS, 
                           LABEL_COLORS, get_country_by_timezone,
                           get_browser_icon, get_proxy_type_icon)
@@ -39,7 +40,7 @@ class ProfileWidget(QFrame):
     profileEdited = pyqtSignal(str)    # profile_id
     profileDeleted = pyqtSignal(str)   # profile_id
     
-    def __init__(self, profile: BrowserProfile, parent=None):
+    def __init__(self, profile: ProfileSummary, parent=None):
         super().__init__(parent)
         self.profile = profile
         self.is_running = False
@@ -298,6 +299,7 @@ class ChromeManager:
     
     def __init__(self):
         self.running_profiles = {}  # profile_id -> process
+        self.launch_times = {}      # profile_id -> час запуску (для total_time)
         
     def launch_profile(self, profile: BrowserProfile, url="https://www.google.com"):
         """Запуск Chrome з профілем"""
@@ -318,6 +320,7 @@ class ChromeManager:
             # Запускаємо Chrome
             process = subprocess.Popen(chrome_flags)
             self.running_profiles[profile.id] = process
+            self.launch_times[profile.id] = time.monotonic()
             
             print(f"✅ Профіль '{profile.name}' запущено (PID: {process.pid})")
             return True
@@ -338,6 +341,11 @@ class ChromeManager:
                 return False
         return False
         
+    def pop_session_time(self, profile_id: str) -> int:
+        """Тривалість роботи профілю з моменту запуску (секунди)"""
+        started = self.launch_times.pop(profile_id, None)
+        return int(time.monotonic() - started) if started is not None else 0
+        
     def is_profile_running(self, profile_id: str) -> bool:
         """Перевірка чи запущений профіль"""
         if profile_id in self.running_profiles:
@@ -487,6 +495,11 @@ class AnDetectMainWindow(QMainWindow):
         self.profile_manager = ProfileManager()
         self.chrome_manager = ChromeManager()
         self.settings = QSettings("AnDetect", "ProfileManager")
+        self.sort_order = 'last_used'
+        self.profile_widgets = {}  # profile_id -> ProfileWidget
+        
+        # Зміни профілів застосовуються до окремих рядків, без повного перезавантаження
+        self.profile_manager.add_listener(self.apply_profile_changes)
         
         self.setWindowTitle("AnDetect Profile Manager v2.0")
         self.setMinimumSize(1200, 800)
@@ -500,6 +513,9 @@ class AnDetectMainWindow(QMainWindow):
         self.init_ui()
         self.load_profiles()
         
+        # Перешифрування старих записів у фоні
+        self.profile_manager.start_reencryption()
+        
         # Таймер для оновлення статусів
         self.update_timer = QTimer()
         self.update_timer.timeout.connect(self.update_running_status)
@@ -540,6 +556,10 @@ class AnDetectMainWindow(QMainWindow):
         new_action.triggered.connect(self.create_new_profile)
         file_menu.addAction(new_action)
         
+        bulk_action = QAction('Масове створення профілів', self)
+        bulk_action.triggered.connect(self.create_profiles_bulk)
+        file_menu.addAction(bulk_action)
+        
         file_menu.addSeparator()
         
         import_action = QAction('Імпорт профілів', self)
@@ -710,7 +730,8 @@ class AnDetectMainWindow(QMainWindow):
     def load_profiles(self):
         """Завантаження профілів"""
         try:
-            profiles = self.profile_manager.get_all_profiles()
+            # Для списку достатньо коротких записів, повний профіль - при запуску/редагуванні
+            profiles = self.profile_manager.get_profile_summaries()
             self.display_profiles(profiles)
             self.update_profiles_count(len(profiles))
             
@@ -721,26 +742,67 @@ class AnDetectMainWindow(QMainWindow):
         """Відображення профілів"""
         # Очищаємо поточні віджети
         for i in reversed(range(self.profiles_layout.count())):
-            child = self.profiles_layout.itemAt(i).widget()
-            if child:
-                child.setParent(None)
+            item = self.profiles_layout.takeAt(i)
+            if item.widget():
+                item.widget().setParent(None)
+        self.profile_widgets.clear()
                 
         # Додаємо нові віджети
         for profile in profiles:
-            widget = ProfileWidget(profile)
-            widget.profileLaunched.connect(self.launch_profile)
-            widget.profileEdited.connect(self.edit_profile)
-            widget.profileDeleted.connect(self.delete_profile)
-            
-            # Перевіряємо чи запущений
-            if self.chrome_manager.is_profile_running(profile.id):
-                widget.set_running(True)
-                
-            self.profiles_layout.addWidget(widget)
+            self.profiles_layout.addWidget(self.create_profile_widget(profile))
             
         # Додаємо простір внизу
         self.profiles_layout.addStretch()
         
+    def create_profile_widget(self, profile: ProfileSummary) -> ProfileWidget:
+        """Створення віджета рядка профілю"""
+        widget = ProfileWidget(profile)
+        widget.profileLaunched.connect(self.launch_profile)
+        widget.profileEdited.connect(self.edit_profile)
+        widget.profileDeleted.connect(self.delete_profile)
+        
+        # Перевіряємо чи запущений
+        if self.chrome_manager.is_profile_running(profile.id):
+            widget.set_running(True)
+            
+        self.profile_widgets[profile.id] = widget
+        return widget
+        
+    def apply_profile_changes(self, changes: list):
+        """Застосування подій ProfileChange: оновлюються тільки змінені рядки"""
+        try:
+            changed_ids = {change.profile_id for change in changes if change.kind != 'removed'}
+            profile_ids = self.visible_profile_ids()
+            visible = set(profile_ids)
+            
+            # Видалені або відфільтровані рядки
+            for profile_id in [p_id for p_id in self.profile_widgets if p_id not in visible]:
+                self.profile_widgets.pop(profile_id).setParent(None)
+                
+            # Короткі записи тільки для нових та змінених рядків
+            summaries = {
+                summary.id: summary for summary in self.profile_manager.get_profile_summaries([
+                    p_id for p_id in profile_ids
+                    if p_id in changed_ids or p_id not in self.profile_widgets
+                ])
+            }
+            
+            for index, profile_id in enumerate(profile_ids):
+                if profile_id in summaries:
+                    old_widget = self.profile_widgets.pop(profile_id, None)
+                    if old_widget:
+                        old_widget.setParent(None)
+                    self.create_profile_widget(summaries[profile_id])
+                    
+                widget = self.profile_widgets.get(profile_id)
+                if widget and self.profiles_layout.indexOf(widget) != index:
+                    self.profiles_layout.insertWidget(index, widget)
+                    
+            self.update_profiles_count(len(profile_ids))
+            
+        except Exception as e:
+            print(f"Помилка оновлення списку профілів: {e}")
+        
     def update_profiles_count(self, count):
         """Оновлення лічильника профілів"""
         self.profiles_count.setText(f"({count})")
@@ -752,12 +814,42 @@ class AnDetectMainWindow(QMainWindow):
             try:
                 data = dialog.get_profile_data()
                 profile = self.profile_manager.create_profile(data['name'], data)
-                self.load_profiles()
                 self.statusBar().showMessage(f"Профіль '{data['name']}' створено", 3000)
                 
             except Exception as e:
                 QMessageBox.critical(self, "Помилка", f"Не вдалося створити профіль: {e}")
                 
+    def create_profiles_bulk(self):
+        """Масове створення профілів"""
+        count, ok = QInputDialog.getInt(self, "Масове створення", "Кількість профілів:", 10, 1, 100000)
+        if not ok:
+            return
+            
+        name_pattern, ok = QInputDialog.getText(
+            self, "Масове створення", "Шаблон назви ({n} - номер):", text="Профіль {n}"
+        )
+        if not ok or not name_pattern.strip():
+            return
+            
+        progress = QProgressDialog("Створення профілів...", None, 0, count, self)
+        progress.setWindowModality(Qt.WindowModal)
+        progress.setMinimumDuration(0)
+        
+        def on_progress(done, total):
+            progress.setValue(done)
+            QApplication.processEvents()
+            
+        try:
+            profiles = self.profile_manager.create_profiles_bulk(
+                count, name_pattern=name_pattern.strip(), progress_callback=on_progress
+            )
+            self.statusBar().showMessage(f"Створено {len(profiles)} профілів", 3000)
+            
+        except Exception as e:
+            QMessageBox.critical(self, "Помилка", f"Не вдалося створити профілі: {e}")
+        finally:
+            progress.close()
+            
     def edit_profile(self, profile_id):
         """Редагування профілю"""
         try:
@@ -770,7 +862,6 @@ class AnDetectMainWindow(QMainWindow):
             if dialog.exec_() == QDialog.Accepted:
                 data = dialog.get_profile_data()
                 self.profile_manager.update_profile(profile_id, data)
-                self.load_profiles()
                 self.statusBar().showMessage(f"Профіль '{data['name']}' оновлено", 3000)
                 
         except Exception as e:
@@ -784,7 +875,6 @@ class AnDetectMainWindow(QMainWindow):
                 self.chrome_manager.stop_profile(profile_id)
                 
             self.profile_manager.delete_profile(profile_id)
-            self.load_profiles()
             self.statusBar().showMessage("Профіль видалено", 3000)
             
         except Exception as e:
@@ -796,6 +886,10 @@ class AnDetectMainWindow(QMainWindow):
             if self.chrome_manager.is_profile_running(profile_id):
                 # Зупиняємо
                 if self.chrome_manager.stop_profile(profile_id):
+                    self.profile_manager.increment_profile_counters(
+                        profile_id, total_time=self.chrome_manager.pop_session_time(profile_id),
+                        touch=False
+                    )
                     self.statusBar().showMessage("Профіль зупинено", 3000)
                 else:
                     QMessageBox.warning(self, "Помилка", "Не вдалося зупинити профіль")
@@ -804,12 +898,8 @@ class AnDetectMainWindow(QMainWindow):
                 profile = self.profile_manager.get_profile_by_id(profile_id)
                 if profile:
                     if self.chrome_manager.launch_profile(profile):
-                        # Оновлюємо статистику
-                        usage_count = getattr(profile, 'usage_count', 0) + 1
-                        self.profile_manager.update_profile(profile_id, {
-                            'usage_count': usage_count,
-                            'last_used': datetime.now().isoformat()
-                        })
+                        # Оновлюємо статистику атомарно, без перешифрування профілю
+                        self.profile_manager.increment_profile_counters(profile_id, usage_count=1)
                         self.statusBar().showMessage(f"Профіль '{profile.name}' запущено", 3000)
                     else:
                         QMessageBox.critical(self, "Помилка", "Не вдалося запустити профіль")
@@ -821,61 +911,49 @@ class AnDetectMainWindow(QMainWindow):
             
     def update_running_status(self):
         """Оновлення статусу запущених профілів"""
-        for i in range(self.profiles_layout.count() - 1):  # -1 для stretch
-            widget = self.profiles_layout.itemAt(i).widget()
-            if isinstance(widget, ProfileWidget):
-                is_running = self.chrome_manager.is_profile_running(widget.profile.id)
-                widget.set_running(is_running)
+        # Зміни з інших процесів (CLI, автоматизація) через журнал змін
+        try:
+            self.profile_manager.poll_changes()
+        except Exception as e:
+            print(f"Помилка читання журналу змін: {e}")
+            
+        for profile_id, widget in self.profile_widgets.items():
+            widget.set_running(self.chrome_manager.is_profile_running(profile_id))
                 
-    def filter_profiles(self):
-        """Фільтрація профілів"""
-        search_text = self.search_edit.text().lower()
+    def visible_profile_ids(self) -> list:
+        """ID профілів з урахуванням фільтрів та сортування (без розшифрування)"""
+        statuses = []
+        only_running = False
+        if not self.status_all.isChecked():
+            if self.status_active.isChecked():
+                statuses.append('active')
+            if self.status_inactive.isChecked():
+                statuses.append('inactive')
+            only_running = self.status_running.isChecked()
+            
+        icon_types = [icon_type for icon_type, cb in self.type_combos.items() if cb.isChecked()]
+        country_codes = [code for code, cb in self.country_combos.items() if cb.isChecked()]
+        
+        profile_ids = self.profile_manager.search_profile_ids(
+            text=self.search_edit.text(),
+            statuses=statuses,
+            icon_types=icon_types,
+            country_codes=country_codes,
+            order_by=self.sort_order
+        )
+        
+        # Стан запуску відомий тільки в процесі - фільтруємо по ID
+        if only_running:
+            profile_ids = [p_id for p_id in profile_ids
+                           if self.chrome_manager.is_profile_running(p_id)]
+            
+        return profile_ids
         
+    def filter_profiles(self):
+        """Фільтрація профілів (фільтри та сортування виконуються в SQL)"""
         try:
-            all_profiles = self.profile_manager.get_all_profiles()
-            filtered_profiles = []
-            
-            for profile in all_profiles:
-                # Пошук по тексту
-                if search_text:
-                    searchable_text = f"{profile.name} {getattr(profile, 'description', '')} {getattr(profile, 'tags', '')}".lower()
-                    if search_text not in searchable_text:
-                        continue
-                
-                # Фільтр по статусу
-                if not self.status_all.isChecked():
-                    status = getattr(profile, 'status', 'active')
-                    if self.status_active.isChecked() and status != 'active':
-                        continue
-                    if self.status_inactive.isChecked() and status != 'inactive':
-                        continue
-                    if self.status_running.isChecked() and not self.chrome_manager.is_profile_running(profile.id):
-                        continue
-                
-                # Фільтр по типу
-                icon_type = getattr(profile, 'icon_type', 'default')
-                if icon_type in self.type_combos:
-                    if self.type_combos[icon_type].isChecked():
-                        pass  # включаємо
-                    else:
-                        # Перевіряємо чи хоча б один тип вибрано
-                        any_type_selected = any(cb.isChecked() for cb in self.type_combos.values())
-                        if any_type_selected:
-                            continue
-                            
-                # Фільтр по країні
-                country_code = getattr(profile, 'country_code', 'UA')
-                if country_code in self.country_combos:
-                    if self.country_combos[country_code].isChecked():
-                        pass  # включаємо
-                    else:
-                        # Перевіряємо чи хоча б одну країну вибрано
-                        any_country_selected = any(cb.isChecked() for cb in self.country_combos.values())
-                        if any_country_selected:
-                            continue
-                
-                filtered_profiles.append(profile)
-                
+            profile_ids = self.visible_profile_ids()
+            filtered_profiles = self.profile_manager.get_profile_summaries(profile_ids)
             self.display_profiles(filtered_profiles)
             self.update_profiles_count(len(filtered_profiles))
             
@@ -884,21 +962,14 @@ class AnDetectMainWindow(QMainWindow):
             
     def sort_profiles(self, sort_type):
         """Сортування профілів"""
-        try:
-            profiles = self.profile_manager.get_all_profiles()
-            
-            if sort_type == "За назвою":
-                profiles.sort(key=lambda p: p.name.lower())
-            elif sort_type == "За статусом":
-                profiles.sort(key=lambda p: getattr(p, 'status', 'active'))
-            elif sort_type == "За улюбленими":
-                profiles.sort(key=lambda p: getattr(p, 'favorite', False), reverse=True)
-            # За замовчуванням - за датою використання (вже відсортовано)
-            
-            self.display_profiles(profiles)
-            
-        except Exception as e:
-            print(f"Помилка сортування: {e}")
+        sort_orders = {
+            "За назвою": 'name',
+            "За статусом": 'status',
+            "За улюбленими": 'favorite',
+        }
+        # За замовчуванням - за датою використання
+        self.sort_order = sort_orders.get(sort_type, 'last_used')
+        self.filter_profiles()
             
     def import_profiles(self):
         """Імпорт профілів"""
@@ -969,6 +1040,7 @@ class AnDetectMainWindow(QMainWindow):
         for profile_id in list(self.chrome_manager.running_profiles.keys()):
             self.chrome_manager.stop_profile(profile_id)
             
+        self.profile_manager.stop_reencryption()
         event.accept()
 
 